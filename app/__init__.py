@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 
 def create_app():
@@ -8,6 +10,20 @@ def create_app():
 
     app.config['SECRET_KEY'] = 'a_very_secret_and_unique_key_for_your_project'
 
+    # 后台素数池: 为RSA/ElGamal密钥生成预先准备素数。
+    # PRIME_POOL_PERSIST 为 True 时池内容以明文保存在 instance 目录 (文件权限 0600)，默认只保存在内存中
+    app.config.setdefault('PRIME_POOL_ENABLED', True)
+    app.config.setdefault('PRIME_POOL_PERSIST', False)
+    app.config.setdefault('PRIME_POOL_BIT_SIZES', [256, 512, 1024, 2048])
+    app.config.setdefault('PRIME_POOL_TARGET_DEPTH', 4)
+    app.config.setdefault('PRIME_POOL_FILENAME', 'prime_pool.json')
+
+    # 大整数运算后端: educational (手写算法)、builtin (内置 pow) 或 gmpy2 (需要安装 gmpy2)
+    app.config.setdefault('ARITHMETIC_BACKEND', os.environ.get('ARITHMETIC_BACKEND', 'educational'))
+
+    _init_arithmetic_backend(app)
+    _init_prime_pool(app)
+
     try:
         from .routes import main_bp  
         app.register_blueprint(main_bp) 
@@ -28,6 +44,18 @@ def create_app():
     except ImportError as e:
         app.logger.error(f"无法导入或注册ElGamal API蓝图 (elgamal_api_bp): {e}")
 
+    try:
+        from .api.prime_pool_routes import prime_pool_api_bp
+        app.register_blueprint(prime_pool_api_bp, url_prefix='/api')
+    except ImportError as e:
+        app.logger.error(f"无法导入或注册素数池 API蓝图 (prime_pool_api_bp): {e}")
+
+    try:
+        from .api.arithmetic_backend_routes import arithmetic_backend_api_bp
+        app.register_blueprint(arithmetic_backend_api_bp, url_prefix='/api')
+    except ImportError as e:
+        app.logger.error(f"无法导入或注册运算后端 API蓝图 (arithmetic_backend_api_bp): {e}")
+
     try:
         from .api.ecc_routes import ecc_api_bp 
         app.register_blueprint(ecc_api_bp, url_prefix='/api') 
@@ -40,4 +68,45 @@ def create_app():
         def simple_index():
             return "密码学算法实验平台后端已启动。"
 
-    return app
\ No newline at end of file
+    return app
+
+def _init_arithmetic_backend(app):
+    """按配置项 ARITHMETIC_BACKEND 选择进程内使用的大整数运算后端，不可用时保持默认后端。"""
+    from .utils.arithmetic_backend import set_backend, get_backend
+
+    try:
+        set_backend(app.config['ARITHMETIC_BACKEND'])
+    except ValueError as e:
+        app.logger.error(f"无法切换运算后端: {e}，继续使用 {get_backend().name}")
+
+def _init_prime_pool(app):
+    """
+    创建后台素数池并保存在 app.extensions['prime_pool'] 中。
+    生产者线程在收到第一个请求时才启动: debug 模式下 Flask 的自动重载会多出一个
+    不处理请求的监视进程，这样它不会和真正的服务进程共用同一个池文件。
+    """
+    if not app.config['PRIME_POOL_ENABLED']:
+        return
+
+    try:
+        from .utils.prime_pool import PrimePool
+
+        path = None
+        if app.config['PRIME_POOL_PERSIST']:
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, app.config['PRIME_POOL_FILENAME'])
+        prime_pool = PrimePool(
+            bit_sizes=app.config['PRIME_POOL_BIT_SIZES'],
+            target_depth=app.config['PRIME_POOL_TARGET_DEPTH'],
+            path=path
+        )
+    except (ImportError, OSError) as e:
+        app.logger.error(f"无法创建素数池: {e}")
+        return
+
+    app.extensions['prime_pool'] = prime_pool
+
+    @app.before_request
+    def _start_prime_pool():
+        if not prime_pool.is_running():
+            prime_pool.start()
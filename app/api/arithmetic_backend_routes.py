@@ -0,0 +1,13 @@
+# app/api/arithmetic_backend_routes.py
+
+from flask import Blueprint, jsonify
+
+from app.utils.arithmetic_backend import get_backend, available_backends
+
+arithmetic_backend_api_bp = Blueprint('arithmetic_backend_api_bp', __name__)
+
+# 只读接口: 后端是进程级的全局状态，在请求中切换会影响同时处理的其他请求。
+# 启动时通过配置项 ARITHMETIC_BACKEND 选择；对比不同后端时在测试/命令行中使用 use_backend
+@arithmetic_backend_api_bp.route('/arithmetic_backend', methods=['GET'])
+def arithmetic_backend_api():
+    return jsonify({'success': True, 'current': get_backend().name, 'available': available_backends()})
@@ -7,6 +7,9 @@ try:
         generate_keys as elgamal_generate_keys,
         encrypt as elgamal_encrypt,
         decrypt as elgamal_decrypt,
+        encrypt_bytes as elgamal_encrypt_bytes,
+        decrypt_bytes as elgamal_decrypt_bytes,
+        ElGamalPrivateKey,
         ElGamalKeyGenerationError, ElGamalEncryptionError, ElGamalDecryptionError
     )
 except ImportError as e:
@@ -14,6 +17,10 @@ except ImportError as e:
     def elgamal_generate_keys(*args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
     def elgamal_encrypt(*args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
     def elgamal_decrypt(*args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
+    def elgamal_encrypt_bytes(*args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
+    def elgamal_decrypt_bytes(*args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
+    class ElGamalPrivateKey:
+        def __init__(self, *args, **kwargs): raise NotImplementedError(f"ElGamal模块未加载: {e}")
     class ElGamalKeyGenerationError(Exception): pass
     class ElGamalEncryptionError(Exception): pass
     class ElGamalDecryptionError(Exception): pass
@@ -25,8 +32,15 @@ def elgamal_generate_keys_api():
     try:
         data = request.json
         bits = int(data.get('bits', 512)) 
-
-        public_key, private_key_x = elgamal_generate_keys(bits=bits)
+        # 只接受 JSON 布尔值: bool("false") 为 True，会误触发很慢的安全素数搜索
+        safe_prime = data.get('safe_prime', False)
+        if not isinstance(safe_prime, bool):
+            return jsonify({'success': False, 'message': 'safe_prime 必须是 JSON 布尔值 (true/false)。'}), 400
+        # 指定预定义群 (如 "ffdhe2048") 时不生成新的素数 p
+        group = data.get('group') or None
+
+        public_key, private_key_x = elgamal_generate_keys(bits=bits, safe_prime=safe_prime, group=group,
+                                                          prime_pool=current_app.extensions.get('prime_pool'))
         p, g, y = public_key
 
         response_data = {
@@ -63,7 +77,7 @@ def elgamal_encrypt_api():
         message_int = int.from_bytes(message_bytes, byteorder='big')
 
         if message_int >= p:
-            return jsonify({'success': False, 'message': f'明文转换后的整数 ({message_int}) 过大，必须小于素数 p ({p})。请尝试更短的明文或更大的密钥位数。'}), 400
+            return jsonify({'success': False, 'message': f'明文转换后的整数 ({message_int}) 过大，必须小于素数 p ({p})。请尝试更短的明文、更大的密钥位数，或使用分块加密接口 /api/elgamal/encrypt_blocks。'}), 400
 
         public_key_tuple = (p, g, y)
 
@@ -128,4 +142,57 @@ def elgamal_decrypt_api():
         return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"未预期的ElGamal解密API错误: {e}", exc_info=True)
-        return jsonify({'success': False, 'message': '解密时发生内部错误。'}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'message': '解密时发生内部错误。'}), 500
+
+@elgamal_api_bp.route('/elgamal/encrypt_blocks', methods=['POST'])
+def elgamal_encrypt_blocks_api():
+    try:
+        data = request.json
+        plaintext_str = data.get('plaintext')
+        p_str = data.get('public_key_p')
+        g_str = data.get('public_key_g')
+        y_str = data.get('public_key_y')
+
+        if plaintext_str is None or not all([p_str, g_str, y_str]):
+            return jsonify({'success': False, 'message': '缺少必要的加密参数：明文、公钥p, g, y。'}), 400
+
+        public_key_tuple = (int(p_str), int(g_str), int(y_str))
+        ciphertexts = elgamal_encrypt_bytes(public_key_tuple, plaintext_str.encode('utf-8'))
+        return jsonify({
+            'success': True,
+            'message': 'ElGamal分块加密成功！',
+            'ciphertext_blocks': [[str(c1), str(c2)] for c1, c2 in ciphertexts]
+        })
+    except (ElGamalEncryptionError, ValueError, TypeError) as e:
+        current_app.logger.error(f"ElGamal分块加密API错误: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"未预期的ElGamal分块加密API错误: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': '加密时发生内部错误。'}), 500
+
+@elgamal_api_bp.route('/elgamal/decrypt_blocks', methods=['POST'])
+def elgamal_decrypt_blocks_api():
+    try:
+        data = request.json
+        ciphertext_blocks = data.get('ciphertext_blocks')
+        p_str = data.get('public_key_p_dec')
+        g_str = data.get('public_key_g_dec')
+        private_key_x_str = data.get('private_key_x_dec')
+
+        if not ciphertext_blocks or not all([p_str, g_str, private_key_x_str]):
+            return jsonify({'success': False, 'message': '缺少必要的解密参数：密文块列表、p, g, 或私钥x。'}), 400
+
+        ciphertexts = [(int(c1), int(c2)) for c1, c2 in ciphertext_blocks]
+        private_key = ElGamalPrivateKey(int(p_str), int(g_str), int(private_key_x_str))
+        decrypted_bytes = elgamal_decrypt_bytes(private_key, ciphertexts)
+        return jsonify({
+            'success': True,
+            'message': 'ElGamal分块解密成功！',
+            'decrypted_text': decrypted_bytes.decode('utf-8', errors='replace')
+        })
+    except (ElGamalDecryptionError, ValueError, TypeError) as e:
+        current_app.logger.error(f"ElGamal分块解密API错误: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"未预期的ElGamal分块解密API错误: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': '解密时发生内部错误。'}), 500
@@ -0,0 +1,12 @@
+# app/api/prime_pool_routes.py
+
+from flask import Blueprint, jsonify, current_app
+
+prime_pool_api_bp = Blueprint('prime_pool_api_bp', __name__)
+
+@prime_pool_api_bp.route('/prime_pool/stats', methods=['GET'])
+def prime_pool_stats_api():
+    prime_pool = current_app.extensions.get('prime_pool')
+    if prime_pool is None:
+        return jsonify({'success': False, 'message': '素数池未启用。'}), 404
+    return jsonify({'success': True, 'stats': prime_pool.stats()})
@@ -7,12 +7,19 @@ try:
         generate_keys as rsa_generate_keys,
         encrypt_with_padding as rsa_encrypt,
         decrypt_with_padding as rsa_decrypt,
+        RSAPrivateKey,
+        get_crt_private_key,
+        crt_key_cache,
         RSADecryptionError, RSAEncryptionError, RSAKeyGenerationError
     )
 except ImportError as e:
     def rsa_generate_keys(*args, **kwargs): raise NotImplementedError(f"RSA模块未加载: {e}")
     def rsa_encrypt(*args, **kwargs): raise NotImplementedError(f"RSA模块未加载: {e}")
     def rsa_decrypt(*args, **kwargs): raise NotImplementedError(f"RSA模块未加载: {e}")
+    class RSAPrivateKey:
+        def __init__(self, *args, **kwargs): raise NotImplementedError(f"RSA模块未加载: {e}")
+    def get_crt_private_key(*args, **kwargs): raise NotImplementedError(f"RSA模块未加载: {e}")
+    crt_key_cache = None
     class RSAKeyGenerationError(Exception): pass
     class RSAEncryptionError(Exception): pass
     class RSADecryptionError(Exception): pass
@@ -25,14 +32,21 @@ def rsa_generate_keys_api():
         data = request.json
         bits = int(data.get('bits', 2048))
         e_value = int(data.get('e_value', 65537))
+        num_primes = int(data.get('num_primes', 2))
 
-        public_key, private_key = rsa_generate_keys(bits= bits, e_value= e_value)
+        public_key, private_key = rsa_generate_keys(bits= bits, e_value= e_value, num_primes=num_primes,
+                                                    prime_pool=current_app.extensions.get('prime_pool'))
 
         response_data = {
             'public_key_n': str(public_key[0]),
             'public_key_e': str(public_key[1]),
             'private_key_d': str(private_key[1]),
-            'private_key_n_for_consistency': str(private_key[0])
+            'private_key_n_for_consistency': str(private_key[0]),
+            # p 和 q 用于 CRT 解密，解密时不提供则使用 c^d mod n
+            'private_key_p': str(private_key.p),
+            'private_key_q': str(private_key.q),
+            # 多素数密钥的第 3 个及之后的素数
+            'private_key_other_primes': [str(r) for r in private_key.primes[2:]]
         }
         return jsonify({'success': True, 'message': '密钥生成成功', 'keys': response_data})
     except (RSAKeyGenerationError, ValueError, TypeError) as e:
@@ -85,7 +99,19 @@ def rsa_decrypt_api():
         ciphertext_bytes = bytes.fromhex(ciphertext_hex)
         private_key_n = int(private_key_n_str)
         private_key_d = int(private_key_d_str)
-        private_key_tuple = (private_key_n, private_key_d)
+        # 默认使用 CRT 解密: 提供了 p 和 q 时直接使用，否则由 (n, e, d) 恢复 p, q 并缓存;
+        # use_crt 为 false 时保留 (n, d) 直接模幂的路径作为对比
+        private_key_p_str = data.get('private_key_p')
+        private_key_q_str = data.get('private_key_q')
+        if not data.get('use_crt', True):
+            private_key_tuple = (private_key_n, private_key_d)
+        elif private_key_p_str and private_key_q_str:
+            other_primes = [int(r) for r in data.get('private_key_other_primes') or []]
+            private_key_tuple = RSAPrivateKey(private_key_n, private_key_d,
+                                              int(private_key_p_str), int(private_key_q_str), other_primes)
+        else:
+            public_key_e = int(data.get('public_key_e', 65537))
+            private_key_tuple = get_crt_private_key(private_key_n, public_key_e, private_key_d)
         
         decrypted_bytes = rsa_decrypt(private_key_tuple, ciphertext_bytes)
         return jsonify({
@@ -98,4 +124,10 @@ def rsa_decrypt_api():
         return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"未预期的RSA解密API错误: {e}", exc_info=True)
-        return jsonify({'success': False, 'message': '解密时发生内部错误。'}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'message': '解密时发生内部错误。'}), 500
+
+@rsa_api_bp.route('/rsa/crt_cache/stats', methods=['GET'])
+def rsa_crt_cache_stats_api():
+    if crt_key_cache is None:
+        return jsonify({'success': False, 'message': 'RSA模块未加载。'}), 500
+    return jsonify({'success': True, 'stats': crt_key_cache.stats()})
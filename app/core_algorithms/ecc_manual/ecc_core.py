@@ -3,7 +3,7 @@
 import random
 from hashlib import sha256
 from itertools import cycle
-from app.utils.math_utils import mod_inverse # power 函数在这里可能用不上
+from app.utils.arithmetic_backend import mod_inverse # power 函数在这里可能用不上
 
 CURVE_PARAMETERS = {
     "secp192r1": { # NIST P-192
@@ -347,16 +347,98 @@ class CurvePoint:
         if t == 0: # 应该不会发生，因为 k>0
             return CurvePoint(self.curve, None, None)
 
-        current_result = self # 对应 k_{t-1} = 1 (最高位)
+        # 中间结果使用雅可比坐标 (X, Y, Z)，对应仿射点 (X/Z^2, Y/Z^3)，
+        # 倍点和加点都不需要求逆元，只在最后转换回仿射坐标时求一次 Z 的逆元
+        p = self.curve.p
+        current_result = (self.x, self.y, 1) # 对应 k_{t-1} = 1 (最高位)
         
         # 从次高位 (t-2) 开始到最低位 (0)
         for i in range(1, t): # i 从 1 到 t-1 (对应 k_bin_str 的索引)
-            current_result = current_result.double()
+            current_result = _jacobian_double(current_result, self.curve.a, p)
             if k_bin_str[i] == '1':
-                current_result = current_result + self
+                current_result = _jacobian_add_affine(current_result, self.x, self.y, self.curve.a, p)
                 
+        return _jacobian_to_affine(self.curve, current_result)
+
+    def _scalar_multiply_affine(self, k):
+        """
+        仿射坐标的 "倍点-加点" (每次倍点和加点都求一次模逆元)。
+        保留作为雅可比坐标实现的对照，供测试和性能对比使用。
+        """
+        if self.is_infinity() or k == 0:
+            return CurvePoint(self.curve, None, None)
+        if k < 0:
+            minus_self = CurvePoint(self.curve, self.x, (-self.y) % self.curve.p)
+            return minus_self._scalar_multiply_affine(-k)
+
+        k_bin_str = bin(k)[2:]
+        current_result = self
+        for bit in k_bin_str[1:]:
+            current_result = current_result.double()
+            if bit == '1':
+                current_result = current_result + self
         return current_result
 
+# --- 雅可比坐标 ---
+# 点 (X, Y, Z) 表示仿射点 (X/Z^2, Y/Z^3)，Z = 0 表示无穷远点。
+# 公式见 Hankerson, Menezes, Vanstone《Guide to Elliptic Curve Cryptography》第 3.2.2 节。
+
+_JACOBIAN_INFINITY = (1, 1, 0)
+
+def _jacobian_double(point, a, p):
+    """雅可比坐标下的倍点 2P。a = 0 (secp256k1) 和 a = -3 (NIST 曲线) 时 M 的计算更省。"""
+    X1, Y1, Z1 = point
+    if Z1 == 0 or Y1 == 0:
+        return _JACOBIAN_INFINITY
+
+    YY = (Y1 * Y1) % p
+    ZZ = (Z1 * Z1) % p
+    S = (4 * X1 * YY) % p
+    if a == 0:
+        M = (3 * X1 * X1) % p
+    elif a == p - 3:
+        M = (3 * (X1 - ZZ) * (X1 + ZZ)) % p
+    else:
+        M = (3 * X1 * X1 + a * ZZ * ZZ) % p
+
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = (2 * Y1 * Z1) % p
+    return (X3, Y3, Z3)
+
+def _jacobian_add_affine(point, x2, y2, a, p):
+    """雅可比坐标的点 P 加上仿射坐标的点 Q = (x2, y2) (混合加法)。"""
+    X1, Y1, Z1 = point
+    if Z1 == 0:
+        return (x2, y2, 1)
+
+    Z1Z1 = (Z1 * Z1) % p
+    U2 = (x2 * Z1Z1) % p
+    S2 = (y2 * Z1 * Z1Z1) % p
+    H = (U2 - X1) % p
+    r = (S2 - Y1) % p
+    if H == 0:
+        # x 坐标相同: 同一个点时倍点，互为相反点时结果为无穷远点
+        return _jacobian_double(point, a, p) if r == 0 else _JACOBIAN_INFINITY
+
+    HH = (H * H) % p
+    HHH = (H * HH) % p
+    V = (X1 * HH) % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - Y1 * HHH) % p
+    Z3 = (Z1 * H) % p
+    return (X3, Y3, Z3)
+
+def _jacobian_to_affine(curve, point):
+    """用一次模逆元把雅可比坐标的点转换回仿射坐标的 CurvePoint。"""
+    X, Y, Z = point
+    if Z == 0:
+        return CurvePoint(curve, None, None)
+    p = curve.p
+    z_inv = mod_inverse(Z, p)
+    z_inv_squared = (z_inv * z_inv) % p
+    return CurvePoint(curve, (X * z_inv_squared) % p, (Y * z_inv_squared * z_inv) % p)
+
 def generate_ecc_keys(curve_name="secp256k1"):
     """
     生成ECC密钥对 (私钥和公钥)。
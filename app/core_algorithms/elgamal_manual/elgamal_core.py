@@ -1,7 +1,185 @@
 # app/core_algorithms/elgamal_manual/elgamal_core.py
 
+import os
 import random
-from app.utils.math_utils import generate_large_prime, power, mod_inverse
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.arithmetic_backend import generate_prime, power, fixed_base_power, mod_inverse
+from app.utils.math_utils import generate_large_prime, generate_safe_prime, batch_mod_inverse, BatchInverseError
+
+# 一次模逆元运算约相当于多少次同规模的模乘 (Lehmer 扩展欧几里得，512-2048 位实测约 40-130 次)，
+# ElGamalPrivateKey.decrypt_many 据此在无逆元路径和批量求逆路径之间选择
+INVERSION_COST_MULTIPLICATIONS = 64
+
+# ElGamalEncryptor 默认预计算的 (g^k, y^k) 对数
+DEFAULT_EPHEMERAL_POOL_SIZE = 64
+# 预计算池已满时，后台线程两次检查之间的最长等待时间 (秒)
+EPHEMERAL_PRODUCER_IDLE_WAIT_SECONDS = 5.0
+
+# 分块模式: 消息前面加上的长度头的字节数 (大端无符号整数)
+MESSAGE_LENGTH_HEADER_BYTES = 8
+# 分块模式中块数达到此值且 workers 为 None 时，自动把各块分配到进程池中处理
+PARALLEL_BLOCK_THRESHOLD = 64
+
+def _hex_to_int(hex_string):
+    """把 RFC 中按空白分组书写的十六进制数转换为整数。"""
+    return int("".join(hex_string.split()), 16)
+
+# 预定义的 ElGamal 群参数 (RFC 2409/3526 的 MODP 群和 RFC 7919 的 FFDHE 群)。
+# 每个 p 都是安全素数 p = 2q+1，且 p ≡ 7 (mod 8)，因此 g = 2 生成 q 阶子群。
+# 使用这些群时密钥生成只需要一次模幂运算，并且所有用户共享 (g, p) 的固定底数预计算表。
+ELGAMAL_GROUPS = {
+    "modp1024": { # RFC 2409 Oakley 第2组
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+            020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+            4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+            EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE65381 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "modp1536": { # RFC 3526 第5组
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+            020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+            4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+            EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+            98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+            9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA237327 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "modp2048": { # RFC 3526 第14组
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+            020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+            4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+            EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+            98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+            9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA18217C 32905E46 2E36CE3B
+            E39E772C 180E8603 9B2783A2 EC07A28F B5C55DF0 6F4C52C9 DE2BCBF6 95581718
+            3995497C EA956AE5 15D22618 98FA0510 15728E5A 8AACAA68 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "modp3072": { # RFC 3526 第15组
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+            020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+            4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+            EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+            98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+            9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA18217C 32905E46 2E36CE3B
+            E39E772C 180E8603 9B2783A2 EC07A28F B5C55DF0 6F4C52C9 DE2BCBF6 95581718
+            3995497C EA956AE5 15D22618 98FA0510 15728E5A 8AAAC42D AD33170D 04507A33
+            A85521AB DF1CBA64 ECFB8504 58DBEF0A 8AEA7157 5D060C7D B3970F85 A6E1E4C7
+            ABF5AE8C DB0933D7 1E8C94E0 4A25619D CEE3D226 1AD2EE6B F12FFA06 D98A0864
+            D8760273 3EC86A64 521F2B18 177B200C BBE11757 7A615D6C 770988C0 BAD946E2
+            08E24FA0 74E5AB31 43DB5BFC E0FD108E 4B82D120 A93AD2CA FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "modp4096": { # RFC 3526 第16组
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+            020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+            4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+            EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+            98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+            9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA18217C 32905E46 2E36CE3B
+            E39E772C 180E8603 9B2783A2 EC07A28F B5C55DF0 6F4C52C9 DE2BCBF6 95581718
+            3995497C EA956AE5 15D22618 98FA0510 15728E5A 8AAAC42D AD33170D 04507A33
+            A85521AB DF1CBA64 ECFB8504 58DBEF0A 8AEA7157 5D060C7D B3970F85 A6E1E4C7
+            ABF5AE8C DB0933D7 1E8C94E0 4A25619D CEE3D226 1AD2EE6B F12FFA06 D98A0864
+            D8760273 3EC86A64 521F2B18 177B200C BBE11757 7A615D6C 770988C0 BAD946E2
+            08E24FA0 74E5AB31 43DB5BFC E0FD108E 4B82D120 A9210801 1A723C12 A787E6D7
+            88719A10 BDBA5B26 99C32718 6AF4E23C 1A946834 B6150BDA 2583E9CA 2AD44CE8
+            DBBBC2DB 04DE8EF9 2E8EFC14 1FBECAA6 287C5947 4E6BC05D 99B2964F A090C3A2
+            233BA186 515BE7ED 1F612970 CEE2D7AF B81BDD76 2170481C D0069127 D5B05AA9
+            93B4EA98 8D8FDDC1 86FFB7DC 90A6C08F 4DF435C9 34063199 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "ffdhe2048": { # RFC 7919
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF ADF85458 A2BB4A9A AFDC5620 273D3CF1 D8B9C583 CE2D3695
+            A9E13641 146433FB CC939DCE 249B3EF9 7D2FE363 630C75D8 F681B202 AEC4617A
+            D3DF1ED5 D5FD6561 2433F51F 5F066ED0 85636555 3DED1AF3 B557135E 7F57C935
+            984F0C70 E0E68B77 E2A689DA F3EFE872 1DF158A1 36ADE735 30ACCA4F 483A797A
+            BC0AB182 B324FB61 D108A94B B2C8E3FB B96ADAB7 60D7F468 1D4F42A3 DE394DF4
+            AE56EDE7 6372BB19 0B07A7C8 EE0A6D70 9E02FCE1 CDF7E2EC C03404CD 28342F61
+            9172FE9C E98583FF 8E4F1232 EEF28183 C3FE3B1B 4C6FAD73 3BB5FCBC 2EC22005
+            C58EF183 7D1683B2 C6F34A26 C1B2EFFA 886B4238 61285C97 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "ffdhe3072": { # RFC 7919
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF ADF85458 A2BB4A9A AFDC5620 273D3CF1 D8B9C583 CE2D3695
+            A9E13641 146433FB CC939DCE 249B3EF9 7D2FE363 630C75D8 F681B202 AEC4617A
+            D3DF1ED5 D5FD6561 2433F51F 5F066ED0 85636555 3DED1AF3 B557135E 7F57C935
+            984F0C70 E0E68B77 E2A689DA F3EFE872 1DF158A1 36ADE735 30ACCA4F 483A797A
+            BC0AB182 B324FB61 D108A94B B2C8E3FB B96ADAB7 60D7F468 1D4F42A3 DE394DF4
+            AE56EDE7 6372BB19 0B07A7C8 EE0A6D70 9E02FCE1 CDF7E2EC C03404CD 28342F61
+            9172FE9C E98583FF 8E4F1232 EEF28183 C3FE3B1B 4C6FAD73 3BB5FCBC 2EC22005
+            C58EF183 7D1683B2 C6F34A26 C1B2EFFA 886B4238 611FCFDC DE355B3B 6519035B
+            BC34F4DE F99C0238 61B46FC9 D6E6C907 7AD91D26 91F7F7EE 598CB0FA C186D91C
+            AEFE1309 85139270 B4130C93 BC437944 F4FD4452 E2D74DD3 64F2E21E 71F54BFF
+            5CAE82AB 9C9DF69E E86D2BC5 22363A0D ABC52197 9B0DEADA 1DBF9A42 D5C4484E
+            0ABCD06B FA53DDEF 3C1B20EE 3FD59D7C 25E41D2B 66C62E37 FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    },
+    "ffdhe4096": { # RFC 7919
+        "p": _hex_to_int("""
+            FFFFFFFF FFFFFFFF ADF85458 A2BB4A9A AFDC5620 273D3CF1 D8B9C583 CE2D3695
+            A9E13641 146433FB CC939DCE 249B3EF9 7D2FE363 630C75D8 F681B202 AEC4617A
+            D3DF1ED5 D5FD6561 2433F51F 5F066ED0 85636555 3DED1AF3 B557135E 7F57C935
+            984F0C70 E0E68B77 E2A689DA F3EFE872 1DF158A1 36ADE735 30ACCA4F 483A797A
+            BC0AB182 B324FB61 D108A94B B2C8E3FB B96ADAB7 60D7F468 1D4F42A3 DE394DF4
+            AE56EDE7 6372BB19 0B07A7C8 EE0A6D70 9E02FCE1 CDF7E2EC C03404CD 28342F61
+            9172FE9C E98583FF 8E4F1232 EEF28183 C3FE3B1B 4C6FAD73 3BB5FCBC 2EC22005
+            C58EF183 7D1683B2 C6F34A26 C1B2EFFA 886B4238 611FCFDC DE355B3B 6519035B
+            BC34F4DE F99C0238 61B46FC9 D6E6C907 7AD91D26 91F7F7EE 598CB0FA C186D91C
+            AEFE1309 85139270 B4130C93 BC437944 F4FD4452 E2D74DD3 64F2E21E 71F54BFF
+            5CAE82AB 9C9DF69E E86D2BC5 22363A0D ABC52197 9B0DEADA 1DBF9A42 D5C4484E
+            0ABCD06B FA53DDEF 3C1B20EE 3FD59D7C 25E41D2B 669E1EF1 6E6F52C3 164DF4FB
+            7930E9E4 E58857B6 AC7D5F42 D69F6D18 7763CF1D 55034004 87F55BA5 7E31CC7A
+            7135C886 EFB4318A ED6A1E01 2D9E6832 A907600A 918130C4 6DC778F9 71AD0038
+            092999A3 33CB8B7A 1A1DB93D 7140003C 2A4ECEA9 F98D0ACC 0A8291CD CEC97DCF
+            8EC9B55A 7F88A46B 4DB5A851 F44182E1 C68A007E 5E655F6A FFFFFFFF FFFFFFFF
+        """),
+        "g": 2
+    }
+}
+
+def get_group_by_name(name):
+    """
+    根据名称获取预定义的 ElGamal 群参数。
+
+    返回:
+        tuple: (p, g)
+    Raises:
+        ValueError: 如果群名称未知。
+    """
+    if name not in ELGAMAL_GROUPS:
+        raise ValueError(f"Unknown ElGamal group: {name}")
+    params = ELGAMAL_GROUPS[name]
+    return params["p"], params["g"]
+
+# 预定义群的 (p, g) 会被反复使用，值得为其建立固定底数预计算表
+_PREDEFINED_GROUP_PARAMS = frozenset((params["p"], params["g"]) for params in ELGAMAL_GROUPS.values())
+
+def _generator_power(g, exp, p):
+    """
+    计算 g^exp mod p。只有预定义群使用 (共享的) 固定底数预计算表；
+    新生成的 p 通常只用于一次密钥生成或少量加密，建表的开销得不偿失，还会把常用群的表挤出缓存。
+    """
+    if (p, g) in _PREDEFINED_GROUP_PARAMS:
+        return fixed_base_power(g, exp, p)
+    return power(g, exp, p)
 
 class ElGamalKeyGenerationError(Exception):
     """自定义异常，用于ElGamal密钥生成过程中的错误。"""
@@ -15,16 +193,37 @@ class ElGamalDecryptionError(Exception):
     """自定义异常，用于ElGamal解密过程中的错误。"""
     pass
 
-def generate_keys(bits=512, k_miller_rabin=20):
+def _subgroup_generator(p):
+    """
+    返回安全素数 p = 2q+1 的 q 阶子群的生成元。
+
+    g = 4 = 2^2 总是二次剩余，因此阶为 q；p ≡ ±1 (mod 8) 时 2 本身就是二次剩余，直接取 g = 2。
+    """
+    return 2 if p % 8 in (1, 7) else 4
+
+def generate_keys(bits=512, k_miller_rabin=20, parallel=False, workers=None, prime_pool=None, safe_prime=False,
+                  group=None):
     """
     生成ElGamal公钥和私钥对。
     公钥是 (p, g, y)，私钥是 (p, g, x)。
     为了方便，私钥通常只存储 x，因为 p 和 g 是公开参数。
 
+    默认 (safe_prime=False) 沿用旧的做法: p 是任意素数 (可从素数池取得)，g 从 [2, 3, 5, 7] 中取第一个可用值，不检查其阶。
+    safe_prime=True 时 p 是新生成的安全素数 p = 2q+1，g 生成 q 阶子群，x 取自 [1, q-1]；
+    同样比特长度下安全素数的搜索比普通素数慢一个数量级以上 (1024 位约 20 倍)，需要素数阶子群时优先使用 group。
+    指定 group 时使用 ELGAMAL_GROUPS 中的预定义群，不生成素数，只计算一次 y = g^x mod p。
+
+    注意: encrypt 不把明文编码到 q 阶子群中。g 只生成二次剩余时，密文 c2 = m * y^k 的勒让德符号
+    与 m 的勒让德符号相同，因此每个密文都会泄露 m 是否为模 p 的二次剩余 (1 比特信息)。
+
     参数:
         bits (int): 模数 p 的期望比特长度。
         k_miller_rabin (int): 用于素性检验的米勒-拉宾测试轮数。
-        g_value (int): 生成元 g 的期望值。实际应用中 g 的选择更复杂。
+        parallel (bool): 为 True 时用进程池并行搜索素数 p。
+        workers (int, optional): 并行搜索的进程数，默认为 CPU 核数。
+        prime_pool (PrimePool, optional): 预先生成的素数池。只在 safe_prime=False 时使用 (池中是普通素数)。
+        safe_prime (bool): 是否生成新的安全素数并使用素数阶子群的生成元 (较慢)。
+        group (str, optional): 预定义群的名称 (如 "ffdhe2048")。提供时忽略 bits 等素数生成参数。
 
     返回:
         tuple: (public_key, private_key)
@@ -32,36 +231,65 @@ def generate_keys(bits=512, k_miller_rabin=20):
                private_key = (x)  (p 和 g 也会被使用，所以通常也会包含它们以便解密时使用)
                或者在错误时抛出 ElGamalKeyGenerationError。
     """
-    if bits < 16:
+    if group is not None:
+        # 1-2. 直接使用预定义群的 p 和 g
+        try:
+            p, g = get_group_by_name(group)
+        except ValueError as e:
+            raise ElGamalKeyGenerationError(str(e))
+
+        # 3. 私钥 x 取自 [1, q-1]
+        x = random.randint(1, (p - 1) // 2 - 1)
+    elif bits < 16:
         raise ElGamalKeyGenerationError("Number of bits must be at least 16")
-    
-    # 1. 生成大素数 p
-    p = generate_large_prime(bits, k_miller_rabin)
-
-    # 2. 选择生成元 g
-    # 为了演示简便，尝试使用一个小的固定值，并确保1 < g < p
-    g = 0
-    possible_gs = [2, 3, 5, 7]
-
-    for g_candidate in possible_gs:
-        if 1 < g_candidate < p:
-            g = g_candidate
-            break
-
-    if g == 0:
-        if p > 2:
-            raise ElGamalKeyGenerationError("Could not find a suitable value for g")
-        elif p == 2:
-            raise ElGamalKeyGenerationError("The only suitable value for g is 1")
-        
-    # 3. 生成私钥 x
-    try:
-        x = random.randint(1, p - 2)
-    except ValueError:
-        raise ElGamalKeyGenerationError("Could not generate a suitable value for x")
+    elif safe_prime:
+        # 1. 生成安全素数 p = 2q+1 (q 和 2q+1 一起筛选，q 通过素性检验后才检查 p)
+        if parallel:
+            p = generate_safe_prime(bits, k_miller_rabin, workers=workers or os.cpu_count())
+        else:
+            p = generate_safe_prime(bits, k_miller_rabin)
+        q = (p - 1) // 2
+
+        # 2. 选择 q 阶子群的生成元 g
+        g = _subgroup_generator(p)
+        if power(g, q, p) != 1:
+            raise ElGamalKeyGenerationError("Generator does not have prime order q")
+
+        # 3. 私钥 x 取自 [1, q-1]
+        x = random.randint(1, q - 1)
+    else:
+        # 1. 生成大素数 p
+        if prime_pool is not None:
+            p = prime_pool.take(bits)
+        elif parallel:
+            p = generate_large_prime(bits, k_miller_rabin, workers=workers or os.cpu_count())
+        else:
+            p = generate_prime(bits, k_miller_rabin)
+
+        # 2. 选择生成元 g
+        # 为了演示简便，尝试使用一个小的固定值，并确保1 < g < p
+        g = 0
+        possible_gs = [2, 3, 5, 7]
+
+        for g_candidate in possible_gs:
+            if 1 < g_candidate < p:
+                g = g_candidate
+                break
+
+        if g == 0:
+            if p > 2:
+                raise ElGamalKeyGenerationError("Could not find a suitable value for g")
+            elif p == 2:
+                raise ElGamalKeyGenerationError("The only suitable value for g is 1")
+
+        # 3. 生成私钥 x
+        try:
+            x = random.randint(1, p - 2)
+        except ValueError:
+            raise ElGamalKeyGenerationError("Could not generate a suitable value for x")
 
     # 4. 计算公钥 y = g^x mod p
-    y = power(g, x, p)
+    y = _generator_power(g, x, p)
 
     public_key = (p, g, y)
     private_key = (x)
@@ -76,6 +304,8 @@ def encrypt(public_key, message_int):
         public_key (tuple): ElGamal公钥 (p, g, y)。
         message_int (int): 要加密的明文，表示为一个整数。
                            调用者需要确保 0 <= message_int < p。
+                           明文不会被编码到 g 生成的子群中，使用安全素数或预定义群时
+                           密文会泄露 m 的勒让德符号 (见 generate_keys)。
 
     返回:
         tuple: 加密后的密文对 (c1, c2)。
@@ -92,7 +322,8 @@ def encrypt(public_key, message_int):
     except ValueError:
         raise ElGamalEncryptionError("Could not generate a suitable value for k")
 
-    c1 = power(g, k, p)
+    # 预定义群的 c1 = g^k 使用缓存的固定底数预计算表，新生成的 p 直接计算
+    c1 = _generator_power(g, k, p)
     
     s = power(y, k, p)
     if s == 0:
@@ -103,6 +334,176 @@ def encrypt(public_key, message_int):
 
     return ciphertext
 
+class ElGamalEncryptor:
+    """
+    把ElGamal加密拆成离线和在线两个阶段的加密器。
+
+    对固定的公钥 (p, g, y)，c1 = g^k 和共享密钥 s = y^k 都与明文无关。后台线程预先为随机的 k
+    计算 (g^k, y^k) 对并放入池中 (两者都使用固定底数预计算表)，在线加密时取出一对，
+    只需要一次模乘 c2 = m * s mod p。池为空时退回到实时计算 (未命中)。
+
+    每一对只会被取出一次: 重复使用同一个 k 会让两条密文的比值 c2/c2' 直接泄露明文的比值。
+    注意后台线程与调用方共享 GIL，预计算应安排在加密请求之间的空闲时间进行，
+    或者在启动前用 fill() 同步填满。
+    """
+
+    def __init__(self, public_key, pool_size=DEFAULT_EPHEMERAL_POOL_SIZE):
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.public_key = public_key
+        self.pool_size = pool_size
+
+        self._pool = deque()
+        self._hits = 0
+        self._misses = 0
+        self._produced = 0
+        self._hit_seconds = 0.0
+        self._miss_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ephemeral_pair(self):
+        """为一个新的随机 k 计算 (g^k mod p, y^k mod p)。"""
+        p, g, y = self.public_key
+        k = random.randint(1, p - 1)
+        return fixed_base_power(g, k, p), fixed_base_power(y, k, p)
+
+    # --- 离线阶段 ---
+
+    def start(self):
+        """启动后台预计算线程 (重复调用无副作用)。"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._produce_loop, name="elgamal-ephemeral-producer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """通知后台线程停止并等待其退出 (正在进行的一次预计算会先完成)。"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def fill(self, count=None):
+        """
+        在当前线程中同步补充预计算对，直到池中有 count 对 (默认填满到 pool_size)。
+
+        返回:
+            int: 本次新计算的对数。
+        """
+        target = self.pool_size if count is None else min(count, self.pool_size)
+        added = 0
+        while True:
+            with self._lock:
+                if len(self._pool) >= target:
+                    return added
+            pair = self._ephemeral_pair()
+            with self._lock:
+                self._pool.append(pair)
+                self._produced += 1
+            added += 1
+
+    def _produce_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                full = len(self._pool) >= self.pool_size
+            if full:
+                self._wakeup.wait(EPHEMERAL_PRODUCER_IDLE_WAIT_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            pair = self._ephemeral_pair()
+            with self._lock:
+                self._pool.append(pair)
+                self._produced += 1
+
+    # --- 在线阶段 ---
+
+    def encrypt(self, message_int):
+        """
+        加密一个整数表示的明文，与 encrypt(public_key, message_int) 的结果分布相同。
+
+        参数:
+            message_int (int): 要加密的明文，需满足 0 <= message_int < p。
+
+        返回:
+            tuple: 加密后的密文对 (c1, c2)。
+        Raises:
+            ElGamalEncryptionError: 如果明文格式不正确。
+        """
+        p = self.public_key[0]
+        if not isinstance(message_int, int) or message_int < 0 or message_int >= p:
+            raise ElGamalEncryptionError("Invalid message format")
+
+        start_time = time.perf_counter()
+        with self._lock:
+            pair = self._pool.popleft() if self._pool else None
+
+        if pair is None:
+            c1, s = self._ephemeral_pair()
+        else:
+            c1, s = pair
+        ciphertext = (c1, (message_int * s) % p)
+        elapsed = time.perf_counter() - start_time
+
+        with self._lock:
+            if pair is None:
+                self._misses += 1
+                self._miss_seconds += elapsed
+            else:
+                self._hits += 1
+                self._hit_seconds += elapsed
+        self._wakeup.set()
+        return ciphertext
+
+    def stats(self):
+        """
+        返回加密器的可观测指标。
+
+        返回:
+            dict: running、depth (池中剩余的对数)、pool_size、hits、misses、produced，
+                  以及命中和未命中时的平均在线加密耗时 avg_hit_ms / avg_miss_ms。
+        """
+        with self._lock:
+            return {
+                "running": self.is_running(),
+                "depth": len(self._pool),
+                "pool_size": self.pool_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "produced": self._produced,
+                "avg_hit_ms": self._hit_seconds * 1000 / self._hits if self._hits else 0.0,
+                "avg_miss_ms": self._miss_seconds * 1000 / self._misses if self._misses else 0.0
+            }
+
+def _check_private_key(private_key_x, p):
+    if not isinstance(private_key_x, int) or private_key_x <= 0 or private_key_x >= p -1 :
+        raise ElGamalDecryptionError("Invalid private key x")
+
+def _check_ciphertext(ciphertext, p):
+    """检查密文格式并返回 (c1, c2)。"""
+    if not (isinstance(ciphertext, tuple) and len(ciphertext) == 2):
+        raise ElGamalDecryptionError("Invalid ciphertext format")
+
+    c1, c2 = ciphertext
+
+    if not (isinstance(c1, int) and 0 <= c1 < p):
+        raise ElGamalDecryptionError("Invalid ciphertext c1")
+
+    if not (isinstance(c2, int) and 0 <= c2 < p):
+        raise ElGamalDecryptionError("Invalid ciphertext c2")
+
+    return c1, c2
+
 def decrypt(private_key_x, p, g, ciphertext):
     """
     使用ElGamal私钥 x 和公开参数 p, g 解密密文。
@@ -119,20 +520,9 @@ def decrypt(private_key_x, p, g, ciphertext):
     Raises:
         ElGamalDecryptionError: 如果解密失败或参数错误。
     """
-    if not isinstance(private_key_x, int) or private_key_x <= 0 or private_key_x >= p -1 :
-        raise ElGamalDecryptionError("Invalid private key x")
-    
-    if not (isinstance(ciphertext, tuple) and len(ciphertext) == 2):
-        raise ElGamalDecryptionError("Invalid ciphertext format")
-    
-    c1, c2 = ciphertext
+    _check_private_key(private_key_x, p)
+    c1, c2 = _check_ciphertext(ciphertext, p)
 
-    if not (isinstance(c1, int) and 0 <= c1 < p):
-        raise ElGamalDecryptionError("Invalid ciphertext c1")
-    
-    if not (isinstance(c2, int) and 0 <= c2 < p):
-        raise ElGamalDecryptionError("Invalid ciphertext c2")
-    
     # 1. 计算共享密钥 s = c1^x mod p
     s = power(c1, private_key_x, p)
 
@@ -150,6 +540,262 @@ def decrypt(private_key_x, p, g, ciphertext):
 
     return message_int
 
+def decrypt_many(private_key_x, p, g, ciphertexts):
+    """
+    使用同一个私钥批量解密多个密文，等价于 ElGamalPrivateKey(p, g, private_key_x).decrypt_many(ciphertexts)。
+
+    参数:
+        private_key_x (int): ElGamal私钥 x。
+        p (int): 公开参数，大素数模数。
+        g (int): 公开参数，生成元。
+        ciphertexts (list): 密文对 (c1, c2) 的列表。
+
+    返回:
+        list: 与 ciphertexts 顺序一致的明文整数列表。
+    Raises:
+        ElGamalDecryptionError: 如果某个密文格式错误或解密失败 (错误信息中包含该密文的下标)。
+    """
+    return ElGamalPrivateKey(p, g, private_key_x).decrypt_many(ciphertexts)
+
+class ElGamalPrivateKey:
+    """
+    可重复使用的ElGamal私钥上下文，保存 p, g, x 以及预先计算的指数 p-1-x。
+
+    由费马小定理，c1 != 0 时 c1^(p-1-x) = (c1^x)^-1 (mod p)，
+    因此解密只需要一次模幂 c1^(p-1-x) 和一次模乘，不需要求逆元；
+    私钥参数只在构造时检查一次。
+    """
+
+    def __init__(self, p, g, x):
+        _check_private_key(x, p)
+        self.p = p
+        self.g = g
+        self.x = x
+        self.inverse_exponent = p - 1 - x
+
+    def decrypt(self, ciphertext):
+        """
+        解密一个密文。
+
+        参数:
+            ciphertext (tuple): 要解密的密文对 (c1, c2)。
+
+        返回:
+            int: 解密后的明文整数。
+        Raises:
+            ElGamalDecryptionError: 如果密文格式错误或 c1 为 0。
+        """
+        c1, c2 = _check_ciphertext(ciphertext, self.p)
+        if c1 == 0:
+            raise ElGamalDecryptionError("shared key is zero")
+        # m = c2 * c1^(p-1-x) mod p
+        return (c2 * power(c1, self.inverse_exponent, self.p)) % self.p
+
+    def _prefers_batch_inverse(self, count):
+        """
+        批量求逆路径计算 c1^x，比 c1^(p-1-x) 少 (p-1-x).bit_length() - x.bit_length() 次平方，
+        但每个密文多 3 次模乘，整批再多一次求逆。只有 x 明显短于 p-1-x (如短指数私钥) 时才划算。
+        """
+        saved_per_ciphertext = self.inverse_exponent.bit_length() - self.x.bit_length() - 3
+        return count * saved_per_ciphertext > INVERSION_COST_MULTIPLICATIONS
+
+    def decrypt_many(self, ciphertexts):
+        """
+        批量解密多个密文。默认逐个使用无逆元的解密；x 比 p-1-x 短得多时，
+        改为计算所有 s_i = c1_i^x 并通过 batch_mod_inverse 一次求出它们的逆元。
+
+        参数:
+            ciphertexts (list): 密文对 (c1, c2) 的列表。
+
+        返回:
+            list: 与 ciphertexts 顺序一致的明文整数列表。
+        Raises:
+            ElGamalDecryptionError: 如果某个密文格式错误或解密失败 (错误信息中包含该密文的下标)。
+        """
+        p = self.p
+        pairs = []
+        for index, ciphertext in enumerate(ciphertexts):
+            try:
+                pairs.append(_check_ciphertext(ciphertext, p))
+            except ElGamalDecryptionError as e:
+                raise ElGamalDecryptionError(f"ciphertext {index}: {e}")
+
+        if self._prefers_batch_inverse(len(pairs)):
+            # 1. 计算每个密文的共享密钥 s_i = c1_i^x mod p
+            shared_keys = [power(c1, self.x, p) for c1, _ in pairs]
+
+            # 2. 一次求出所有 s_i 的逆元
+            try:
+                shared_key_inverses = batch_mod_inverse(shared_keys, p)
+            except BatchInverseError as e:
+                raise ElGamalDecryptionError(f"ciphertext {e.index}: modular inverse calculation failed:{e}")
+        else:
+            for index, (c1, _) in enumerate(pairs):
+                if c1 == 0:
+                    raise ElGamalDecryptionError(f"ciphertext {index}: shared key is zero")
+            shared_key_inverses = [power(c1, self.inverse_exponent, p) for c1, _ in pairs]
+
+        # 3. m_i = c2_i * s_i^-1 mod p
+        return [(c2 * s_inv) % p for (_, c2), s_inv in zip(pairs, shared_key_inverses)]
+
+# --- 分块模式: 任意长度字节消息 ---
+
+def message_block_size(p):
+    """
+    返回分块模式中每个明文块的字节数 b。b 字节的整数小于 2^(8b) <= 2^(p.bit_length()-1) < p。
+
+    Raises:
+        ValueError: 如果 p 太小，装不下一个字节。
+    """
+    block_size = (p.bit_length() - 1) // 8
+    if block_size < 1:
+        raise ValueError("Modulus p is too small for block mode")
+    return block_size
+
+def _encrypt_blocks(public_key, block_ints):
+    """进程池任务: 逐个加密一段明文块 (每块使用独立的随机 k)。"""
+    return [encrypt(public_key, block_int) for block_int in block_ints]
+
+def _decrypt_blocks(p, g, x, ciphertexts):
+    """进程池任务: 解密一段密文块。"""
+    return ElGamalPrivateKey(p, g, x).decrypt_many(ciphertexts)
+
+def _resolve_block_workers(workers, block_count):
+    """workers 为 None 时，块数达到 PARALLEL_BLOCK_THRESHOLD 才使用 CPU 核数个进程。"""
+    if workers is None:
+        workers = (os.cpu_count() or 1) if block_count >= PARALLEL_BLOCK_THRESHOLD else 1
+    return max(1, min(workers, block_count))
+
+def _split_evenly(items, parts):
+    """把 items 按顺序切成 parts 段连续的子列表。"""
+    size, extra = divmod(len(items), parts)
+    chunks = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+def encrypt_bytes(public_key, message_bytes, workers=None):
+    """
+    分块加密任意长度的字节消息。
+
+    消息前加上 MESSAGE_LENGTH_HEADER_BYTES 字节的长度头，补零到块大小的整数倍后切成
+    message_block_size(p) 字节的块，每块作为一个小于 p 的整数独立加密。
+
+    参数:
+        public_key (tuple): ElGamal公钥 (p, g, y)。
+        message_bytes (bytes): 要加密的消息。
+        workers (int, optional): 进程数。None 时块数达到 PARALLEL_BLOCK_THRESHOLD 才使用进程池，
+                                 1 表示在当前进程中顺序加密。
+
+    返回:
+        list: 密文对 (c1, c2) 的列表，每块一个。
+    Raises:
+        ElGamalEncryptionError: 如果消息不是字节串或 p 太小。
+    """
+    if not isinstance(message_bytes, (bytes, bytearray)):
+        raise ElGamalEncryptionError("Message must be bytes")
+    try:
+        block_size = message_block_size(public_key[0])
+    except ValueError as e:
+        raise ElGamalEncryptionError(str(e))
+
+    framed = len(message_bytes).to_bytes(MESSAGE_LENGTH_HEADER_BYTES, 'big') + bytes(message_bytes)
+    framed += bytes(-len(framed) % block_size)
+    block_ints = [int.from_bytes(framed[i:i + block_size], 'big') for i in range(0, len(framed), block_size)]
+
+    workers = _resolve_block_workers(workers, len(block_ints))
+    if workers == 1:
+        return _encrypt_blocks(public_key, block_ints)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(_encrypt_blocks, [public_key] * workers, _split_evenly(block_ints, workers))
+        return [ciphertext for chunk in chunks for ciphertext in chunk]
+
+def _iter_unframed_bytes(block_ints, block_size):
+    """
+    把按顺序解出的明文块还原为字节段，去掉长度头和末尾的补零。
+    消息结束后还有多余的块，或补零部分含有非零字节时，说明长度头与密文块不符。
+    """
+    header = b""
+    remaining = None
+    for index, block_int in enumerate(block_ints):
+        if block_int >= 1 << (8 * block_size):
+            raise ElGamalDecryptionError(f"ciphertext {index}: block out of range")
+        if remaining == 0:
+            raise ElGamalDecryptionError("Message length header does not match the ciphertext blocks")
+        data = block_int.to_bytes(block_size, 'big')
+
+        if remaining is None:
+            # p 很小时长度头可能跨越多个块
+            header += data
+            if len(header) < MESSAGE_LENGTH_HEADER_BYTES:
+                continue
+            remaining = int.from_bytes(header[:MESSAGE_LENGTH_HEADER_BYTES], 'big')
+            data = header[MESSAGE_LENGTH_HEADER_BYTES:]
+
+        chunk = data[:remaining]
+        remaining -= len(chunk)
+        if remaining == 0 and any(data[len(chunk):]):
+            raise ElGamalDecryptionError("Message length header does not match the ciphertext blocks")
+        if chunk:
+            yield chunk
+
+    if remaining is None or remaining > 0:
+        raise ElGamalDecryptionError("Message length header does not match the ciphertext blocks")
+
+def _iter_decrypted_blocks(private_key, ciphertexts):
+    for index, ciphertext in enumerate(ciphertexts):
+        try:
+            yield private_key.decrypt(ciphertext)
+        except ElGamalDecryptionError as e:
+            raise ElGamalDecryptionError(f"ciphertext {index}: {e}")
+
+def iter_decrypt_bytes(private_key, ciphertexts):
+    """
+    流式解密 encrypt_bytes 产生的密文块，按顺序逐段产出明文字节 (不含长度头和补零)。
+    ciphertexts 可以是任意可迭代对象 (例如从文件中逐块读取的生成器)，每次只解密一块。
+
+    参数:
+        private_key (ElGamalPrivateKey): 私钥上下文。
+        ciphertexts (iterable): 密文对 (c1, c2) 的序列。
+
+    返回:
+        generator: 依次产出 bytes。
+    Raises:
+        ElGamalDecryptionError: 如果某个密文块无效，或长度头与密文块数不符。
+    """
+    block_size = message_block_size(private_key.p)
+    yield from _iter_unframed_bytes(_iter_decrypted_blocks(private_key, ciphertexts), block_size)
+
+def decrypt_bytes(private_key, ciphertexts, workers=None):
+    """
+    解密 encrypt_bytes 产生的全部密文块并还原字节消息。
+
+    参数:
+        private_key (ElGamalPrivateKey): 私钥上下文。
+        ciphertexts (list): 密文对 (c1, c2) 的列表。
+        workers (int, optional): 进程数，含义同 encrypt_bytes。
+
+    返回:
+        bytes: 原始消息。
+    Raises:
+        ElGamalDecryptionError: 如果某个密文块无效，或长度头与密文块数不符。
+    """
+    ciphertexts = list(ciphertexts)
+    workers = _resolve_block_workers(workers, len(ciphertexts))
+    if workers == 1:
+        block_ints = private_key.decrypt_many(ciphertexts)
+    else:
+        p, g, x = private_key.p, private_key.g, private_key.x
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_decrypt_blocks, [p] * workers, [g] * workers, [x] * workers,
+                                  _split_evenly(ciphertexts, workers))
+            block_ints = [block_int for chunk in chunks for block_int in chunk]
+    return b"".join(_iter_unframed_bytes(block_ints, message_block_size(private_key.p)))
+
 if __name__ == '__main__':
     print("测试 ElGamal 密钥生成、加密和解密 (简化g选择)...")
     try:
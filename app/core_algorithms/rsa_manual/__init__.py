@@ -1 +1 @@
-from .rsa_core import generate_keys, encrypt_with_padding, decrypt_with_padding
\ No newline at end of file
+from .rsa_core import generate_keys, encrypt_with_padding, decrypt_with_padding, RSAPrivateKey
\ No newline at end of file
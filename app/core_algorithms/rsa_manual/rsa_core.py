@@ -1,9 +1,40 @@
 # app/core_algorithms/rsa_manual/rsa_core.py
 
-from app.utils.math_utils import power, extended_gcd, mod_inverse, generate_large_prime
+from app.utils.arithmetic_backend import power, extended_gcd, mod_inverse, generate_prime, is_prime
+from app.utils.math_utils import generate_large_primes
 
+import hashlib
+import io
+import mmap
 import random
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from math import gcd
+
+# 由 (n, e, d) 恢复 p, q 时最多尝试的随机底数个数 (每个底数的成功概率至少 1/2)
+FACTOR_RECOVERY_MAX_ATTEMPTS = 100
+# CRT 私钥缓存最多保存的密钥个数
+CRT_KEY_CACHE_SIZE = 128
+# Fiat 批量RSA默认的批量大小 (共享同一个 n 的公钥指数个数)
+DEFAULT_FIAT_BATCH_SIZE = 4
+
+# 混合加密: 会话密钥长度 (字节) 和流式处理时每次读取的块大小
+HYBRID_SESSION_KEY_BYTES = 32
+HYBRID_CHUNK_SIZE = 1 << 16
+
+# RSASSA-PKCS1-v1_5 签名支持的哈希算法及其 DigestInfo 的 DER 编码前缀 (RFC 8017 第 9.2 节注释 1)
+DIGEST_INFO_PREFIXES = {
+    "sha256": bytes.fromhex("3031300d060960864801650304020105000420"),
+    "sha384": bytes.fromhex("3041300d060960864801650304020205000430"),
+    "sha512": bytes.fromhex("3051300d060960864801650304020305000440")
+}
+DEFAULT_SIGNATURE_HASH = "sha256"
+
+# encrypt_many / decrypt_many 在 workers 为 None 时，消息数达到此值才使用进程池
+PARALLEL_BATCH_THRESHOLD = 64
 
 class RSAKeyGenerationError(Exception):
     pass
@@ -14,7 +45,268 @@ class RSAEncryptionError(Exception):
 class RSADecryptionError(Exception):
     pass
 
-def generate_keys(bits=2048, k_miller_rabin=20, e_value=65537):
+class RSASignatureError(Exception):
+    pass
+
+class RSAPrivateKey:
+    """
+    RSA私钥。除了 (n, d) 之外还可以保存 p, q 以及预先计算的 CRT 参数
+    dp = d mod (p-1)、dq = d mod (q-1) 和 qinv = q^-1 mod p。
+    多素数密钥 (RFC 8017 第 3.2 节) 的第 3 个及之后的素数 r_i 保存在 other_prime_infos 中，
+    每项为 (r_i, d_i, t_i)，其中 d_i = d mod (r_i - 1)，t_i = (r_1 * ... * r_(i-1))^-1 mod r_i。
+
+    对象可以像旧的 (n, d) 元组一样解包和索引 (n, d = private_key)，
+    因此所有接受 (n, d) 的代码不需要修改；解密时只要有 p 和 q 就走 CRT 路径。
+    公钥指数 e 是可选的，只用于检查 CRT 签名；未提供时由 d 和素因子算出 (见 public_exponent)。
+    """
+
+    def __init__(self, n, d, p=None, q=None, other_primes=(), e=None):
+        if (p is None) != (q is None):
+            raise ValueError("Both p and q are required for the CRT parameters")
+        if p is None and other_primes:
+            raise ValueError("Additional primes require p and q")
+
+        product = 1
+        for prime in [p, q, *other_primes] if p is not None else []:
+            product *= prime
+        if p is not None and product != n:
+            raise ValueError("Product of the primes does not match n")
+
+        self.n = n
+        self.d = d
+        self.e = e
+        self.p = p
+        self.q = q
+        self.other_prime_infos = []
+        if p is not None:
+            self.dp = d % (p - 1)
+            self.dq = d % (q - 1)
+            self.qinv = mod_inverse(q, p)
+            # R = r_1 * ... * r_(i-1)
+            r_product = p * q
+            for r in other_primes:
+                self.other_prime_infos.append((r, d % (r - 1), mod_inverse(r_product % r, r)))
+                r_product *= r
+        else:
+            self.dp = self.dq = self.qinv = None
+
+    @property
+    def primes(self):
+        """全部素因子 [p, q, r_3, ...]，没有 CRT 参数时为空列表。"""
+        if not self.has_crt:
+            return []
+        return [self.p, self.q] + [r for r, _, _ in self.other_prime_infos]
+
+    @property
+    def has_crt(self):
+        return self.p is not None
+
+    @property
+    def public_exponent(self):
+        """
+        公钥指数 e。构造时未提供且有素因子时按 e = d^-1 mod λ(n) 算出并保存
+        (λ(n) 为各 r_i - 1 的最小公倍数)，既没有 e 也没有素因子时为 None。
+        """
+        if self.e is None and self.has_crt:
+            carmichael = 1
+            for prime in self.primes:
+                carmichael = carmichael * (prime - 1) // gcd(carmichael, prime - 1)
+            self.e = mod_inverse(self.d % carmichael, carmichael)
+        return self.e
+
+    def __iter__(self):
+        return iter((self.n, self.d))
+
+    def __getitem__(self, index):
+        return (self.n, self.d)[index]
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return f"RSAPrivateKey(n={self.n}, has_crt={self.has_crt}, num_primes={len(self.primes)})"
+
+    def private_power(self, c_int):
+        """
+        计算 c^d mod n。有 CRT 参数时使用 Garner 重组:
+        m1 = c^dp mod p, m2 = c^dq mod q, h = qinv * (m1 - m2) mod p, m = m2 + h * q，
+        两次模幂的模数和指数都只有 n 和 d 的一半长，总耗时约为直接计算的 1/4。
+        多素数密钥按 RFC 8017 第 5.1.2 节继续合并: m_i = c^d_i mod r_i，h = (m_i - m) * t_i mod r_i，m = m + R * h。
+        """
+        if not self.has_crt:
+            return power(c_int, self.d, self.n)
+        m1 = power(c_int % self.p, self.dp, self.p)
+        m2 = power(c_int % self.q, self.dq, self.q)
+        h = (self.qinv * (m1 - m2)) % self.p
+        m = m2 + h * self.q
+
+        r_product = self.p * self.q
+        for r, d_i, t_i in self.other_prime_infos:
+            m_i = power(c_int % r, d_i, r)
+            h = ((m_i - m) * t_i) % r
+            m += r_product * h
+            r_product *= r
+        return m
+
+def _split_modulus(m, r, t):
+    """
+    用 e*d - 1 = 2^t * r 找出合数 m 的一个非平凡因子 (λ(m) 整除 λ(n)，所以同一个 r, t 对 n 的每个因子都适用)。
+    每个随机底数至少有 1/2 的概率成功。
+    """
+    for _ in range(FACTOR_RECOVERY_MAX_ATTEMPTS):
+        g = random.randint(2, m - 2)
+        factor = gcd(g, m)
+        if factor != 1:
+            # 极少见: 随机底数恰好与 m 有公因子
+            return factor
+
+        y = power(g, r, m)
+        if y == 1 or y == m - 1:
+            continue
+        for _ in range(t):
+            x = (y * y) % m
+            if x == 1:
+                return gcd(y - 1, m)
+            if x == m - 1:
+                break
+            y = x
+        else:
+            # g^(2^t * r) != 1，说明 e*d 不满足 e*d ≡ 1 (mod λ(n))
+            raise ValueError("Invalid RSA key parameters")
+
+    raise ValueError("Could not factor n from (n, e, d)")
+
+def recover_prime_factors(n, e, d):
+    """
+    由公钥指数 e 和私钥指数 d 分解模数 n (RFC 8017 附录 / NIST SP 800-56B 中的标准概率方法)。
+
+    e*d - 1 = k 是 λ(n) 的倍数，写成 k = 2^t * r (r 为奇数)。对随机底数 g 计算 y = g^r mod n
+    并反复平方，若某一步出现 y != ±1 而 y^2 = 1，则 y 是 1 的非平凡平方根，gcd(y - 1, n) 就是 n 的一个因子。
+    多素数密钥的合数因子用同样的 r, t 继续分解，直到所有因子都是素数。
+
+    参数:
+        n (int): RSA 模数。
+        e (int): 公钥指数。
+        d (int): 私钥指数。
+
+    返回:
+        list: n 的全部素因子，按从大到小排列 (两素数密钥为 [p, q]，p > q)。
+    Raises:
+        ValueError: 如果 (n, e, d) 不是一组有效的 RSA 密钥，或多次尝试后仍未能分解 n。
+    """
+    if n < 6 or e < 2 or d < 2:
+        raise ValueError("Invalid RSA key parameters")
+    k = e * d - 1
+    if k % 2 != 0:
+        raise ValueError("Invalid RSA key parameters")
+
+    r = k
+    t = 0
+    while r % 2 == 0:
+        r //= 2
+        t += 1
+
+    factor = _split_modulus(n, r, t)
+    primes = []
+    pending = [factor, n // factor]
+    while pending:
+        m = pending.pop()
+        if is_prime(m):
+            primes.append(m)
+        else:
+            factor = _split_modulus(m, r, t)
+            pending.extend([factor, m // factor])
+    return sorted(primes, reverse=True)
+
+class CRTKeyCache:
+    """
+    按 (n, d) 的指纹缓存由 recover_prime_factors 恢复出的 RSAPrivateKey 的 LRU 缓存。
+
+    只持有 (n, d) 的客户端 (如 /api/rsa/decrypt) 第一次解密时付出一次分解的代价，
+    之后同一把密钥的解密都走 CRT 路径。分解失败 (例如请求漏填或填错了 e) 时只计数并返回
+    不带 CRT 参数的 RSAPrivateKey，不写入缓存，这样之后带正确 e 的请求仍能恢复出 CRT 参数。
+    """
+
+    def __init__(self, max_size=CRT_KEY_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(n, d):
+        """(n, d) 的 SHA-256 指纹 (十六进制字符串)，用作缓存键。"""
+        return hashlib.sha256(f"{n:x}:{d:x}".encode("ascii")).hexdigest()
+
+    def get_private_key(self, n, e, d):
+        """
+        返回 (n, d) 对应的 RSAPrivateKey。缓存未命中时由 (n, e, d) 恢复 p 和 q。
+
+        返回:
+            RSAPrivateKey: 恢复成功时带有 CRT 参数 (has_crt 为 True) 并写入缓存；
+                失败时不带 CRT 参数，且不写入缓存。
+        """
+        key_id = self.fingerprint(n, d)
+        with self._lock:
+            private_key = self._keys.get(key_id)
+            if private_key is not None and private_key.n == n and private_key.d == d:
+                self._keys.move_to_end(key_id)
+                self._hits += 1
+                return private_key
+            self._misses += 1
+
+        # 分解在锁外进行，不阻塞其他密钥的缓存查询
+        try:
+            p, q, *other_primes = recover_prime_factors(n, e, d)
+            private_key = RSAPrivateKey(n, d, p, q, other_primes, e=e)
+        except ValueError:
+            private_key = RSAPrivateKey(n, d, e=e)
+
+        with self._lock:
+            if not private_key.has_crt:
+                self._failures += 1
+                return private_key
+            self._keys[key_id] = private_key
+            self._keys.move_to_end(key_id)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return private_key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def stats(self):
+        """
+        返回缓存的可观测指标。
+
+        返回:
+            dict: size、max_size、hits、misses、failures (分解失败、退回非 CRT 解密的次数) 和 hit_rate。
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._keys),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "failures": self._failures,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+# 进程内共享的 CRT 私钥缓存
+crt_key_cache = CRTKeyCache()
+
+def get_crt_private_key(n, e, d):
+    """从进程内共享的 crt_key_cache 中获取 (n, d) 对应的 RSAPrivateKey，见 CRTKeyCache.get_private_key。"""
+    return crt_key_cache.get_private_key(n, e, d)
+
+def generate_keys(bits=2048, k_miller_rabin=20, e_value=65537, parallel=False, workers=None, prime_pool=None,
+                  num_primes=2):
     """
     生成RSA公钥和私钥对。
 
@@ -23,39 +315,55 @@ def generate_keys(bits=2048, k_miller_rabin=20, e_value=65537):
                     通常是 1024, 2048, 3072, 4096 等。
         k_miller_rabin (int): 用于素性检验的米勒-拉宾测试轮数。
         e_value (int): 公钥指数 e 的期望值。通常是 65537。
+        parallel (bool): 为 True 时用进程池同时搜索 p 和 q。
+        workers (int, optional): 并行搜索的进程数，默认为 CPU 核数。
+        prime_pool (PrimePool, optional): 预先生成的素数池。提供时 p 和 q 从池中取出，
+                                          池为空时由池退回到实时搜索。
+        num_primes (int): 素因子个数 (RFC 8017 的多素数 RSA)。大于 2 时 n 由 num_primes 个
+                          约 bits/num_primes 位的素数相乘得到，素数搜索和 CRT 解密都更快。
 
     返回:
-        tuple: ((n, e), (n, d)) 其中 (n, e) 是公钥，(n, d) 是私钥。
+        tuple: ((n, e), private_key) 其中 (n, e) 是公钥，private_key 是保存了 p, q 和 CRT 参数的
+               RSAPrivateKey (可以像 (n, d) 元组一样使用)。
                或者在错误时抛出 RSAKeyGenerationError。
     """
     # if bits < 512:
     #     raise RSAKeyGenerationError("Number of bits must be at least 512")
-    if bits % 2 != 0:
+    if num_primes < 2:
+        raise RSAKeyGenerationError("Number of primes must be at least 2")
+    if num_primes == 2 and bits % 2 != 0:
         raise RSAKeyGenerationError("Number of bits must be even")
-    
-    prime_bits = bits // 2
+    if bits // num_primes < 2:
+        raise RSAKeyGenerationError(f"Number of bits is too small for {num_primes} primes")
 
-    #  print(f"开始生成 {prime_bits}-bit 的素数 p 和 q...")
-    p = generate_large_prime(prime_bits, k_miller_rabin)
-    # print(f"p = {p}")
+    # 各素数的比特长度尽量平均，两素数时 p 和 q 都是 bits/2 位
+    prime_sizes = [bits // num_primes + (1 if i < bits % num_primes else 0) for i in range(num_primes)]
 
-    q = generate_large_prime(prime_bits, k_miller_rabin)
-    # print(f"q = {q}")
+    if prime_pool is not None:
+        primes = [prime_pool.take(prime_bits) for prime_bits in prime_sizes]
+    elif parallel:
+        # generate_large_primes 保证同一比特长度下返回的素数互不相同
+        primes = []
+        for prime_bits in sorted(set(prime_sizes), reverse=True):
+            primes += generate_large_primes(prime_bits, prime_sizes.count(prime_bits), k_miller_rabin,
+                                            workers=workers or os.cpu_count())
+    else:
+        primes = [generate_prime(prime_bits, k_miller_rabin) for prime_bits in prime_sizes]
 
-    max_attempts_for_distinct_q = 10
-    attempts = 0
-    while p == q and attempts < max_attempts_for_distinct_q:
-        q = generate_large_prime(prime_bits, k_miller_rabin)
-        attempts += 1
+    max_attempts_for_distinct_primes = 10
+    for i in range(1, num_primes):
+        attempts = 0
+        while primes[i] in primes[:i] and attempts < max_attempts_for_distinct_primes:
+            primes[i] = generate_prime(prime_sizes[i], k_miller_rabin)
+            attempts += 1
+        if primes[i] in primes[:i]:
+            raise RSAKeyGenerationError("Failed to generate distinct primes")
 
-    if p == q:
-        raise RSAKeyGenerationError("Failed to generate distinct primes p and q")
-    
-    n = p * q
-    # print(f"n = {n}")
-    
-    phi_n = (p - 1) * (q - 1)
-    # print(f"phi_n = {phi_n}")
+    n = 1
+    phi_n = 1
+    for prime in primes:
+        n *= prime
+        phi_n *= prime - 1
 
     e = e_value
     if not (1 < e < phi_n):
@@ -69,16 +377,30 @@ def generate_keys(bits=2048, k_miller_rabin=20, e_value=65537):
         d = mod_inverse(e, phi_n)
     except ValueError as err:
         raise RSAKeyGenerationError("Invalid value of e") from err
-    
-    return ((n, e), (n, d))
 
-def _pkcs1_v1_5_pad_for_encryption(message_bytes, n_byte_len):
+    p, q, *other_primes = primes
+    return ((n, e), RSAPrivateKey(n, d, p, q, other_primes, e=e))
+
+def _nonzero_random_bytes(length):
+    """
+    返回 length 个非零随机字节。一次从 os.urandom 取一整块并去掉其中的零字节，
+    不够时再补取 (每个字节为零的概率只有 1/256)。
+    """
+    buffer = b''
+    while len(buffer) < length:
+        needed = length - len(buffer)
+        buffer += os.urandom(needed + needed // 64 + 8).replace(b'\x00', b'')
+    return buffer[:length]
+
+def _pkcs1_v1_5_pad_for_encryption(message_bytes, n_byte_len, padding_string=None):
     """
     对消息进行 RSAES-PKCS1-v1_5 填充。
 
     参数:
         message_bytes (bytes): 原始明文字节串。
         n_byte_len (int): RSA模数n的字节长度 (k)。
+        padding_string (bytes, optional): 调用方预先取好的 k - mLen - 3 个非零随机字节 (批量加密时使用)，
+                                          默认在这里生成。
 
     返回:
         bytes: 填充后的编码消息 EM，长度为 n_byte_len。
@@ -92,11 +414,7 @@ def _pkcs1_v1_5_pad_for_encryption(message_bytes, n_byte_len):
     
     ps_len = n_byte_len - m_len - 3
 
-    ps = b''
-    while len(ps) < ps_len:
-        random_byte = os.urandom(1)
-        if random_byte != b'\x00':
-            ps += random_byte
+    ps = _nonzero_random_bytes(ps_len) if padding_string is None else padding_string
 
     em = b'\x00\x02' + ps + b'\x00' + message_bytes
 
@@ -177,9 +495,10 @@ def encrypt_with_padding(public_key, message_bytes):
 def decrypt_with_padding(private_key, ciphertext_bytes):
     """
     使用RSA私钥解密经过PKCS#1 v1.5填充的密文。
+    private_key 是带有 CRT 参数的 RSAPrivateKey 时使用 CRT 解密，否则直接计算 c^d mod n。
 
     参数:
-        private_key (tuple): RSA私钥 (n, d)。
+        private_key (RSAPrivateKey or tuple): RSA私钥，RSAPrivateKey 或 (n, d)。
         ciphertext_bytes (bytes): 要解密的密文字节串。
 
     返回:
@@ -199,7 +518,10 @@ def decrypt_with_padding(private_key, ciphertext_bytes):
     
     c_int = int.from_bytes(ciphertext_bytes, byteorder='big')
     
-    m_int = power(c_int, d, n)
+    if isinstance(private_key, RSAPrivateKey):
+        m_int = private_key.private_power(c_int)
+    else:
+        m_int = power(c_int, d, n)
     
     try:
         encoded_message_em = m_int.to_bytes(k, byteorder='big')
@@ -210,6 +532,531 @@ def decrypt_with_padding(private_key, ciphertext_bytes):
     
     return original_message_bytes
 
+def _resolve_batch_workers(workers, count):
+    """workers 为 None 时，批量达到 PARALLEL_BATCH_THRESHOLD 才使用 CPU 核数个进程。"""
+    if workers is None:
+        workers = (os.cpu_count() or 1) if count >= PARALLEL_BATCH_THRESHOLD else 1
+    return max(1, min(workers, count))
+
+def _map_batch(func, items, workers):
+    """顺序或在进程池中对 items 逐个调用 func，保持顺序；进程池中每个进程处理连续的一段。"""
+    if workers == 1:
+        return [func(item) for item in items]
+    chunk_size = -(-len(items) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunk_size))
+
+def _private_power(private_key, c_int):
+    if isinstance(private_key, RSAPrivateKey):
+        return private_key.private_power(c_int)
+    n, d = private_key
+    return power(c_int, d, n)
+
+def encrypt_many(public_key, messages, workers=None):
+    """
+    使用同一个RSA公钥和PKCS#1 v1.5填充批量加密多条消息。
+
+    k 只计算一次，所有消息的填充随机数从一次取出的随机字节缓冲区中切分；
+    消息较多时模幂运算分配到进程池中 (子进程使用其启动时的默认运算后端)。
+
+    参数:
+        public_key (tuple): RSA公钥 (n, e)。
+        messages (list): 原始明文字节串的列表。
+        workers (int, optional): 进程数。None 时消息数达到 PARALLEL_BATCH_THRESHOLD 才使用进程池，
+                                 1 表示在当前进程中顺序加密。
+
+    返回:
+        list: 与 messages 顺序一致的密文字节串列表。
+    Raises:
+        RSAEncryptionError, TypeError: 错误信息中包含出错消息的下标。
+    """
+    n, e = public_key
+    k = (n.bit_length() + 7) // 8
+
+    for index, message_bytes in enumerate(messages):
+        if not isinstance(message_bytes, bytes):
+            raise TypeError(f"message {index}: Message must be bytes")
+        if len(message_bytes) > k - 11:
+            raise RSAEncryptionError(f"message {index}: Message too long for RSAES-PKCS1-v1_5")
+
+    ps_lengths = [k - len(message_bytes) - 3 for message_bytes in messages]
+    random_buffer = _nonzero_random_bytes(sum(ps_lengths))
+
+    m_ints = []
+    offset = 0
+    for message_bytes, ps_len in zip(messages, ps_lengths):
+        em = _pkcs1_v1_5_pad_for_encryption(message_bytes, k, random_buffer[offset:offset + ps_len])
+        offset += ps_len
+        m_ints.append(int.from_bytes(em, byteorder='big'))
+
+    c_ints = _map_batch(partial(power, exp=e, mod=n), m_ints, _resolve_batch_workers(workers, len(m_ints)))
+    return [c_int.to_bytes(k, byteorder='big') for c_int in c_ints]
+
+def decrypt_many(private_key, ciphertexts, workers=None):
+    """
+    使用同一个RSA私钥批量解密多条PKCS#1 v1.5密文。
+
+    k 只计算一次；private_key 是带有 CRT 参数的 RSAPrivateKey 时每条密文都使用 CRT 解密。
+    密文较多时模幂运算分配到进程池中，去填充在当前进程中进行。
+
+    参数:
+        private_key (RSAPrivateKey or tuple): RSA私钥，RSAPrivateKey 或 (n, d)。
+        ciphertexts (list): 密文字节串的列表。
+        workers (int, optional): 进程数，含义同 encrypt_many。
+
+    返回:
+        list: 与 ciphertexts 顺序一致的明文字节串列表。
+    Raises:
+        RSADecryptionError, TypeError: 错误信息中包含出错密文的下标。
+    """
+    n, d = private_key
+    k = (n.bit_length() + 7) // 8
+
+    c_ints = []
+    for index, ciphertext_bytes in enumerate(ciphertexts):
+        if not isinstance(ciphertext_bytes, bytes):
+            raise TypeError(f"ciphertext {index}: Ciphertext must be bytes")
+        if len(ciphertext_bytes) != k:
+            raise RSADecryptionError(f"ciphertext {index}: Ciphertext too long for RSAES-PKCS1-v1_5")
+        c_ints.append(int.from_bytes(ciphertext_bytes, byteorder='big'))
+
+    m_ints = _map_batch(partial(_private_power, private_key), c_ints, _resolve_batch_workers(workers, len(c_ints)))
+
+    messages = []
+    for index, m_int in enumerate(m_ints):
+        try:
+            encoded_message_em = m_int.to_bytes(k, byteorder='big')
+            messages.append(_pkcs1_v1_5_unpad_for_encryption(encoded_message_em, k))
+        except (OverflowError, RSADecryptionError):
+            raise RSADecryptionError(f"ciphertext {index}: Invalid RSAES-PKCS1-v1_5 encoding")
+    return messages
+
+# --- RSASSA-PKCS1-v1_5 签名 ---
+
+def _digest_info_prefix(hash_name):
+    if hash_name not in DIGEST_INFO_PREFIXES:
+        raise ValueError(f"Unsupported hash algorithm: {hash_name}")
+    return DIGEST_INFO_PREFIXES[hash_name]
+
+def _emsa_pkcs1_v1_5_header(hash_name, n_byte_len):
+    """
+    EMSA-PKCS1-v1_5 编码中与消息无关的部分: 0x00 || 0x01 || PS (0xff...) || 0x00 || DigestInfo 前缀。
+    编码消息 EM 就是这个头部后面接上消息的哈希值。
+
+    Raises:
+        RSASignatureError: 如果模数太短，放不下 DigestInfo 和至少 8 字节的 PS。
+        ValueError: 如果哈希算法不受支持。
+    """
+    prefix = _digest_info_prefix(hash_name)
+    digest_len = hashlib.new(hash_name).digest_size
+    ps_len = n_byte_len - len(prefix) - digest_len - 3
+    if ps_len < 8:
+        raise RSASignatureError("Intended encoded message length too short")
+    return b'\x00\x01' + b'\xff' * ps_len + b'\x00' + prefix
+
+def sign(private_key, message_bytes, hash_name=DEFAULT_SIGNATURE_HASH):
+    """
+    使用RSA私钥生成 RSASSA-PKCS1-v1_5 签名。
+    private_key 是带有 CRT 参数的 RSAPrivateKey 时使用 CRT 计算 m^d mod n，并在返回前
+    检查 s^e mod n == m: 任一半的模幂出错时，错误的签名会泄露 n 的因子 (Bellcore/Lenstra 攻击)。
+
+    参数:
+        private_key (RSAPrivateKey or tuple): RSA私钥，RSAPrivateKey 或 (n, d)。
+        message_bytes (bytes): 要签名的消息。
+        hash_name (str): 哈希算法，"sha256"、"sha384" 或 "sha512"。
+
+    返回:
+        bytes: k 字节的签名。
+    Raises:
+        RSASignatureError: 如果模数太短，或 CRT 签名没有通过检查 (不返回错误的签名)。
+        TypeError, ValueError
+    """
+    n, d = private_key
+
+    if not isinstance(message_bytes, bytes):
+        raise TypeError("Message must be bytes")
+
+    k = (n.bit_length() + 7) // 8
+    encoded_message_em = _emsa_pkcs1_v1_5_header(hash_name, k) + hashlib.new(hash_name, message_bytes).digest()
+    m_int = int.from_bytes(encoded_message_em, byteorder='big')
+
+    s_int = _private_power(private_key, m_int)
+    if isinstance(private_key, RSAPrivateKey) and private_key.has_crt:
+        if power(s_int, private_key.public_exponent, n) != m_int:
+            raise RSASignatureError("CRT signature failed the consistency check")
+    return s_int.to_bytes(k, byteorder='big')
+
+def verify(public_key, message_bytes, signature_bytes, hash_name=DEFAULT_SIGNATURE_HASH):
+    """
+    验证 RSASSA-PKCS1-v1_5 签名。按 RFC 8017 的建议重新编码消息并与 s^e mod n 整体比较，
+    而不是解析签名中的编码。
+
+    参数:
+        public_key (tuple): RSA公钥 (n, e)。
+        message_bytes (bytes): 被签名的消息。
+        signature_bytes (bytes): 签名。
+        hash_name (str): 哈希算法，与签名时一致。
+
+    返回:
+        bool: 签名有效时为 True。
+    Raises:
+        TypeError: 如果消息或签名不是 bytes。
+        ValueError: 如果哈希算法不受支持。
+    """
+    return verify_many(public_key, [(message_bytes, signature_bytes)], hash_name, workers=1)[0]
+
+def verify_many(public_key, pairs, hash_name=DEFAULT_SIGNATURE_HASH, workers=None):
+    """
+    使用同一个RSA公钥批量验证多个 (消息, 签名) 对。
+
+    k 和编码头部 (0x00 01 ff...ff 00 || DigestInfo 前缀) 只计算一次，每条消息只需哈希一次并拼接成整数；
+    签名较多时模幂运算 s^e mod n 分配到进程池中，每个进程处理连续的一段。
+
+    参数:
+        public_key (tuple): RSA公钥 (n, e)。
+        pairs (list): (message_bytes, signature_bytes) 的列表。
+        hash_name (str): 哈希算法。
+        workers (int, optional): 进程数，含义同 encrypt_many。
+
+    返回:
+        list: 与 pairs 顺序一致的布尔值列表。
+    Raises:
+        TypeError: 如果某个消息或签名不是 bytes (错误信息中包含下标)。
+        ValueError: 如果哈希算法不受支持。
+    """
+    n, e = public_key
+    k = (n.bit_length() + 7) // 8
+    try:
+        header = _emsa_pkcs1_v1_5_header(hash_name, k)
+    except RSASignatureError:
+        # 模数太短时不可能有有效签名
+        return [False] * len(pairs)
+    digest_bits = 8 * hashlib.new(hash_name).digest_size
+    header_int = int.from_bytes(header, byteorder='big') << digest_bits
+
+    expected_ints = []
+    s_ints = []
+    for index, (message_bytes, signature_bytes) in enumerate(pairs):
+        if not isinstance(message_bytes, bytes):
+            raise TypeError(f"pair {index}: Message must be bytes")
+        if not isinstance(signature_bytes, bytes):
+            raise TypeError(f"pair {index}: Signature must be bytes")
+        s_int = int.from_bytes(signature_bytes, byteorder='big')
+        if len(signature_bytes) != k or s_int >= n:
+            # 长度或取值范围不对的签名无需模幂，直接判为无效
+            expected_ints.append(None)
+            continue
+        digest = hashlib.new(hash_name, message_bytes).digest()
+        expected_ints.append(header_int | int.from_bytes(digest, byteorder='big'))
+        s_ints.append(s_int)
+
+    m_ints = iter(_map_batch(partial(power, exp=e, mod=n), s_ints, _resolve_batch_workers(workers, len(s_ints))))
+    return [expected is not None and next(m_ints) == expected for expected in expected_ints]
+
+# --- Fiat 批量RSA (实验性) ---
+
+class RSABatchKey:
+    """
+    Fiat 批量RSA的密钥: 同一个模数 n 上的一组两两互素的小公钥指数 e_1, ..., e_b。
+
+    用 e_i 加密的密文 c_i 可以一起解密: 先沿乘积树向上把 c_i 合并成 A = (m_1 * ... * m_b)^E
+    (E = e_1 * ... * e_b)，只做一次全长的模幂 A^(1/E)，再沿树向下用小指数模幂和模逆元把乘积拆回各个 m_i。
+    实验性质: 小公钥指数 (3, 5, 7, ...) 只适合配合随机填充使用。
+    """
+
+    def __init__(self, private_key, exponents):
+        if not isinstance(private_key, RSAPrivateKey) or not private_key.has_crt:
+            raise ValueError("Batch RSA requires a private key with its prime factors")
+        if not exponents:
+            raise ValueError("At least one public exponent is required")
+
+        self.private_key = private_key
+        self.n = private_key.n
+        self.exponents = list(exponents)
+
+        self.phi_n = 1
+        for prime in private_key.primes:
+            self.phi_n *= prime - 1
+        for i, e in enumerate(self.exponents):
+            if e < 3 or gcd(e, self.phi_n) != 1:
+                raise ValueError(f"Exponent {e} is not coprime to phi(n)")
+            if any(gcd(e, other) != 1 for other in self.exponents[:i]):
+                raise ValueError("Batch exponents must be pairwise coprime")
+
+    @property
+    def public_keys(self):
+        """每个公钥指数对应的公钥 (n, e_i)，第 i 条消息用第 i 个公钥加密。"""
+        return [(self.n, e) for e in self.exponents]
+
+    def private_key_for(self, index):
+        """第 index 个公钥指数单独使用时的 RSAPrivateKey (d_i = e_i^-1 mod phi(n))，用于逐条解密。"""
+        p, q, *other_primes = self.private_key.primes
+        return RSAPrivateKey(self.n, mod_inverse(self.exponents[index], self.phi_n), p, q, other_primes)
+
+    def _root_power(self, a, exponent_product):
+        """计算 a^(1/E) mod n，用 CRT 完成这次唯一的全长模幂。"""
+        p, q, *other_primes = self.private_key.primes
+        root_key = RSAPrivateKey(self.n, mod_inverse(exponent_product, self.phi_n), p, q, other_primes)
+        return root_key.private_power(a)
+
+    def batch_private_power(self, c_ints):
+        """
+        批量计算 m_i = c_i^(1/e_i) mod n，c_ints[i] 对应 exponents[i]。
+
+        返回:
+            list: 与 c_ints 顺序一致的 m_i。
+        Raises:
+            ValueError: 如果密文个数超过公钥指数个数，或某个中间值与 n 不互素。
+        """
+        if len(c_ints) > len(self.exponents):
+            raise ValueError("More ciphertexts than batch exponents")
+        if not c_ints:
+            return []
+        n = self.n
+
+        # 1. 向上: 叶子为 (c_i, e_i)，内部节点的值 v = v_L^E_R * v_R^E_L = (∏ m_i)^E，E = E_L * E_R
+        def build(lo, hi):
+            if hi - lo == 1:
+                return (c_ints[lo] % n, self.exponents[lo], None, None)
+            mid = (lo + hi) // 2
+            left, right = build(lo, mid), build(mid, hi)
+            value = (power(left[0], right[1], n) * power(right[0], left[1], n)) % n
+            return (value, left[1] * right[1], left, right)
+
+        root = build(0, len(c_ints))
+
+        # 2. 唯一的全长模幂: M = A^(1/E) = ∏ m_i
+        messages = []
+
+        # 3. 向下: 取 x ≡ 0 (mod E_L)、x ≡ 1 (mod E_R)，则 M^x = v_L^(x/E_L) * M_R * v_R^((x-1)/E_R)
+        def split(node, m_product):
+            _, _, left, right = node
+            if left is None:
+                messages.append(m_product)
+                return
+            left_e, right_e = left[1], right[1]
+            x = left_e * mod_inverse(left_e, right_e) if right_e > 1 else 0
+            denominator = (power(left[0], x // left_e, n) * power(right[0], (x - 1) // right_e, n)) % n
+            m_right = (power(m_product, x, n) * mod_inverse(denominator, n)) % n
+            m_left = (m_product * mod_inverse(m_right, n)) % n
+            split(left, m_left)
+            split(right, m_right)
+
+        split(root, self._root_power(root[0], root[1]))
+        return messages
+
+def generate_batch_keys(bits=2048, batch_size=DEFAULT_FIAT_BATCH_SIZE, k_miller_rabin=20, **kwargs):
+    """
+    生成 Fiat 批量RSA密钥: 一个模数 n 和 batch_size 个两两互素的小公钥指数
+    (从 3 开始依次选取与 phi(n) 互素的奇素数)。
+
+    参数:
+        bits (int): 模数 n 的期望比特长度。
+        batch_size (int): 公钥指数的个数，即一次批量解密最多的密文数。
+        k_miller_rabin (int): 用于素性检验的米勒-拉宾测试轮数。
+        **kwargs: 传给 generate_keys 的其余参数 (parallel、workers、prime_pool、num_primes)。
+
+    返回:
+        RSABatchKey
+    Raises:
+        RSAKeyGenerationError: 如果 batch_size 小于 1 或密钥生成失败。
+    """
+    if batch_size < 1:
+        raise RSAKeyGenerationError("Batch size must be at least 1")
+    _, private_key = generate_keys(bits, k_miller_rabin, **kwargs)
+
+    phi_n = 1
+    for prime in private_key.primes:
+        phi_n *= prime - 1
+    exponents = []
+    candidate = 3
+    while len(exponents) < batch_size:
+        if is_prime(candidate) and gcd(candidate, phi_n) == 1:
+            exponents.append(candidate)
+        candidate += 2
+    return RSABatchKey(private_key, exponents)
+
+def batch_decrypt(batch_key, ciphertexts):
+    """
+    Fiat 批量解密: 第 i 条密文是用 batch_key.public_keys[i] 和 PKCS#1 v1.5 填充加密的。
+
+    参数:
+        batch_key (RSABatchKey): 批量RSA密钥。
+        ciphertexts (list): 密文字节串的列表，长度不超过公钥指数个数。
+
+    返回:
+        list: 与 ciphertexts 顺序一致的明文字节串列表。
+    Raises:
+        RSADecryptionError, TypeError: 错误信息中包含出错密文的下标。
+    """
+    n = batch_key.n
+    k = (n.bit_length() + 7) // 8
+    if len(ciphertexts) > len(batch_key.exponents):
+        raise RSADecryptionError("More ciphertexts than batch exponents")
+
+    c_ints = []
+    for index, ciphertext_bytes in enumerate(ciphertexts):
+        if not isinstance(ciphertext_bytes, bytes):
+            raise TypeError(f"ciphertext {index}: Ciphertext must be bytes")
+        if len(ciphertext_bytes) != k:
+            raise RSADecryptionError(f"ciphertext {index}: Ciphertext too long for RSAES-PKCS1-v1_5")
+        c_ints.append(int.from_bytes(ciphertext_bytes, byteorder='big'))
+
+    try:
+        m_ints = batch_key.batch_private_power(c_ints)
+    except ValueError as e:
+        raise RSADecryptionError(f"batch decryption failed: {e}")
+
+    messages = []
+    for index, m_int in enumerate(m_ints):
+        try:
+            messages.append(_pkcs1_v1_5_unpad_for_encryption(m_int.to_bytes(k, byteorder='big'), k))
+        except (OverflowError, RSADecryptionError):
+            raise RSADecryptionError(f"ciphertext {index}: Invalid RSAES-PKCS1-v1_5 encoding")
+    return messages
+
+# --- 混合加密: RSA 封装会话密钥，SHA-256 计数器密钥流加密数据 ---
+
+class _Sha256CounterKeystream:
+    """
+    密钥流 SHA256(session_key || counter) (counter 为 8 字节大端整数，从 0 开始)。
+    xor 可以接受任意长度的数据块，未用完的密钥流字节留给下一块。
+    """
+
+    def __init__(self, session_key):
+        self._base = hashlib.sha256(session_key)
+        self._counter = 0
+        self._leftover = b""
+
+    def xor(self, data):
+        size = len(data)
+        missing = size - len(self._leftover)
+        blocks = [self._leftover]
+        if missing > 0:
+            block_count = (missing + 31) // 32
+            base = self._base
+            for counter in range(self._counter, self._counter + block_count):
+                digest = base.copy()
+                digest.update(counter.to_bytes(8, byteorder='big'))
+                blocks.append(digest.digest())
+            self._counter += block_count
+        stream = b"".join(blocks)
+        self._leftover = stream[size:]
+        # 整块转换成整数做一次异或，比逐字节异或快得多
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(stream[:size], 'big')).to_bytes(size, 'big')
+
+def _as_stream(source):
+    """bytes 类对象包装成 BytesIO，带 read 方法的文件对象 (包括 mmap) 原样返回。"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if hasattr(source, 'read'):
+        return source
+    raise TypeError("Input must be bytes or a readable file-like object")
+
+def _read_exact(stream, size):
+    """从 stream 中读取恰好 size 个字节 (短读时继续读)，数据不足时返回实际读到的部分。"""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        part = stream.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+def hybrid_encrypt_stream(public_key, source, chunk_size=HYBRID_CHUNK_SIZE):
+    """
+    混合加密的生成器: 随机生成 32 字节会话密钥，用 encrypt_with_padding 封装后作为第一块输出，
+    随后逐块输出用 SHA-256 计数器密钥流加密的数据。内存占用只与 chunk_size 有关。
+    注意: 与 ECC 的简化 ECIES 一样只提供机密性，不提供完整性保护。
+
+    参数:
+        public_key (tuple): RSA公钥 (n, e)。
+        source: bytes 类对象，或带 read 方法的文件对象 (包括 mmap)。
+        chunk_size (int): 每次读取并加密的字节数。
+
+    返回:
+        generator: 依次产生密文字节串 (第一块为 k 字节的封装会话密钥)。
+    Raises:
+        RSAEncryptionError: 如果模数太小，无法封装会话密钥。
+        TypeError, ValueError: 如果参数类型或 chunk_size 不正确。
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+    stream = _as_stream(source)
+    session_key = os.urandom(HYBRID_SESSION_KEY_BYTES)
+    yield encrypt_with_padding(public_key, session_key)
+
+    keystream = _Sha256CounterKeystream(session_key)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield keystream.xor(chunk)
+
+def hybrid_decrypt_stream(private_key, source, chunk_size=HYBRID_CHUNK_SIZE):
+    """
+    hybrid_encrypt_stream 的逆过程: 先读取 k 字节的封装会话密钥并用 decrypt_with_padding 解出，
+    再逐块输出解密后的数据。
+
+    参数:
+        private_key (RSAPrivateKey 或 tuple): RSA私钥。
+        source: 密文，bytes 类对象或带 read 方法的文件对象 (包括 mmap)。
+        chunk_size (int): 每次读取并解密的字节数。
+
+    返回:
+        generator: 依次产生明文字节串。
+    Raises:
+        RSADecryptionError: 如果封装的会话密钥不完整或无效。
+        TypeError, ValueError: 如果参数类型或 chunk_size 不正确。
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+    stream = _as_stream(source)
+    k = (private_key[0].bit_length() + 7) // 8
+    wrapped_key = _read_exact(stream, k)
+    if len(wrapped_key) != k:
+        raise RSADecryptionError("Hybrid ciphertext is shorter than the wrapped session key")
+    session_key = decrypt_with_padding(private_key, wrapped_key)
+    if len(session_key) != HYBRID_SESSION_KEY_BYTES:
+        raise RSADecryptionError("Wrapped session key has the wrong length")
+
+    keystream = _Sha256CounterKeystream(session_key)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield keystream.xor(chunk)
+
+def _iter_mapped_file(path, transform, key, chunk_size):
+    """把 path 映射到内存后交给 transform (hybrid_encrypt_stream 或 hybrid_decrypt_stream)。空文件不能映射，直接读取。"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield from transform(key, f, chunk_size)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # 顺序读取提示: 内核加大预读，并可以尽早回收已读过的页
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield from transform(key, mapped, chunk_size)
+
+def hybrid_encrypt_file(public_key, path, chunk_size=HYBRID_CHUNK_SIZE):
+    """以内存映射方式读取文件 path 并进行混合加密，返回与 hybrid_encrypt_stream 相同的生成器。"""
+    return _iter_mapped_file(path, hybrid_encrypt_stream, public_key, chunk_size)
+
+def hybrid_decrypt_file(private_key, path, chunk_size=HYBRID_CHUNK_SIZE):
+    """以内存映射方式读取密文文件 path 并进行混合解密，返回与 hybrid_decrypt_stream 相同的生成器。"""
+    return _iter_mapped_file(path, hybrid_decrypt_stream, private_key, chunk_size)
+
+def hybrid_encrypt(public_key, message_bytes):
+    """一次性混合加密整条消息，返回 封装会话密钥 || 加密数据。"""
+    return b"".join(hybrid_encrypt_stream(public_key, message_bytes))
+
+def hybrid_decrypt(private_key, ciphertext_bytes):
+    """一次性混合解密 hybrid_encrypt 的输出。"""
+    return b"".join(hybrid_decrypt_stream(private_key, ciphertext_bytes))
+
 if __name__ == '__main__':
     print("开始测试 RSA 密钥生成、加密(带填充)和解密(带去填充)...")
     
@@ -0,0 +1,486 @@
+# app/performance_tester/math_benchmarks.py
+
+import os
+import time
+import json
+import random
+
+try:
+    from app.utils.math_utils import (
+        power,
+        multi_power,
+        _power_square_and_multiply,
+        mod_inverse,
+        batch_mod_inverse,
+        _extended_gcd_euclid,
+        generate_random_n_bit_odd_number,
+        generate_large_prime,
+        generate_large_primes,
+        generate_safe_prime,
+        batch_trial_division,
+        SMALL_PRIMES,
+        is_prime_miller_rabin,
+        is_probable_prime,
+        MontgomeryContext,
+        FixedBaseTable
+    )
+except ImportError as e:
+    # 如果直接运行此文件遇到导入问题，请从项目根目录使用 `python -m app.performance_tester.math_benchmarks`
+    print(f"导入错误: {e}")
+    print("请确保从项目根目录运行，例如: python -m app.performance_tester.math_benchmarks")
+    exit()
+
+# --- 基准测试参数定义 ---
+# 模幂运算测试的模数比特长度
+POWER_BENCH_BITS = [512, 1024, 2048, 4096]
+
+# 固定底数预计算表测试: ElGamal 的 p 的比特长度以及梳形表的齿数 (表大小为 2^teeth 项)
+FIXED_BASE_BENCH_BITS = [512, 1024, 2048]
+FIXED_BASE_TEETH = [4, 6, 8, 10]
+
+# 多重模幂测试: 模数 (以及每个指数) 的比特长度和乘积的项数
+MULTI_POWER_BENCH_BITS = [1024, 2048]
+MULTI_POWER_TERM_COUNTS = [2, 4, 16]
+
+# 模逆元测试的模数比特长度 (192-384 对应 ECC 曲线的 p，其余对应 RSA/ElGamal)
+MOD_INVERSE_BENCH_BITS = [192, 256, 384, 1024, 2048, 4096]
+
+# 批量求逆测试: 模数比特长度和每批元素个数
+BATCH_INVERSE_BENCH_BITS = [256, 2048]
+BATCH_INVERSE_BATCH_SIZES = [2, 16, 128]
+
+# 素数搜索测试的素数比特长度 (1024 位素数对应 RSA-2048 的 p, q 以及 ElGamal-1024 的 p)
+PRIME_SEARCH_BENCH_BITS = [512, 1024, 2048]
+PRIME_SEARCH_TRIALS = 5
+# generate_large_prime 批量模式每批的候选数
+PRIME_SEARCH_BATCH_SIZE = 256
+
+# 安全素数搜索测试的比特长度和试验次数 (ElGamal 的 p)
+SAFE_PRIME_BENCH_BITS = [1024, 2048]
+SAFE_PRIME_TRIALS = 3
+
+# 批量试除测试: 候选数的比特长度和每批的候选数
+TRIAL_DIVISION_BENCH_BITS = [512, 1024, 2048]
+TRIAL_DIVISION_BATCH_SIZES = [64, 1024]
+
+# 并行素数搜索测试: 模拟RSA-2048密钥生成，同时搜索两个 1024 位素数 p 和 q
+PARALLEL_PRIME_BITS = 1024
+PARALLEL_WORKER_COUNTS = [w for w in [1, 2, 4, 8, 16, 32] if w <= (os.cpu_count() or 1)]
+
+# 每个测试的重复次数，用于取平均值
+NUM_ITERATIONS = 10
+
+def _average_ms(func, *args, iterations=NUM_ITERATIONS):
+    """重复调用 func(*args) 并返回平均耗时 (毫秒)。"""
+    times = []
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        func(*args)
+        end_time = time.perf_counter()
+        times.append((end_time - start_time) * 1000)
+    return sum(times) / len(times)
+
+def benchmark_power(bit_sizes=POWER_BENCH_BITS, iterations=NUM_ITERATIONS):
+    """
+    对比三种模幂实现: 原始逐位平方-乘法、滑动窗口 power() 以及内置 pow()。
+    底数、指数和模数都取满比特长度的随机数 (模拟RSA解密的最坏情况)。
+    """
+    results = {}
+    print("\n--- 正在运行模幂运算基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        mod = generate_random_n_bit_odd_number(bits)
+        base = random.getrandbits(bits) % mod
+        exp = random.getrandbits(bits) | (1 << (bits - 1))
+
+        assert power(base, exp, mod) == pow(base, exp, mod)
+
+        square_multiply_ms = _average_ms(_power_square_and_multiply, base, exp, mod, iterations=iterations)
+        sliding_window_ms = _average_ms(power, base, exp, mod, iterations=iterations)
+        builtin_ms = _average_ms(pow, base, exp, mod, iterations=iterations)
+
+        results[config_name] = {
+            "square_and_multiply_ms": square_multiply_ms,
+            "sliding_window_ms": sliding_window_ms,
+            "builtin_pow_ms": builtin_ms
+        }
+        print(f"\n测试配置: {config_name}")
+        print(f"  逐位平方-乘法: {square_multiply_ms:.3f} ms")
+        print(f"  滑动窗口 power(): {sliding_window_ms:.3f} ms (加速比 {square_multiply_ms / sliding_window_ms:.2f}x)")
+        print(f"  内置 pow(): {builtin_ms:.3f} ms")
+
+    return results
+
+def benchmark_montgomery(bit_sizes=POWER_BENCH_BITS, iterations=NUM_ITERATIONS):
+    """
+    对比同一模数上的模幂: 普通 power() (每次乘法后做一次大整数取模)
+    与预先建立的 MontgomeryContext 的 context.power()。
+    同时记录建立上下文本身的开销，它在同一密钥的多次调用之间只需支付一次。
+    """
+    results = {}
+    print("\n--- 正在运行蒙哥马利模运算基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        mod = generate_random_n_bit_odd_number(bits)
+        base = random.getrandbits(bits) % mod
+        exp = random.getrandbits(bits) | (1 << (bits - 1))
+
+        context = MontgomeryContext(mod)
+        assert context.power(base, exp) == pow(base, exp, mod)
+
+        setup_ms = _average_ms(MontgomeryContext, mod, iterations=iterations)
+        plain_ms = _average_ms(power, base, exp, mod, iterations=iterations)
+        montgomery_ms = _average_ms(context.power, base, exp, iterations=iterations)
+
+        results[config_name] = {
+            "context_setup_ms": setup_ms,
+            "plain_power_ms": plain_ms,
+            "montgomery_power_ms": montgomery_ms
+        }
+        print(f"\n测试配置: {config_name}")
+        print(f"  建立蒙哥马利上下文: {setup_ms:.3f} ms")
+        print(f"  普通取模 power(): {plain_ms:.3f} ms")
+        print(f"  蒙哥马利域 power(): {montgomery_ms:.3f} ms (相对普通取模 {plain_ms / montgomery_ms:.2f}x)")
+
+    return results
+
+def benchmark_fixed_base(bit_sizes=FIXED_BASE_BENCH_BITS, teeth_options=FIXED_BASE_TEETH,
+                         iterations=NUM_ITERATIONS):
+    """
+    对比 ElGamal 加密中 g^k mod p 的两种算法: 普通 power() 与固定底数梳形表 FixedBaseTable.power()，
+    并报告不同齿数下表的大小 (项数和字节数)、建表耗时与加速比之间的取舍。
+    g 取 ElGamal 密钥生成实际使用的小生成元 2，k 为满长度的随机指数。
+    """
+    results = {}
+    print("\n--- 正在运行固定底数预计算表基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        p = generate_large_prime(bits)
+        g = 2
+        exponents = [random.randrange(1, p - 1) for _ in range(iterations)]
+
+        def run_plain():
+            for k in exponents:
+                power(g, k, p)
+        plain_ms = _average_ms(run_plain, iterations=1) / iterations
+
+        results[config_name] = {"plain_power_ms": plain_ms, "tables": {}}
+        print(f"\n测试配置: {config_name}")
+        print(f"  普通 power(): {plain_ms:.3f} ms")
+        for teeth in teeth_options:
+            start_time = time.perf_counter()
+            table = FixedBaseTable(g, p, teeth=teeth)
+            build_ms = (time.perf_counter() - start_time) * 1000
+            assert all(table.power(k) == pow(g, k, p) for k in exponents[:2])
+
+            def run_table():
+                for k in exponents:
+                    table.power(k)
+            table_ms = _average_ms(run_table, iterations=1) / iterations
+
+            results[config_name]["tables"][f"teeth-{teeth}"] = {
+                "table_entries": len(table.table),
+                "table_bytes": table.table_bytes(),
+                "build_ms": build_ms,
+                "power_ms": table_ms,
+                "speedup": plain_ms / table_ms
+            }
+            print(f"  {teeth} 齿 ({len(table.table)} 项, {table.table_bytes() / 1024:.1f} KB, 建表 {build_ms:.3f} ms): "
+                  f"{table_ms:.3f} ms (加速比 {plain_ms / table_ms:.2f}x)")
+
+    return results
+
+def _separate_powers(pairs, mod):
+    """逐项调用 power() 再相乘，作为 multi_power() 的对照组。"""
+    res = 1
+    for base, exp in pairs:
+        res = (res * power(base, exp, mod)) % mod
+    return res
+
+def benchmark_multi_power(bit_sizes=MULTI_POWER_BENCH_BITS, term_counts=MULTI_POWER_TERM_COUNTS,
+                          iterations=NUM_ITERATIONS):
+    """
+    对比计算 prod(base_i^exp_i) mod m 的两种方式:
+    逐项调用 power() 后相乘，与共用平方链的 multi_power()。
+    """
+    results = {}
+    print("\n--- 正在运行多重模幂基准测试 ---")
+    for bits in bit_sizes:
+        mod = generate_random_n_bit_odd_number(bits)
+        for num_terms in term_counts:
+            config_name = f"{bits}-bit, {num_terms} terms"
+            pairs = [(random.getrandbits(bits) % mod, random.getrandbits(bits) | (1 << (bits - 1)))
+                     for _ in range(num_terms)]
+
+            assert multi_power(pairs, mod) == _separate_powers(pairs, mod)
+
+            separate_ms = _average_ms(_separate_powers, pairs, mod, iterations=iterations)
+            multi_ms = _average_ms(multi_power, pairs, mod, iterations=iterations)
+
+            results[config_name] = {
+                "separate_power_ms": separate_ms,
+                "multi_power_ms": multi_ms
+            }
+            print(f"\n测试配置: {config_name}")
+            print(f"  逐项 power(): {separate_ms:.3f} ms")
+            print(f"  multi_power(): {multi_ms:.3f} ms (加速比 {separate_ms / multi_ms:.2f}x)")
+
+    return results
+
+def _mod_inverse_euclid(a, m):
+    """改动前的 mod_inverse: 同时跟踪两个系数的逐步扩展欧几里得算法。"""
+    gcd, x, _ = _extended_gcd_euclid(a, m)
+    if gcd != 1:
+        raise ValueError("Modular inverse does not exist")
+    return x % m
+
+def benchmark_mod_inverse(bit_sizes=MOD_INVERSE_BENCH_BITS, iterations=NUM_ITERATIONS * 10):
+    """
+    对比三种模逆元实现: 原来的扩展欧几里得算法、当前的 mod_inverse()
+    (单系数欧几里得，超过阈值后为 Lehmer 算法) 以及内置 pow(a, -1, m)。
+    模数取素数，保证逆元存在。
+    """
+    results = {}
+    print("\n--- 正在运行模逆元基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        mod = generate_large_prime(bits)
+        value = random.randrange(2, mod)
+
+        assert mod_inverse(value, mod) == _mod_inverse_euclid(value, mod) == pow(value, -1, mod)
+
+        euclid_ms = _average_ms(_mod_inverse_euclid, value, mod, iterations=iterations)
+        current_ms = _average_ms(mod_inverse, value, mod, iterations=iterations)
+        builtin_ms = _average_ms(pow, value, -1, mod, iterations=iterations)
+
+        results[config_name] = {
+            "extended_euclid_ms": euclid_ms,
+            "mod_inverse_ms": current_ms,
+            "builtin_pow_ms": builtin_ms
+        }
+        print(f"\n测试配置: {config_name}")
+        print(f"  原扩展欧几里得: {euclid_ms:.4f} ms")
+        print(f"  mod_inverse(): {current_ms:.4f} ms (加速比 {euclid_ms / current_ms:.2f}x)")
+        print(f"  内置 pow(a, -1, m): {builtin_ms:.4f} ms")
+
+    return results
+
+def benchmark_batch_mod_inverse(bit_sizes=BATCH_INVERSE_BENCH_BITS, batch_sizes=BATCH_INVERSE_BATCH_SIZES,
+                                iterations=NUM_ITERATIONS):
+    """
+    对比同一素数模数下求 n 个逆元的两种方式:
+    逐个调用 mod_inverse() 与 batch_mod_inverse() (一次求逆加约 3(n-1) 次乘法)。
+    """
+    results = {}
+    print("\n--- 正在运行批量模逆元基准测试 ---")
+    for bits in bit_sizes:
+        mod = generate_large_prime(bits)
+        for batch_size in batch_sizes:
+            config_name = f"{bits}-bit, n={batch_size}"
+            values = [random.randrange(1, mod) for _ in range(batch_size)]
+
+            separate_ms = _average_ms(lambda: [mod_inverse(v, mod) for v in values], iterations=iterations)
+            batch_ms = _average_ms(batch_mod_inverse, values, mod, iterations=iterations)
+
+            results[config_name] = {
+                "separate_mod_inverse_ms": separate_ms,
+                "batch_mod_inverse_ms": batch_ms
+            }
+            print(f"\n测试配置: {config_name}")
+            print(f"  逐个 mod_inverse(): {separate_ms:.4f} ms")
+            print(f"  batch_mod_inverse(): {batch_ms:.4f} ms (加速比 {separate_ms / batch_ms:.2f}x)")
+
+    return results
+
+def benchmark_prime_search(bit_sizes=PRIME_SEARCH_BENCH_BITS, trials=PRIME_SEARCH_TRIALS):
+    """
+    对比 generate_large_prime 的三种候选数搜索方式:
+    旧方法 (sieve_size=0，每次随机抽取并只试除 3, 5, 7)、窗口筛选方法，
+    以及随机抽取一批候选后用余数树批量试除的批量模式 (batch_size)，
+    统计平均耗时和平均米勒-拉宾调用次数，从而得到筛选节省的 MR 调用数。
+    """
+    results = {}
+    print("\n--- 正在运行素数搜索基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        results[config_name] = {}
+        print(f"\n测试配置: {config_name}")
+        for mode, mode_kwargs in [("random", {"sieve_size": 0}), ("sieve", {}),
+                                  ("batched", {"batch_size": PRIME_SEARCH_BATCH_SIZE})]:
+            times = []
+            mr_calls = []
+            candidates = []
+            for _ in range(trials):
+                stats = {}
+                start_time = time.perf_counter()
+                generate_large_prime(bits, stats=stats, **mode_kwargs)
+                end_time = time.perf_counter()
+                times.append((end_time - start_time) * 1000)
+                mr_calls.append(stats["mr_calls"])
+                candidates.append(stats["candidates"])
+            results[config_name][mode] = {
+                "avg_ms": sum(times) / trials,
+                "avg_mr_calls": sum(mr_calls) / trials,
+                "avg_candidates": sum(candidates) / trials
+            }
+            print(f"  {mode}: 平均 {sum(times) / trials:.3f} ms, "
+                  f"平均检查候选数 {sum(candidates) / trials:.1f}, 平均MR调用 {sum(mr_calls) / trials:.1f} 次")
+
+        saved = results[config_name]["random"]["avg_mr_calls"] - results[config_name]["sieve"]["avg_mr_calls"]
+        results[config_name]["mr_calls_saved"] = saved
+        print(f"  筛选平均每个素数节省 {saved:.1f} 次米勒-拉宾调用")
+
+    return results
+
+def benchmark_safe_prime_search(bit_sizes=SAFE_PRIME_BENCH_BITS, trials=SAFE_PRIME_TRIALS):
+    """
+    对比同样比特长度下普通素数 (generate_large_prime) 和安全素数 (generate_safe_prime) 的平均搜索耗时，
+    slowdown 为两者之比。安全素数的密度约为普通素数的 1/ln(p)，每个素数的耗时方差也很大，
+    结果只在多次试验的平均意义下有参考价值。
+    """
+    results = {}
+    print("\n--- 正在运行安全素数搜索基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        results[config_name] = {}
+        print(f"\n测试配置: {config_name}")
+        for mode, generate in [("plain", generate_large_prime), ("safe", generate_safe_prime)]:
+            times = []
+            mr_calls = []
+            for _ in range(trials):
+                stats = {}
+                start_time = time.perf_counter()
+                generate(bits, stats=stats)
+                end_time = time.perf_counter()
+                times.append((end_time - start_time) * 1000)
+                mr_calls.append(stats["mr_calls"])
+            results[config_name][mode] = {
+                "avg_ms": sum(times) / trials,
+                "avg_mr_calls": sum(mr_calls) / trials
+            }
+            print(f"  {mode}: 平均 {sum(times) / trials:.3f} ms, 平均MR调用 {sum(mr_calls) / trials:.1f} 次")
+
+        slowdown = results[config_name]["safe"]["avg_ms"] / results[config_name]["plain"]["avg_ms"]
+        results[config_name]["slowdown"] = slowdown
+        print(f"  安全素数耗时为普通素数的 {slowdown:.1f} 倍")
+
+    return results
+
+def _per_candidate_trial_division(candidates):
+    """逐个候选数对每个小素数取模 (遇到因子即停止)，作为批量试除的对照组。"""
+    survivors = []
+    for candidate in candidates:
+        for p in SMALL_PRIMES:
+            if candidate % p == 0:
+                break
+        else:
+            survivors.append(candidate)
+    return survivors
+
+def benchmark_trial_division(bit_sizes=TRIAL_DIVISION_BENCH_BITS, batch_sizes=TRIAL_DIVISION_BATCH_SIZES,
+                             iterations=NUM_ITERATIONS):
+    """
+    用前 2048 个素数试除一批随机奇数，比较每秒能筛选的候选数:
+    逐个候选数逐个素数取模，与 batch_trial_division() 的乘积树/余数树。
+    """
+    results = {}
+    print("\n--- 正在运行批量试除基准测试 ---")
+    for bits in bit_sizes:
+        for batch_size in batch_sizes:
+            config_name = f"{bits}-bit, batch={batch_size}"
+            candidates = [generate_random_n_bit_odd_number(bits) for _ in range(batch_size)]
+            assert batch_trial_division(candidates) == _per_candidate_trial_division(candidates)
+
+            per_candidate_ms = _average_ms(_per_candidate_trial_division, candidates, iterations=iterations)
+            batch_ms = _average_ms(batch_trial_division, candidates, iterations=iterations)
+            per_candidate_rate = batch_size / (per_candidate_ms / 1000)
+            batch_rate = batch_size / (batch_ms / 1000)
+
+            results[config_name] = {
+                "per_candidate_candidates_per_sec": per_candidate_rate,
+                "batch_candidates_per_sec": batch_rate
+            }
+            print(f"\n测试配置: {config_name}")
+            print(f"  逐个取模: {per_candidate_rate:.0f} 个/秒")
+            print(f"  余数树批量试除: {batch_rate:.0f} 个/秒 (加速比 {batch_rate / per_candidate_rate:.2f}x)")
+
+    return results
+
+def benchmark_primality(bit_sizes=PRIME_SEARCH_BENCH_BITS, iterations=NUM_ITERATIONS):
+    """
+    对同一个已知素数 (最坏情况，所有轮次都要跑完) 比较三种素性测试的耗时:
+    keygen 原来使用的 20 轮 is_prime_miller_rabin、按比特长度查表的 "mr" 流水线，
+    以及默认的 Baillie-PSW ("bpsw") 流水线。
+    """
+    results = {}
+    print("\n--- 正在运行素性检测基准测试 ---")
+    for bits in bit_sizes:
+        config_name = f"{bits}-bit"
+        prime = generate_large_prime(bits)
+
+        legacy_ms = _average_ms(is_prime_miller_rabin, prime, 20, iterations=iterations)
+        mr_ms = _average_ms(is_probable_prime, prime, "mr", iterations=iterations)
+        bpsw_ms = _average_ms(is_probable_prime, prime, "bpsw", iterations=iterations)
+
+        results[config_name] = {
+            "miller_rabin_20_rounds_ms": legacy_ms,
+            "pipeline_mr_ms": mr_ms,
+            "pipeline_bpsw_ms": bpsw_ms
+        }
+        print(f"\n测试配置: {config_name}")
+        print(f"  20轮米勒-拉宾: {legacy_ms:.3f} ms")
+        print(f"  分层流水线 (mr): {mr_ms:.3f} ms")
+        print(f"  分层流水线 (bpsw): {bpsw_ms:.3f} ms")
+
+    return results
+
+def benchmark_parallel_prime_search(bits=PARALLEL_PRIME_BITS, worker_counts=PARALLEL_WORKER_COUNTS,
+                                    trials=PRIME_SEARCH_TRIALS):
+    """
+    测量同时搜索一对素数 (RSA 的 p 和 q) 的墙钟时间如何随工作进程数变化。
+    workers=1 为当前进程内的顺序搜索，其余配置包含创建进程池的开销。
+    """
+    results = {}
+    print(f"\n--- 正在运行并行素数搜索基准测试 ({bits}-bit 素数对) ---")
+    baseline_ms = None
+    for workers in worker_counts:
+        times = []
+        for _ in range(trials):
+            start_time = time.perf_counter()
+            generate_large_primes(bits, 2, workers=workers)
+            end_time = time.perf_counter()
+            times.append((end_time - start_time) * 1000)
+        avg_ms = sum(times) / trials
+        if baseline_ms is None:
+            baseline_ms = avg_ms
+        results[f"workers-{workers}"] = {"avg_ms": avg_ms, "speedup": baseline_ms / avg_ms}
+        print(f"  {workers} 个进程: 平均 {avg_ms:.3f} ms (相对单进程 {baseline_ms / avg_ms:.2f}x)")
+
+    return results
+
+def run_all_math_benchmarks():
+    """运行所有底层数学运算基准测试并返回结构化结果。"""
+    all_results = {
+        "power": benchmark_power(),
+        "montgomery": benchmark_montgomery(),
+        "multi_power": benchmark_multi_power(),
+        "fixed_base": benchmark_fixed_base(),
+        "mod_inverse": benchmark_mod_inverse(),
+        "batch_mod_inverse": benchmark_batch_mod_inverse(),
+        "prime_search": benchmark_prime_search(),
+        "safe_prime_search": benchmark_safe_prime_search(),
+        "trial_division": benchmark_trial_division(),
+        "primality": benchmark_primality(),
+        "parallel_prime_search": benchmark_parallel_prime_search()
+    }
+    print("\n\n--- 所有基准测试结果汇总 ---")
+    print(json.dumps(all_results, indent=4))
+
+    with open("math_benchmark_results.json", "w") as f:
+        json.dump(all_results, f, indent=4)
+    print("\n测试结果已保存到 math_benchmark_results.json")
+
+    return all_results
+
+if __name__ == '__main__':
+    run_all_math_benchmarks()
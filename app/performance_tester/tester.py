@@ -3,18 +3,35 @@
 import time
 import os
 import json
+import tempfile
 
 # 确保导入路径正确，假设你的项目结构已经调整好
 try:
     from app.core_algorithms.rsa_manual.rsa_core import (
         generate_keys as rsa_generate_keys,
         encrypt_with_padding as rsa_encrypt,
-        decrypt_with_padding as rsa_decrypt
+        decrypt_with_padding as rsa_decrypt,
+        encrypt_many as rsa_encrypt_many,
+        decrypt_many as rsa_decrypt_many,
+        sign as rsa_sign,
+        verify as rsa_verify,
+        verify_many as rsa_verify_many,
+        generate_batch_keys as rsa_generate_batch_keys,
+        batch_decrypt as rsa_batch_decrypt,
+        hybrid_encrypt as rsa_hybrid_encrypt,
+        hybrid_decrypt as rsa_hybrid_decrypt,
+        hybrid_encrypt_file as rsa_hybrid_encrypt_file,
+        hybrid_decrypt_file as rsa_hybrid_decrypt_file
     )
     from app.core_algorithms.elgamal_manual.elgamal_core import (
         generate_keys as elgamal_generate_keys,
         encrypt as elgamal_encrypt,
-        decrypt as elgamal_decrypt
+        decrypt as elgamal_decrypt,
+        decrypt_many as elgamal_decrypt_many,
+        encrypt_bytes as elgamal_encrypt_bytes,
+        decrypt_bytes as elgamal_decrypt_bytes,
+        ElGamalEncryptor,
+        ElGamalPrivateKey
     )
     from app.core_algorithms.ecc_manual.ecc_core import (
         generate_ecc_keys,
@@ -22,6 +39,8 @@ try:
         decrypt_message_ecc,
         get_curve_by_name # 我们需要这个函数来获取曲线对象
     )
+    from app.utils.arithmetic_backend import available_backends, use_backend, get_backend, power
+    from app.utils.math_utils import batch_mod_inverse
 except ImportError as e:
     # 如果直接运行此文件遇到导入问题，请从项目根目录使用 `python -m app.performance_tester.tester`
     print(f"导入错误: {e}")
@@ -31,7 +50,27 @@ except ImportError as e:
 # --- 测试参数定义 ---
 # 密钥生成测试的参数
 RSA_KEY_SIZES = [512, 1024, 2048]
+# 多素数RSA测试: 模数比特长度与素因子个数两个维度，4096 位的两素数密钥生成很慢，因此减少重复次数
+RSA_MULTI_PRIME_KEY_SIZES = [2048, 3072, 4096]
+RSA_PRIME_COUNTS = [2, 3, 4]
+RSA_MULTI_PRIME_KEYGEN_ITERATIONS = 3
+# RSA批量加解密吞吐量测试: 模数比特长度和每批的消息数
+RSA_BATCH_KEY_SIZES = [1024, 2048]
+RSA_BATCH_SIZES = [16, 128]
+# Fiat 批量RSA测试: 模数比特长度和每批的密文数 (每条密文使用不同的小公钥指数)
+RSA_FIAT_BATCH_KEY_SIZES = [1024, 2048]
+RSA_FIAT_BATCH_SIZES = [2, 4, 8, 16]
 ELGAMAL_KEY_SIZES = [512, 1024, 2048]
+# ElGamal 密钥生成模式: "fresh" 每次生成新的普通素数 p (按 ELGAMAL_KEY_SIZES)，
+# "group" 使用预定义群 (按 ELGAMAL_GROUP_NAMES)，只需一次模幂
+ELGAMAL_KEY_MODE = "fresh"
+ELGAMAL_GROUP_NAMES = ["modp1024", "ffdhe2048", "ffdhe3072", "ffdhe4096"]
+# ElGamal 离线/在线加密测试: 使用的预定义群和预计算池大小
+ELGAMAL_PRECOMPUTE_GROUPS = ["ffdhe2048", "ffdhe3072"]
+ELGAMAL_PRECOMPUTE_POOL_SIZE = 32
+# ElGamal 私钥上下文解密测试: p 的比特长度 (普通素数，解密耗时与 p 是否为安全素数无关) 和批量解密的密文数
+ELGAMAL_DECRYPTION_KEY_SIZES = [512, 1024, 2048]
+ELGAMAL_DECRYPTION_BATCH_SIZE = 16
 ECC_CURVES = ["secp192r1", "secp256r1", "secp256k1", "secp384r1"]
 
 # 核心操作加解密测试的参数
@@ -39,6 +78,22 @@ STANDARD_SHORT_BLOCK_SIZE_BYTES = 32 # 模拟一个256位的对称密钥
 
 # 数据扩展性测试的参数 (主要用于ECC)
 DATA_SCALABILITY_SIZES_BYTES = [1024, 16384, 65536] # 1KB, 16KB, 64KB
+# RSA 混合加密的数据扩展性测试 (在 run_rsa_tests 中对每个密钥长度运行，数据在内存中)
+RSA_HYBRID_SCALABILITY_SIZES_BYTES = [1024, 1 << 20] # 1KB, 1MB
+RSA_HYBRID_IN_MEMORY_LIMIT = 1 << 20
+# 大数据量的混合加密测试: 数据写入临时文件并通过内存映射流式加解密，每种大小只测一次。
+# 大块数据的耗时几乎全在密钥流上，与 RSA 密钥长度无关，因此只用一个密钥长度；
+# 1GB 会在临时目录中写入约 2GB 的文件、每个方向耗时约一分钟，默认不运行
+RUN_RSA_HYBRID_LARGE_TESTS = False
+RSA_HYBRID_LARGE_KEY_SIZE = 2048
+RSA_HYBRID_LARGE_SIZES_BYTES = [64 << 20, 1 << 30] # 64MB, 1GB
+# ElGamal 分块模式每块都要做完整的加解密，64KB 在 2048 位下约 260 块，因此减少重复次数
+ELGAMAL_SCALABILITY_ITERATIONS = 2
+
+# 运算后端对比测试的参数: 在每个可用后端上运行同样的负载
+BACKEND_COMPARISON_RSA_BITS = 2048
+BACKEND_COMPARISON_ELGAMAL_BITS = 1024
+BACKEND_COMPARISON_ECC_CURVE = "secp256k1"
 
 # 每个测试的重复次数，用于取平均值
 NUM_ITERATIONS = 10 
@@ -90,15 +145,205 @@ def run_rsa_tests():
             decrypt_times.append((end_time - start_time) * 1000)
         avg_decrypt_time = sum(decrypt_times) / len(decrypt_times)
         results[key_config_name]["core_decryption_ms"] = avg_decrypt_time
-        print(f"  核心解密时间 (对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_decrypt_time:.3f} ms")
+        print(f"  核心解密时间 (CRT，对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_decrypt_time:.3f} ms")
+
+        # 对比: 只用 (n, d) 直接计算 c^d mod n
+        avg_plain_decrypt_time = _average_ms(rsa_decrypt, tuple(priv_key), ciphertext)
+        results[key_config_name]["core_decryption_plain_ms"] = avg_plain_decrypt_time
+        print(f"  核心解密时间 (无CRT，对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_plain_decrypt_time:.3f} ms "
+              f"(CRT 加速比 {avg_plain_decrypt_time / avg_decrypt_time:.2f}x)")
+
+        # 签名 (PKCS#1 v1.5 + SHA-256，CRT) 与验证
+        signature = rsa_sign(priv_key, ssdb_message)
+        avg_sign_time = _average_ms(rsa_sign, priv_key, ssdb_message)
+        avg_verify_time = _average_ms(rsa_verify, pub_key, ssdb_message, signature)
+        results[key_config_name]["core_sign_ms"] = avg_sign_time
+        results[key_config_name]["core_verify_ms"] = avg_verify_time
+        print(f"  核心签名时间 (CRT，对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_sign_time:.3f} ms")
+        print(f"  核心验证时间 (对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_verify_time:.3f} ms")
+
+        # 3. 数据扩展性测试 (混合加密: RSA 封装会话密钥，SHA-256 计数器密钥流加密数据)
+        results[key_config_name]["scalability_encryption_ms"] = {}
+        results[key_config_name]["scalability_decryption_ms"] = {}
+        print("  数据扩展性测试 (混合加密不同大小的数据):")
+        for data_size in RSA_HYBRID_SCALABILITY_SIZES_BYTES:
+            message = _generate_test_data(data_size)
+            hybrid_ciphertext = rsa_hybrid_encrypt(pub_key, message)
+            avg_encrypt_time_long = _average_ms(rsa_hybrid_encrypt, pub_key, message)
+            avg_decrypt_time_long = _average_ms(rsa_hybrid_decrypt, priv_key, hybrid_ciphertext)
+            results[key_config_name]["scalability_encryption_ms"][data_size] = avg_encrypt_time_long
+            results[key_config_name]["scalability_decryption_ms"][data_size] = avg_decrypt_time_long
+            print(f"    - 加密 {data_size}字节 平均时间: {avg_encrypt_time_long:.3f} ms")
+            print(f"    - 解密 {data_size}字节 平均时间: {avg_decrypt_time_long:.3f} ms")
 
     return results
 
-def run_elgamal_tests():
+def _rsa_hybrid_file_ms(pub_key, priv_key, data_size):
+    """在临时目录中生成 data_size 字节的文件，测量内存映射流式混合加密 (写出密文文件) 和解密的耗时 (毫秒)。"""
+    block = _generate_test_data(RSA_HYBRID_IN_MEMORY_LIMIT)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        plain_path = os.path.join(temp_dir, "plain.bin")
+        cipher_path = os.path.join(temp_dir, "cipher.bin")
+        with open(plain_path, "wb") as f:
+            for offset in range(0, data_size, len(block)):
+                f.write(block[:data_size - offset])
+
+        start_time = time.perf_counter()
+        with open(cipher_path, "wb") as f:
+            for chunk in rsa_hybrid_encrypt_file(pub_key, plain_path):
+                f.write(chunk)
+        encrypt_ms = (time.perf_counter() - start_time) * 1000
+
+        start_time = time.perf_counter()
+        for _ in rsa_hybrid_decrypt_file(priv_key, cipher_path):
+            pass
+        decrypt_ms = (time.perf_counter() - start_time) * 1000
+    return encrypt_ms, decrypt_ms
+
+def run_rsa_hybrid_large_tests():
+    """
+    大数据量的混合加密测试 (RSA_HYBRID_LARGE_SIZES_BYTES，只用 RSA_HYBRID_LARGE_KEY_SIZE 一个密钥长度)，
+    经过临时文件和内存映射流式加解密。需要把 RUN_RSA_HYBRID_LARGE_TESTS 设为 True 才会在
+    run_all_performance_tests 中运行。
+    """
+    key_config_name = f"RSA-{RSA_HYBRID_LARGE_KEY_SIZE}"
+    print(f"\n--- 正在运行 RSA 大数据量混合加密测试 ({key_config_name}) ---")
+    pub_key, priv_key = rsa_generate_keys(bits=RSA_HYBRID_LARGE_KEY_SIZE)
+    results = {key_config_name: {"scalability_encryption_ms": {}, "scalability_decryption_ms": {}}}
+    for data_size in RSA_HYBRID_LARGE_SIZES_BYTES:
+        encrypt_ms, decrypt_ms = _rsa_hybrid_file_ms(pub_key, priv_key, data_size)
+        results[key_config_name]["scalability_encryption_ms"][data_size] = encrypt_ms
+        results[key_config_name]["scalability_decryption_ms"][data_size] = decrypt_ms
+        print(f"    - 加密 {data_size}字节 时间: {encrypt_ms:.3f} ms ({data_size / (1 << 20) / (encrypt_ms / 1000):.1f} MB/s)")
+        print(f"    - 解密 {data_size}字节 时间: {decrypt_ms:.3f} ms ({data_size / (1 << 20) / (decrypt_ms / 1000):.1f} MB/s)")
+    return results
+
+def run_rsa_multi_prime_tests():
+    """
+    测量多素数RSA (RFC 8017) 的密钥生成和CRT解密耗时随素因子个数的变化，
+    speedup 为相对同一模数长度下两素数密钥的加速比。
+    """
     results = {}
-    print("\n--- 正在运行 ElGamal 性能测试 ---")
-    for bits in ELGAMAL_KEY_SIZES:
-        key_config_name = f"ElGamal-{bits}"
+    print("\n--- 正在运行多素数 RSA 性能测试 ---")
+    ssdb_message = _generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES)
+    for bits in RSA_MULTI_PRIME_KEY_SIZES:
+        baseline = None
+        for num_primes in RSA_PRIME_COUNTS:
+            key_config_name = f"RSA-{bits}-{num_primes}p"
+            print(f"\n测试配置: {key_config_name}")
+
+            key_gen_times = []
+            for _ in range(RSA_MULTI_PRIME_KEYGEN_ITERATIONS):
+                start_time = time.perf_counter()
+                pub_key, priv_key = rsa_generate_keys(bits=bits, num_primes=num_primes)
+                end_time = time.perf_counter()
+                key_gen_times.append((end_time - start_time) * 1000)
+            avg_key_gen_time = sum(key_gen_times) / len(key_gen_times)
+
+            ciphertext = rsa_encrypt(pub_key, ssdb_message)
+            avg_decrypt_time = _average_ms(rsa_decrypt, priv_key, ciphertext)
+            if baseline is None:
+                baseline = (avg_key_gen_time, avg_decrypt_time)
+
+            results[key_config_name] = {
+                "key_gen_ms": avg_key_gen_time,
+                "core_decryption_ms": avg_decrypt_time,
+                "key_gen_speedup": baseline[0] / avg_key_gen_time,
+                "decryption_speedup": baseline[1] / avg_decrypt_time
+            }
+            print(f"  平均密钥生成时间: {avg_key_gen_time:.3f} ms (加速比 {baseline[0] / avg_key_gen_time:.2f}x)")
+            print(f"  核心解密时间 (CRT): {avg_decrypt_time:.3f} ms (加速比 {baseline[1] / avg_decrypt_time:.2f}x)")
+
+    return results
+
+def _messages_per_second(func, *args, count):
+    """func(*args) 一次处理 count 条消息，返回 NUM_ITERATIONS 次平均得到的每秒消息数。"""
+    return count / (_average_ms(func, *args) / 1000)
+
+def run_rsa_batch_tests():
+    """
+    对比逐条调用 encrypt_with_padding / decrypt_with_padding / verify 与
+    encrypt_many / decrypt_many / verify_many 的吞吐量 (消息/秒)。
+    批量接口使用默认的 workers=None，批量较大且有多个 CPU 核时会使用进程池。
+    """
+    results = {}
+    print("\n--- 正在运行 RSA 批量加解密吞吐量测试 ---")
+    for bits in RSA_BATCH_KEY_SIZES:
+        pub_key, priv_key = rsa_generate_keys(bits=bits)
+        for batch_size in RSA_BATCH_SIZES:
+            key_config_name = f"RSA-{bits}-batch-{batch_size}"
+            print(f"\n测试配置: {key_config_name}")
+            messages = [_generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES) for _ in range(batch_size)]
+            ciphertexts = rsa_encrypt_many(pub_key, messages)
+            signed_pairs = [(message, rsa_sign(priv_key, message)) for message in messages]
+
+            def encrypt_loop():
+                return [rsa_encrypt(pub_key, message) for message in messages]
+
+            def decrypt_loop():
+                return [rsa_decrypt(priv_key, ciphertext) for ciphertext in ciphertexts]
+
+            def verify_loop():
+                return [rsa_verify(pub_key, message, signature) for message, signature in signed_pairs]
+
+            timings = {
+                "loop_encryption_msgs_per_sec": _messages_per_second(encrypt_loop, count=batch_size),
+                "batch_encryption_msgs_per_sec": _messages_per_second(rsa_encrypt_many, pub_key, messages,
+                                                                      count=batch_size),
+                "loop_decryption_msgs_per_sec": _messages_per_second(decrypt_loop, count=batch_size),
+                "batch_decryption_msgs_per_sec": _messages_per_second(rsa_decrypt_many, priv_key, ciphertexts,
+                                                                      count=batch_size),
+                "loop_verification_msgs_per_sec": _messages_per_second(verify_loop, count=batch_size),
+                "batch_verification_msgs_per_sec": _messages_per_second(rsa_verify_many, pub_key, signed_pairs,
+                                                                        count=batch_size)
+            }
+            results[key_config_name] = timings
+            print(f"  加密: 逐条 {timings['loop_encryption_msgs_per_sec']:.1f} 条/秒, "
+                  f"批量 {timings['batch_encryption_msgs_per_sec']:.1f} 条/秒")
+            print(f"  解密: 逐条 {timings['loop_decryption_msgs_per_sec']:.1f} 条/秒, "
+                  f"批量 {timings['batch_decryption_msgs_per_sec']:.1f} 条/秒")
+            print(f"  验证: 逐条 {timings['loop_verification_msgs_per_sec']:.1f} 条/秒, "
+                  f"批量 {timings['batch_verification_msgs_per_sec']:.1f} 条/秒")
+
+    return results
+
+def run_rsa_fiat_batch_tests():
+    """
+    Fiat 批量RSA: 每批只做一次全长模幂，报告摊销到每条消息的解密耗时，
+    并与同一模数下逐条 CRT 解密 (decrypt_with_padding) 的耗时对比。
+    """
+    results = {}
+    print("\n--- 正在运行 Fiat 批量RSA解密测试 ---")
+    for bits in RSA_FIAT_BATCH_KEY_SIZES:
+        key_config_name = f"RSA-{bits}"
+        print(f"\n测试配置: {key_config_name}")
+        batch_key = rsa_generate_batch_keys(bits=bits, batch_size=max(RSA_FIAT_BATCH_SIZES))
+        messages = [_generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES) for _ in batch_key.exponents]
+        ciphertexts = [rsa_encrypt(public_key, message) for public_key, message in zip(batch_key.public_keys, messages)]
+
+        single_key = batch_key.private_key_for(0)
+        single_ms = _average_ms(rsa_decrypt, single_key, ciphertexts[0])
+        results[key_config_name] = {"single_decryption_ms": single_ms, "batch_amortized_decryption_ms": {}}
+        print(f"  逐条 CRT 解密: {single_ms:.3f} ms/条")
+
+        for batch_size in RSA_FIAT_BATCH_SIZES:
+            amortized_ms = _average_ms(rsa_batch_decrypt, batch_key, ciphertexts[:batch_size]) / batch_size
+            results[key_config_name]["batch_amortized_decryption_ms"][batch_size] = amortized_ms
+            print(f"  批量 {batch_size:2d} 条: {amortized_ms:.3f} ms/条 ({single_ms / amortized_ms:.2f}x)")
+
+    return results
+
+def run_elgamal_tests(key_mode=ELGAMAL_KEY_MODE):
+    results = {}
+    print(f"\n--- 正在运行 ElGamal 性能测试 (密钥生成模式: {key_mode}) ---")
+    if key_mode == "group":
+        key_configs = [(f"ElGamal-{group}", {"group": group}) for group in ELGAMAL_GROUP_NAMES]
+    elif key_mode == "fresh":
+        key_configs = [(f"ElGamal-{bits}", {"bits": bits, "safe_prime": False}) for bits in ELGAMAL_KEY_SIZES]
+    else:
+        raise ValueError(f"Unknown ElGamal key mode: {key_mode}")
+
+    for key_config_name, keygen_kwargs in key_configs:
         print(f"\n测试配置: {key_config_name}")
         results[key_config_name] = {}
 
@@ -106,7 +351,7 @@ def run_elgamal_tests():
         key_gen_times = []
         for _ in range(NUM_ITERATIONS):
             start_time = time.perf_counter()
-            pub_key, priv_key_x = elgamal_generate_keys(bits=bits)
+            pub_key, priv_key_x = elgamal_generate_keys(**keygen_kwargs)
             end_time = time.perf_counter()
             key_gen_times.append((end_time - start_time) * 1000)
         avg_key_gen_time = sum(key_gen_times) / len(key_gen_times)
@@ -141,9 +386,112 @@ def run_elgamal_tests():
         avg_decrypt_time = sum(decrypt_times) / len(decrypt_times)
         results[key_config_name]["core_decryption_ms"] = avg_decrypt_time
         print(f"  核心解密时间 (对{STANDARD_SHORT_BLOCK_SIZE_BYTES}字节): {avg_decrypt_time:.3f} ms")
-        
+
+        # 3. 数据扩展性测试 (分块模式，块数较多时自动使用进程池)
+        private_key = ElGamalPrivateKey(p_param, g_param, priv_key_x)
+        results[key_config_name]["scalability_encryption_ms"] = {}
+        results[key_config_name]["scalability_decryption_ms"] = {}
+        print("  数据扩展性测试 (分块加密不同大小的数据):")
+        for data_size in DATA_SCALABILITY_SIZES_BYTES:
+            message = _generate_test_data(data_size)
+            encrypt_times = []
+            for _ in range(ELGAMAL_SCALABILITY_ITERATIONS):
+                start_time = time.perf_counter()
+                ciphertexts = elgamal_encrypt_bytes(pub_key, message)
+                end_time = time.perf_counter()
+                encrypt_times.append((end_time - start_time) * 1000)
+            avg_encrypt_time_long = sum(encrypt_times) / len(encrypt_times)
+            results[key_config_name]["scalability_encryption_ms"][data_size] = avg_encrypt_time_long
+            print(f"    - 加密 {data_size}字节 ({len(ciphertexts)} 块) 平均时间: {avg_encrypt_time_long:.3f} ms")
+
+            decrypt_times = []
+            for _ in range(ELGAMAL_SCALABILITY_ITERATIONS):
+                start_time = time.perf_counter()
+                elgamal_decrypt_bytes(private_key, ciphertexts)
+                end_time = time.perf_counter()
+                decrypt_times.append((end_time - start_time) * 1000)
+            avg_decrypt_time_long = sum(decrypt_times) / len(decrypt_times)
+            results[key_config_name]["scalability_decryption_ms"][data_size] = avg_decrypt_time_long
+            print(f"    - 解密 {data_size}字节 平均时间: {avg_decrypt_time_long:.3f} ms")
+
     return results
 
+def run_elgamal_precomputation_tests():
+    """
+    对比普通的 elgamal_encrypt 与 ElGamalEncryptor 的在线加密耗时:
+    offline_pair_ms 为预计算一对 (g^k, y^k) 的平均耗时，online_hit_ms 为池中有预计算对时的在线耗时，
+    online_miss_ms 为池耗尽后退回实时计算的耗时。
+    """
+    results = {}
+    print("\n--- 正在运行 ElGamal 离线/在线加密测试 ---")
+    ssdb_message_int = int.from_bytes(_generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES), 'big')
+    for group in ELGAMAL_PRECOMPUTE_GROUPS:
+        key_config_name = f"ElGamal-{group}"
+        print(f"\n测试配置: {key_config_name}")
+        pub_key, _ = elgamal_generate_keys(group=group)
+
+        plain_ms = _average_ms(elgamal_encrypt, pub_key, ssdb_message_int)
+
+        encryptor = ElGamalEncryptor(pub_key, pool_size=ELGAMAL_PRECOMPUTE_POOL_SIZE)
+        start_time = time.perf_counter()
+        encryptor.fill()
+        offline_pair_ms = (time.perf_counter() - start_time) * 1000 / ELGAMAL_PRECOMPUTE_POOL_SIZE
+        # 先用完池中的所有预计算对，再额外加密 NUM_ITERATIONS 次以测量未命中时的退回路径
+        for _ in range(ELGAMAL_PRECOMPUTE_POOL_SIZE + NUM_ITERATIONS):
+            encryptor.encrypt(ssdb_message_int)
+        stats = encryptor.stats()
+
+        results[key_config_name] = {
+            "plain_encryption_ms": plain_ms,
+            "offline_pair_ms": offline_pair_ms,
+            "online_hit_ms": stats["avg_hit_ms"],
+            "online_miss_ms": stats["avg_miss_ms"]
+        }
+        print(f"  普通加密: {plain_ms:.3f} ms, 预计算一对: {offline_pair_ms:.3f} ms")
+        print(f"  在线加密 (命中): {stats['avg_hit_ms']:.4f} ms, (未命中): {stats['avg_miss_ms']:.3f} ms")
+
+    return results
+
+def run_elgamal_decryption_tests():
+    """
+    对比三种ElGamal解密方式的单个密文平均耗时:
+    elgamal_decrypt (求逆元)、ElGamalPrivateKey.decrypt (无逆元)，
+    以及旧的 batch_mod_inverse 批量路径与 ElGamalPrivateKey.decrypt_many 按批量平均后的耗时。
+    """
+    results = {}
+    print("\n--- 正在运行 ElGamal 私钥上下文解密测试 ---")
+    for bits in ELGAMAL_DECRYPTION_KEY_SIZES:
+        key_config_name = f"ElGamal-{bits}"
+        print(f"\n测试配置: {key_config_name}")
+        pub_key, priv_key_x = elgamal_generate_keys(bits=bits, safe_prime=False)
+        p_param, g_param, _ = pub_key
+        private_key = ElGamalPrivateKey(p_param, g_param, priv_key_x)
+
+        messages = [int.from_bytes(_generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES), 'big') % p_param
+                    for _ in range(ELGAMAL_DECRYPTION_BATCH_SIZE)]
+        ciphertexts = [elgamal_encrypt(pub_key, m) for m in messages]
+
+        def batch_inverse_decrypt():
+            # 强制走批量求逆路径: s_i = c1_i^x，一次 batch_mod_inverse
+            shared_keys = [power(c1, priv_key_x, p_param) for c1, _ in ciphertexts]
+            inverses = batch_mod_inverse(shared_keys, p_param)
+            return [(c2 * s_inv) % p_param for (_, c2), s_inv in zip(ciphertexts, inverses)]
+
+        timings = {
+            "decrypt_ms": _average_ms(elgamal_decrypt, priv_key_x, p_param, g_param, ciphertexts[0]),
+            "context_decrypt_ms": _average_ms(private_key.decrypt, ciphertexts[0]),
+            "batch_inverse_per_ciphertext_ms": _average_ms(batch_inverse_decrypt) / ELGAMAL_DECRYPTION_BATCH_SIZE,
+            "context_decrypt_many_per_ciphertext_ms":
+                _average_ms(private_key.decrypt_many, ciphertexts) / ELGAMAL_DECRYPTION_BATCH_SIZE
+        }
+        assert elgamal_decrypt_many(priv_key_x, p_param, g_param, ciphertexts) == messages
+        results[key_config_name] = timings
+        print(f"  decrypt: {timings['decrypt_ms']:.3f} ms, 私钥上下文 decrypt: {timings['context_decrypt_ms']:.3f} ms")
+        print(f"  批量 ({ELGAMAL_DECRYPTION_BATCH_SIZE} 个密文) 平均每个: 批量求逆 "
+              f"{timings['batch_inverse_per_ciphertext_ms']:.3f} ms, "
+              f"私钥上下文 decrypt_many {timings['context_decrypt_many_per_ciphertext_ms']:.3f} ms")
+
+    return results
 
 def run_ecc_tests():
     results = {}
@@ -164,6 +512,16 @@ def run_ecc_tests():
         results[key_config_name]["key_gen_ms"] = avg_key_gen_time
         print(f"  平均密钥生成时间: {avg_key_gen_time:.3f} ms")
 
+        # 点乘: 雅可比坐标 (只在最后求一次逆元) 与仿射坐标 (每次倍点/加点都求逆元) 对比，
+        # 密钥生成、加密、解密的耗时基本都花在点乘上 (分别为 1、2、1 次)
+        base_point_G = get_curve_by_name(curve_name).G
+        avg_scalar_mult_time = _average_ms(base_point_G._scalar_multiply, priv_key)
+        avg_affine_scalar_mult_time = _average_ms(base_point_G._scalar_multiply_affine, priv_key)
+        results[key_config_name]["scalar_mult_ms"] = avg_scalar_mult_time
+        results[key_config_name]["scalar_mult_affine_ms"] = avg_affine_scalar_mult_time
+        print(f"  点乘时间: 雅可比坐标 {avg_scalar_mult_time:.3f} ms, 仿射坐标 {avg_affine_scalar_mult_time:.3f} ms "
+              f"(加速比 {avg_affine_scalar_mult_time / avg_scalar_mult_time:.2f}x)")
+
         # 2. 核心操作加解密时间测试 (使用SSDB)
         ssdb_message = _generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES)
         # 加密
@@ -218,13 +576,83 @@ def run_ecc_tests():
 
     return results
 
+def _average_ms(func, *args, **kwargs):
+    """重复调用 func(*args, **kwargs) NUM_ITERATIONS 次并返回平均耗时 (毫秒)。"""
+    times = []
+    for _ in range(NUM_ITERATIONS):
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        end_time = time.perf_counter()
+        times.append((end_time - start_time) * 1000)
+    return sum(times) / len(times)
+
+def run_backend_comparison():
+    """
+    在每个可用的大整数运算后端 (educational / builtin / gmpy2) 上运行同样的负载:
+    RSA、ElGamal 和 ECC 的密钥生成与核心加解密。
+    加解密使用同一组密钥和消息，只有底层运算后端不同。
+    """
+    results = {}
+    print(f"\n--- 正在运行运算后端对比测试 (当前默认后端: {get_backend().name}) ---")
+
+    ssdb_message = _generate_test_data(STANDARD_SHORT_BLOCK_SIZE_BYTES)
+    ssdb_message_int = int.from_bytes(ssdb_message, 'big')
+    rsa_pub_key, rsa_priv_key = rsa_generate_keys(bits=BACKEND_COMPARISON_RSA_BITS)
+    rsa_ciphertext = rsa_encrypt(rsa_pub_key, ssdb_message)
+    elgamal_pub_key, elgamal_priv_key_x = elgamal_generate_keys(bits=BACKEND_COMPARISON_ELGAMAL_BITS)
+    p_param, g_param, _ = elgamal_pub_key
+    elgamal_ciphertext = elgamal_encrypt(elgamal_pub_key, ssdb_message_int)
+    ecc_priv_key, ecc_pub_key = generate_ecc_keys(curve_name=BACKEND_COMPARISON_ECC_CURVE)
+    ephemeral_R, ecc_ciphertext = encrypt_message_ecc(ecc_pub_key, ssdb_message)
+
+    for backend_name in available_backends():
+        with use_backend(backend_name):
+            print(f"\n测试后端: {backend_name}")
+            rsa_config_name = f"RSA-{BACKEND_COMPARISON_RSA_BITS}"
+            elgamal_config_name = f"ElGamal-{BACKEND_COMPARISON_ELGAMAL_BITS}"
+            ecc_config_name = f"ECC-{BACKEND_COMPARISON_ECC_CURVE}"
+            backend_results = {
+                rsa_config_name: {
+                    "key_gen_ms": _average_ms(rsa_generate_keys, BACKEND_COMPARISON_RSA_BITS),
+                    "core_encryption_ms": _average_ms(rsa_encrypt, rsa_pub_key, ssdb_message),
+                    "core_decryption_ms": _average_ms(rsa_decrypt, rsa_priv_key, rsa_ciphertext)
+                },
+                elgamal_config_name: {
+                    # 安全素数搜索不经过运算后端，这里用普通素数模式对比各后端的素数生成
+                    "key_gen_ms": _average_ms(elgamal_generate_keys, BACKEND_COMPARISON_ELGAMAL_BITS,
+                                              safe_prime=False),
+                    "core_encryption_ms": _average_ms(elgamal_encrypt, elgamal_pub_key, ssdb_message_int),
+                    "core_decryption_ms": _average_ms(elgamal_decrypt, elgamal_priv_key_x, p_param, g_param,
+                                                      elgamal_ciphertext)
+                },
+                ecc_config_name: {
+                    "key_gen_ms": _average_ms(generate_ecc_keys, BACKEND_COMPARISON_ECC_CURVE),
+                    "core_encryption_ms": _average_ms(encrypt_message_ecc, ecc_pub_key, ssdb_message),
+                    "core_decryption_ms": _average_ms(decrypt_message_ecc, ecc_priv_key, ephemeral_R, ecc_ciphertext)
+                }
+            }
+            for config_name, timings in backend_results.items():
+                print(f"  {config_name}: 密钥生成 {timings['key_gen_ms']:.3f} ms, "
+                      f"加密 {timings['core_encryption_ms']:.3f} ms, 解密 {timings['core_decryption_ms']:.3f} ms")
+            results[backend_name] = backend_results
+
+    return results
+
 def run_all_performance_tests():
     """运行所有性能测试并返回结构化结果。"""
     all_results = {
         "RSA": run_rsa_tests(),
+        "RSA_multi_prime": run_rsa_multi_prime_tests(),
+        "RSA_batch": run_rsa_batch_tests(),
+        "RSA_fiat_batch": run_rsa_fiat_batch_tests(),
         "ElGamal": run_elgamal_tests(),
-        "ECC": run_ecc_tests()
+        "ElGamal_precomputation": run_elgamal_precomputation_tests(),
+        "ElGamal_decryption": run_elgamal_decryption_tests(),
+        "ECC": run_ecc_tests(),
+        "backends": run_backend_comparison()
     }
+    if RUN_RSA_HYBRID_LARGE_TESTS:
+        all_results["RSA_hybrid_large"] = run_rsa_hybrid_large_tests()
     print("\n\n--- 所有性能测试结果汇总 ---")
     # 使用json.dumps美化打印输出
     print(json.dumps(all_results, indent=4))
@@ -0,0 +1,261 @@
+# app/utils/arithmetic_backend.py
+
+import os
+import random
+import warnings
+from contextlib import contextmanager
+from math import gcd
+
+from app.utils import math_utils
+
+try:
+    import gmpy2
+except ImportError: # gmpy2 是可选依赖
+    gmpy2 = None
+
+# 选择默认后端的环境变量，Flask 应用中也可以通过配置项 ARITHMETIC_BACKEND 指定
+ARITHMETIC_BACKEND_ENV_VAR = "ARITHMETIC_BACKEND"
+DEFAULT_BACKEND_NAME = "educational"
+
+class ArithmeticBackend:
+    """
+    大整数运算后端的接口。
+
+    RSA、ElGamal、ECC 以及性能测试通过本模块的 power / mod_inverse 等函数调用
+    当前选中的后端，这样同一个进程可以在不同后端上运行同样的负载并进行对比。
+    """
+    name = None
+
+    def power(self, base, exp, mod):
+        """计算 (base^exp) % mod。"""
+        raise NotImplementedError
+
+    def fixed_base_power(self, base, exp, mod):
+        """计算 (base^exp) % mod，其中 base 和 mod 在多次调用之间保持不变 (如 ElGamal 的 g, p)。"""
+        return self.power(base, exp, mod)
+
+    def mod_inverse(self, a, m):
+        """计算 a 模 m 的乘法逆元，逆元不存在或 m <= 1 时抛出 ValueError。"""
+        raise NotImplementedError
+
+    def extended_gcd(self, a, b):
+        """返回 (g, x, y)，使得 ax + by = g = gcd(a, b)。"""
+        raise NotImplementedError
+
+    def is_prime(self, n, k_miller_rabin=20):
+        """概率性素性检测。"""
+        raise NotImplementedError
+
+    def generate_prime(self, bits, k_miller_rabin=20):
+        """
+        生成一个 bits 位的素数。默认实现逐个抽取随机奇数，
+        用小素数之积做一次 gcd 排除有小因子的候选，再调用本后端的 is_prime。
+        """
+        # 只用小于最小候选数 2^(bits-1) 的素数，避免把素数本身排除掉
+        primorial = math_utils._primorial(min(math_utils.DEFAULT_TRIAL_DIVISION_BOUND, 1 << (bits - 1)))
+        while True:
+            candidate = math_utils.generate_random_n_bit_odd_number(bits)
+            if gcd(candidate, primorial) != 1:
+                continue
+            if self.is_prime(candidate, k_miller_rabin):
+                return candidate
+
+class EducationalBackend(ArithmeticBackend):
+    """math_utils 中手写的算法 (滑动窗口模幂、Lehmer 扩展欧几里得、分层素性检测等)。"""
+    name = "educational"
+
+    def power(self, base, exp, mod):
+        return math_utils.power(base, exp, mod)
+
+    def fixed_base_power(self, base, exp, mod):
+        return math_utils.get_fixed_base_table(base, mod).power(exp)
+
+    def mod_inverse(self, a, m):
+        return math_utils.mod_inverse(a, m)
+
+    def extended_gcd(self, a, b):
+        return math_utils.extended_gcd(a, b)
+
+    def is_prime(self, n, k_miller_rabin=20):
+        # 使用当前的分层素性检测 (试除 + 以 2 为底的强伪素数测试 + BPSW)，与 generate_large_prime 一致；
+        # 该流水线不需要指定米勒-拉宾轮数，k_miller_rabin 只为保持接口一致
+        return math_utils.is_probable_prime(n)
+
+    def generate_prime(self, bits, k_miller_rabin=20):
+        return math_utils.generate_large_prime(bits, k_miller_rabin)
+
+def _miller_rabin(n, k_miller_rabin, powmod):
+    """使用给定模幂函数的 k 轮随机底数米勒-拉宾测试 (与 is_prime_miller_rabin 的约定一致)。"""
+    if n < 2:
+        return False
+    if n < 4:
+        return True
+    if n % 2 == 0:
+        return False
+
+    s = 0
+    d = n - 1
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for _ in range(k_miller_rabin):
+        a = random.randint(2, n - 2)
+        x = powmod(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = (x * x) % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+class BuiltinBackend(ArithmeticBackend):
+    """CPython 内置运算: 三参数 pow() 和 pow(a, -1, m)。"""
+    name = "builtin"
+
+    def power(self, base, exp, mod):
+        if mod == 0:
+            raise ValueError("Modulo 0 is not allowed")
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        return pow(base, exp, mod)
+
+    def mod_inverse(self, a, m):
+        if m <= 1:
+            raise ValueError("Modulo must be greater than 1")
+        try:
+            return pow(a, -1, m)
+        except ValueError:
+            raise ValueError("Modular inverse does not exist")
+
+    def extended_gcd(self, a, b):
+        # CPython 没有内置的扩展欧几里得算法，系数由 pow(a', -1, b') 求出
+        g = gcd(a, b)
+        if b == 0 or a == 0:
+            return math_utils.extended_gcd(a, b)
+        a_reduced, b_reduced = a // g, b // g
+        if abs(b_reduced) == 1:
+            # a' * 0 + b' * b' = 1
+            return g, 0, b_reduced
+        x = pow(a_reduced, -1, abs(b_reduced))
+        y = (1 - a_reduced * x) // b_reduced
+        return g, x, y
+
+    def is_prime(self, n, k_miller_rabin=20):
+        return _miller_rabin(n, k_miller_rabin, pow)
+
+class Gmpy2Backend(ArithmeticBackend):
+    """基于 GMP 的 gmpy2 (可选依赖)。结果统一转换回 Python int。"""
+    name = "gmpy2"
+
+    def power(self, base, exp, mod):
+        if mod == 0:
+            raise ValueError("Modulo 0 is not allowed")
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        return int(gmpy2.powmod(base, exp, mod))
+
+    def mod_inverse(self, a, m):
+        if m <= 1:
+            raise ValueError("Modulo must be greater than 1")
+        try:
+            return int(gmpy2.invert(a, m))
+        except ZeroDivisionError:
+            raise ValueError("Modular inverse does not exist")
+
+    def extended_gcd(self, a, b):
+        g, x, y = gmpy2.gcdext(a, b)
+        return int(g), int(x), int(y)
+
+    def is_prime(self, n, k_miller_rabin=20):
+        return bool(gmpy2.is_prime(n, k_miller_rabin))
+
+    def generate_prime(self, bits, k_miller_rabin=20):
+        while True:
+            start = math_utils.generate_random_n_bit_odd_number(bits)
+            # next_prime 返回严格大于参数的素数，从 start - 1 开始使 start 本身也能被选中
+            prime = int(gmpy2.next_prime(start - 1))
+            if prime.bit_length() == bits:
+                return prime
+
+_BACKEND_CLASSES = {
+    EducationalBackend.name: EducationalBackend,
+    BuiltinBackend.name: BuiltinBackend,
+    Gmpy2Backend.name: Gmpy2Backend
+}
+_backend_instances = {}
+
+def available_backends():
+    """返回当前环境中可用的后端名称列表 (未安装 gmpy2 时不包含 "gmpy2")。"""
+    return [name for name in _BACKEND_CLASSES if name != Gmpy2Backend.name or gmpy2 is not None]
+
+def get_backend(name=None):
+    """
+    获取后端实例。name 为 None 时返回当前选中的后端。
+
+    Raises:
+        ValueError: 如果后端名称未知或该后端在当前环境中不可用。
+    """
+    if name is None:
+        return _current_backend
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown arithmetic backend: {name}")
+    if name not in available_backends():
+        raise ValueError(f"Arithmetic backend {name} is not available (is gmpy2 installed?)")
+    if name not in _backend_instances:
+        _backend_instances[name] = _BACKEND_CLASSES[name]()
+    return _backend_instances[name]
+
+def set_backend(name):
+    """
+    切换当前进程使用的后端。
+
+    返回:
+        ArithmeticBackend: 切换之前的后端。
+    """
+    global _current_backend
+    previous = _current_backend
+    _current_backend = get_backend(name)
+    return previous
+
+@contextmanager
+def use_backend(name):
+    """在 with 语句块内临时切换后端，退出时恢复原来的后端。"""
+    previous = set_backend(name)
+    try:
+        yield _current_backend
+    finally:
+        set_backend(previous.name)
+
+def _initial_backend():
+    name = os.environ.get(ARITHMETIC_BACKEND_ENV_VAR, DEFAULT_BACKEND_NAME)
+    try:
+        return get_backend(name)
+    except ValueError as e:
+        warnings.warn(f"{e}; falling back to {DEFAULT_BACKEND_NAME}")
+        return get_backend(DEFAULT_BACKEND_NAME)
+
+_current_backend = _initial_backend()
+
+# --- 按当前后端分派的运算，供各算法模块直接导入使用 ---
+
+def power(base, exp, mod):
+    return _current_backend.power(base, exp, mod)
+
+def fixed_base_power(base, exp, mod):
+    return _current_backend.fixed_base_power(base, exp, mod)
+
+def mod_inverse(a, m):
+    return _current_backend.mod_inverse(a, m)
+
+def extended_gcd(a, b):
+    return _current_backend.extended_gcd(a, b)
+
+def is_prime(n, k_miller_rabin=20):
+    return _current_backend.is_prime(n, k_miller_rabin)
+
+def generate_prime(bits, k_miller_rabin=20):
+    return _current_backend.generate_prime(bits, k_miller_rabin)
@@ -1,10 +1,126 @@
 # app/utils/math_utils.py
 import random
+import multiprocessing
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from math import gcd, isqrt
+
+# 按 (底数, 模数) 缓存的固定底数预计算表数量上限。每张表有 2^teeth 项，
+# 2048 位模数、默认 8 齿时约 64 KB
+FIXED_BASE_TABLE_CACHE_SIZE = 16
+# 固定底数梳形表的默认齿数 h: 表大小 2^h 项，每次模幂约 bits/h 次平方和乘法
+DEFAULT_COMB_TEETH = 8
+
+# Lehmer 扩展欧几里得算法每轮处理的前导比特数 (CPython 内部一个 digit 的宽度)
+LEHMER_DIGIT_BITS = 30
+# 操作数超过该比特数时才使用 Lehmer 算法。在纯 Python 中模拟单字长除法步骤
+# 本身开销较大，实测约 4096 位以下普通欧几里得除法更快
+LEHMER_THRESHOLD_BITS = 4096
+
+# 素数生成时一次筛选的奇数候选个数 (窗口大小)，设为 0 则退回逐个随机抽取
+DEFAULT_SIEVE_SIZE = 2048
+
+# 安全素数搜索的筛选参数。q 和 2q+1 都要没有小因子，幸存比例随筛选上界 B 按 1/(ln B)^2 下降，
+# 所以用比普通素数搜索更大的素数表和更大的窗口来摊薄建表和每个窗口的开销
+SAFE_PRIME_SIEVE_BOUND = 1 << 18
+SAFE_PRIME_SIEVE_SIZE = 16384
+
+# 批量试除时，乘积树的一个分组的乘积最多取小素数之积 (primorial) 比特长度的这个比例。
+# 比 primorial 更大的结点对取模没有帮助 (P mod N = P)，CPython 的大整数除法是平方复杂度，
+# 让分组略小于 primorial 时整体最快
+BATCH_TRIAL_DIVISION_GROUP_FRACTION = 0.25
+
+def _primes_below(limit):
+    """埃拉托斯特尼筛法，返回所有小于 limit 的素数。"""
+    is_prime = bytearray([1]) * limit
+    is_prime[0:2] = b'\x00\x00'
+    for i in range(2, int(limit ** 0.5) + 1):
+        if is_prime[i]:
+            is_prime[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if is_prime[i]]
+
+# 前 2048 个素数 (最大为 17863)，用于候选数的筛选和试除
+SMALL_PRIMES = _primes_below(17864)
+# 候选数都是奇数，筛选只需要奇素数；同时预先算好每个素数下 2 的逆元
+_SIEVE_PRIMES = SMALL_PRIMES[1:]
+_SIEVE_HALF_INVERSES = [(p + 1) // 2 for p in _SIEVE_PRIMES]
+
+def _window_size_for_exponent(exp_bits):
+    """
+    根据指数的比特长度选择滑动窗口的宽度 w。
+    阈值与 OpenSSL 的 BN_window_bits_for_exponent_size 一致，
+    在预计算表的开销 (2^(w-1) 次乘法) 与主循环节省的乘法次数之间取得平衡。
+    """
+    if exp_bits > 1791:
+        return 7
+    if exp_bits > 671:
+        return 6
+    if exp_bits > 239:
+        return 5
+    if exp_bits > 79:
+        return 4
+    if exp_bits > 23:
+        return 3
+    return 1
+
+def _power_square_and_multiply(base, exp, mod):
+    """
+    逐位 (从右到左) 的平方-乘法模幂运算。
+    这是 power 最初的实现，保留下来作为基准测试的对照组。
+    """
+    if mod == 0:
+        raise ValueError("Modulo 0 is not allowed")
+    if exp < 0:
+        raise ValueError("Negative exponent is not allowed")
+
+    res = 1
+    base %= mod
+
+    while exp > 0:
+        if exp % 2 == 1:
+            res = (res * base) % mod
+        base = (base * base) % mod
+        exp //= 2
+
+    return res
+
+def _sliding_windows(exp, w):
+    """
+    把指数 exp 按从左到右的滑动窗口切分。
+
+    每次产出 (squarings, table_index)：先做 squarings 次平方，
+    再乘以奇数次幂表中的第 table_index 项 (即 base^(2*table_index+1))。
+    指数末尾的一串 0 以 (squarings, None) 的形式产出，只需平方。
+    第一个窗口产出时结果尚为 1，调用方可以直接取表项而跳过平方。
+    """
+    exp_bin = bin(exp)[2:]
+    n_bits = len(exp_bin)
+    pending_squarings = 0
+    i = 0
+    while i < n_bits:
+        if exp_bin[i] == '0':
+            pending_squarings += 1
+            i += 1
+            continue
+
+        # 取以 '1' 开头、以 '1' 结尾且长度不超过 w 的最长窗口
+        j = min(i + w, n_bits)
+        while exp_bin[j - 1] == '0':
+            j -= 1
+        yield pending_squarings + (j - i), int(exp_bin[i:j], 2) >> 1
+        pending_squarings = 0
+        i = j
+
+    if pending_squarings:
+        yield pending_squarings, None
 
 def power(base, exp, mod):
     """
     计算 (base^exp) % mod 的高效模幂运算。
-    使用平方-乘法算法。
+    使用从左到右的滑动窗口 (k-ary) 算法：窗口宽度 w 由指数的比特长度决定，
+    预先计算 base 的奇数次幂 base^1, base^3, ..., base^(2^w - 1)，
+    之后每个窗口只需要一次乘法，而不是每个为1的比特一次乘法。
 
     参数:
         base (int): 底数
@@ -18,22 +134,37 @@ def power(base, exp, mod):
         raise ValueError("Modulo 0 is not allowed")
     if exp < 0:
         raise ValueError("Negative exponent is not allowed")
-    
-    res = 1
+    if exp == 0:
+        return 1
+
     base %= mod
+    w = _window_size_for_exponent(exp.bit_length())
 
-    while exp > 0:
-        if exp % 2 == 1:
-            res = (res * base) % mod
-        base = (base * base) % mod
-        exp //= 2
+    # 预计算奇数次幂表: table[i] = base^(2i+1) mod mod
+    table = [base]
+    if w > 1:
+        base_sq = (base * base) % mod
+        for _ in range((1 << (w - 1)) - 1):
+            table.append((table[-1] * base_sq) % mod)
+
+    res = None
+    for squarings, index in _sliding_windows(exp, w):
+        if res is None:
+            # 第一个窗口: 结果直接取表项，省去对 1 的平方
+            res = table[index]
+            continue
+        for _ in range(squarings):
+            res = (res * res) % mod
+        if index is not None:
+            res = (res * table[index]) % mod
 
     return res
 
-def extended_gcd(a, b):
+def _extended_gcd_euclid(a, b):
     """
     计算 a 和 b 的最大公约数，并找到整数 x 和 y 使得 ax + by = gcd(a, b)。
     使用迭代版本的扩展欧几里得算法，避免递归深度问题。
+    这是 extended_gcd 最初的实现，保留下来作为基准测试的对照组。
     """
     # 记录原始 a, b 的符号
     s_a = 1 if a >= 0 else -1
@@ -64,10 +195,78 @@ def extended_gcd(a, b):
     
     return u_a, x_prev * s_a, y_prev * s_b
 
+def _lehmer_gcd_cofactor(a, b):
+    """
+    扩展欧几里得算法，要求 a >= b >= 0，只跟踪 b 的系数。
+
+    较小的操作数超过 LEHMER_THRESHOLD_BITS 位时使用 Lehmer 算法
+    (Knuth, TAOCP 卷2 算法 L)：每一轮只取 a, b 的前 LEHMER_DIGIT_BITS 位
+    (与 a 对齐)，在小整数上模拟若干步欧几里得除法并累积 2x2 变换矩阵
+    [[A, B], [C, D]]；只要两种取整估计得到的商一致，这些步骤就与全精度计算
+    完全相同。之后用一次矩阵乘法同时更新大整数 a, b 以及系数，代替多次全精度除法。
+    数变小之后改用普通的欧几里得除法收尾。
+
+    返回:
+        tuple: (g, y)，其中 g = gcd(a, b) 且 b*y ≡ g (mod a)。
+    """
+    u, v = 0, 1 # 当前的 a, b 分别等于 (...)*a + u*b 和 (...)*a + v*b
+    while b.bit_length() > LEHMER_THRESHOLD_BITS:
+        shift = a.bit_length() - LEHMER_DIGIT_BITS
+        a_hat = a >> shift
+        b_hat = b >> shift
+        A, B, C, D = 1, 0, 0, 1
+        while b_hat + C != 0 and b_hat + D != 0:
+            q = (a_hat + A) // (b_hat + C)
+            if q != (a_hat + B) // (b_hat + D):
+                break
+            A, C = C, A - q * C
+            B, D = D, B - q * D
+            a_hat, b_hat = b_hat, a_hat - q * b_hat
+
+        if B == 0:
+            # 前导位无法确定商 (通常是商特别大)，做一次全精度除法
+            q, r = divmod(a, b)
+            a, b = b, r
+            u, v = v, u - q * v
+        else:
+            a, b = A * a + B * b, C * a + D * b
+            u, v = A * u + B * v, C * u + D * v
+
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        u, v = v, u - q * v
+    return a, u
+
+def extended_gcd(a, b):
+    """
+    计算 a 和 b 的最大公约数，并找到整数 x 和 y 使得 ax + by = gcd(a, b)。
+    迭代过程中只跟踪一个系数 (大整数时使用 Lehmer 算法，见 _lehmer_gcd_cofactor)，
+    另一个系数在最后由 (gcd - by) / a 一次求出。
+    """
+    # 记录原始 a, b 的符号，使用绝对值进行计算
+    s_a = 1 if a >= 0 else -1
+    s_b = 1 if b >= 0 else -1
+    abs_a, abs_b = abs(a), abs(b)
+
+    if abs_b == 0:
+        return abs_a, s_a, 0
+    if abs_a == 0:
+        return abs_b, 0, s_b
+
+    if abs_a >= abs_b:
+        g, y = _lehmer_gcd_cofactor(abs_a, abs_b)
+        x = (g - abs_b * y) // abs_a
+    else:
+        g, x = _lehmer_gcd_cofactor(abs_b, abs_a)
+        y = (g - abs_a * x) // abs_b
+
+    return g, x * s_a, y * s_b
+
 def mod_inverse(a, m):
     """
     计算 a 模 m 的乘法逆元 x，使得 (a*x) % m = 1。
-    使用扩展欧几里得算法。
+    使用扩展欧几里得算法 (大整数时为 Lehmer 算法)。
 
     参数:
         a (int): 要求逆元的整数
@@ -82,13 +281,298 @@ def mod_inverse(a, m):
     if m <= 1:
         raise ValueError("Modulo must be greater than 1")
 
-    gcd, x, y = extended_gcd(a, m)
+    # 只需要 a 的系数: gcd(m, a mod m) 的扩展欧几里得算法中 a 一侧的系数即为逆元
+    gcd, x = _lehmer_gcd_cofactor(m, a % m)
     if gcd != 1:
         raise ValueError("Modular inverse does not exist")
     else:
-        inverse = (x % m + m) % m
+        inverse = x % m
         return inverse
+
+class BatchInverseError(ValueError):
+    """batch_mod_inverse 中某个元素没有逆元时抛出，index 为该元素在输入中的下标。"""
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+def batch_mod_inverse(values, m):
+    """
+    同时计算一组整数模 m 的乘法逆元 (Montgomery 同时求逆技巧)。
+
+    先计算前缀积 c_i = a_0 * a_1 * ... * a_i (mod m)，只对总乘积 c_{n-1} 做一次求逆，
+    再从后往前依次得到 a_i^-1 = c_{i-1} * (a_i * ... * a_{n-1})^-1。
+    总共只需一次 mod_inverse 和约 3(n-1) 次模乘法，代替 n 次 mod_inverse。
+
+    参数:
+        values (iterable of int): 要求逆元的整数。
+        m (int): 模数
+
+    返回:
+        list: 与 values 顺序一致的逆元列表。
+    Raises:
+        BatchInverseError: 如果某个元素的逆元不存在，index 属性给出第一个这样的元素的下标。
+        ValueError: 如果 m <= 1。
+    """
+    if m <= 1:
+        raise ValueError("Modulo must be greater than 1")
+
+    values = [a % m for a in values]
+    if not values:
+        return []
+
+    prefix_products = [values[0]]
+    for a in values[1:]:
+        prefix_products.append((prefix_products[-1] * a) % m)
+
+    try:
+        inverse = mod_inverse(prefix_products[-1], m)
+    except ValueError:
+        # 总乘积不可逆，说明至少有一个元素与 m 不互素，找出第一个
+        for index, a in enumerate(values):
+            if _lehmer_gcd_cofactor(m, a)[0] != 1:
+                raise BatchInverseError(index, f"Modular inverse does not exist for element at index {index}")
+        raise
+
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        # 此时 inverse = (a_0 * ... * a_i)^-1
+        inverses[i] = (inverse * prefix_products[i - 1]) % m
+        inverse = (inverse * values[i]) % m
+    inverses[0] = inverse
+    return inverses
     
+def multi_power(pairs, mod):
+    """
+    同时计算多个模幂的乘积 (base_1^exp_1 * base_2^exp_2 * ...) % mod。
+    使用 Straus (Shamir 技巧的推广) 交错滑动窗口算法：每个底数按自己指数的长度
+    选择窗口宽度并预计算奇数次幂表，然后所有指数共用同一条平方链，
+    在每个窗口结束的位置乘入对应的表项。与分别调用 power() 相比，
+    乘法次数不变，而平方次数从各指数比特长度之和降为其中的最大值。
+
+    参数:
+        pairs (iterable): (base, exp) 对的序列。
+        mod (int): 模数
+
+    返回:
+        int: 各项模幂之积 % mod 的结果 (pairs 为空时为 1)
+    """
+    if mod == 0:
+        raise ValueError("Modulo 0 is not allowed")
+
+    # multiplications[shift] 为需要在剩余 shift 次平方之前乘入的表项
+    multiplications = {}
+    for base, exp in pairs:
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        if exp == 0:
+            continue
+
+        base %= mod
+        w = _window_size_for_exponent(exp.bit_length())
+        table = [base]
+        if w > 1:
+            base_sq = (base * base) % mod
+            for _ in range((1 << (w - 1)) - 1):
+                table.append((table[-1] * base_sq) % mod)
+
+        remaining = exp.bit_length()
+        for squarings, index in _sliding_windows(exp, w):
+            remaining -= squarings
+            if index is not None:
+                multiplications.setdefault(remaining, []).append(table[index])
+
+    if not multiplications:
+        return 1
+
+    top_shift = max(multiplications)
+    res = 1
+    for shift in range(top_shift, -1, -1):
+        if shift != top_shift:
+            res = (res * res) % mod
+        for factor in multiplications.get(shift, ()):
+            res = (res * factor) % mod
+
+    return res
+
+class MontgomeryContext:
+    """
+    针对固定奇数模数 N 的蒙哥马利模运算上下文。
+
+    取 R = 2^r (r 为 N 的比特长度)，数 a 在蒙哥马利域中表示为 aR mod N。
+    域内乘法 mul(aR, bR) = abR mod N 只需要乘法、按位与和移位 (REDC)，
+    不需要对 N 做大整数除法。R^2 mod N 和 N' = -N^-1 mod R 在构造时
+    计算一次，之后同一模数上的所有运算都可以复用。
+
+    只用于基准测试 (math_benchmarks.benchmark_montgomery)：在 CPython 中 REDC 的移位和按位与
+    并不比内置的大整数取模快 (实测约 0.4-0.8 倍)，因此 power() 和各密钥对象都不使用它。
+    """
+
+    def __init__(self, modulus):
+        if not isinstance(modulus, int) or modulus <= 1 or modulus % 2 == 0:
+            raise ValueError("Montgomery modulus must be an odd integer greater than 1")
+
+        self.modulus = modulus
+        self.r_bits = modulus.bit_length()
+        self.r_mask = (1 << self.r_bits) - 1
+        # N' 满足 N * N' ≡ -1 (mod R)。N 为奇数，N^-1 mod 2^r 用牛顿迭代求出：
+        # 若 inv 是模 2^j 的逆元，则 inv * (2 - N * inv) 是模 2^(2j) 的逆元。
+        inv = 1
+        precision = 1
+        while precision < self.r_bits:
+            precision *= 2
+            inv = (inv * (2 - modulus * inv)) & ((1 << precision) - 1)
+        self.n_prime = (-inv) & self.r_mask
+        self.r2 = (1 << (2 * self.r_bits)) % modulus
+        self.one = (1 << self.r_bits) % modulus # 1 在蒙哥马利域中的表示
+
+    def reduce(self, t):
+        """REDC: 对 0 <= t < N*R 计算 t * R^-1 mod N。"""
+        m = ((t & self.r_mask) * self.n_prime) & self.r_mask
+        u = (t + m * self.modulus) >> self.r_bits
+        if u >= self.modulus:
+            u -= self.modulus
+        return u
+
+    def to_montgomery(self, a):
+        """把普通整数 a 转换为蒙哥马利表示 aR mod N。"""
+        return self.reduce((a % self.modulus) * self.r2)
+
+    def from_montgomery(self, a_mont):
+        """把蒙哥马利表示 aR mod N 转换回普通整数 a。"""
+        return self.reduce(a_mont)
+
+    def mul(self, a_mont, b_mont):
+        """蒙哥马利域中的乘法: (aR)(bR) -> abR mod N。"""
+        return self.reduce(a_mont * b_mont)
+
+    def square(self, a_mont):
+        """蒙哥马利域中的平方: (aR)^2 -> a^2 R mod N。"""
+        return self.reduce(a_mont * a_mont)
+
+    def power_montgomery(self, base_mont, exp):
+        """
+        在蒙哥马利域内计算 base^exp，输入和输出都是蒙哥马利表示。
+        与 power() 使用相同的滑动窗口切分。
+        """
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        if exp == 0:
+            return self.one
+
+        # 热循环中直接展开 REDC，省去每次方法调用的开销
+        n, mask, n_prime, r_bits = self.modulus, self.r_mask, self.n_prime, self.r_bits
+
+        w = _window_size_for_exponent(exp.bit_length())
+        table = [base_mont]
+        if w > 1:
+            base_sq = self.square(base_mont)
+            for _ in range((1 << (w - 1)) - 1):
+                table.append(self.mul(table[-1], base_sq))
+
+        res = None
+        for squarings, index in _sliding_windows(exp, w):
+            if res is None:
+                res = table[index]
+                continue
+            for _ in range(squarings):
+                t = res * res
+                res = (t + (((t & mask) * n_prime) & mask) * n) >> r_bits
+                if res >= n:
+                    res -= n
+            if index is not None:
+                t = res * table[index]
+                res = (t + (((t & mask) * n_prime) & mask) * n) >> r_bits
+                if res >= n:
+                    res -= n
+
+        return res
+
+    def power(self, base, exp):
+        """计算普通整数 (base^exp) % N，内部在蒙哥马利域中完成。"""
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        if exp == 0:
+            return 1
+        return self.from_montgomery(self.power_montgomery(self.to_montgomery(base), exp))
+
+class FixedBaseTable:
+    """
+    固定底数模幂的 Lim-Lee 梳形预计算表 (comb method)。
+
+    把 exp_bits 位的指数按列排成 teeth 行、columns = ceil(exp_bits / teeth) 列，
+    预先计算 teeth 个底数 base^(2^(j*columns)) 的全部 2^teeth 种子集乘积。
+    之后每次模幂逐列处理，每列只需一次平方和一次查表乘法，
+    总代价约 columns 次平方加 columns 次乘法，而普通模幂需要 exp_bits 次平方。
+    建表的代价约等于一次普通模幂，适合底数和模数长期不变的场景 (如 ElGamal 的 g, p)。
+    """
+
+    def __init__(self, base, modulus, exp_bits=None, teeth=DEFAULT_COMB_TEETH):
+        if modulus <= 1:
+            raise ValueError("Modulus must be greater than 1")
+        if teeth < 1:
+            raise ValueError("Number of teeth must be at least 1")
+
+        self.base = base % modulus
+        self.modulus = modulus
+        self.exp_bits = exp_bits if exp_bits is not None else modulus.bit_length()
+        self.teeth = teeth
+        self.columns = max(1, -(-self.exp_bits // teeth))
+
+        # 每一行的起始底数: base^(2^(j*columns))
+        row_bases = [self.base]
+        for _ in range(teeth - 1):
+            value = row_bases[-1]
+            for _ in range(self.columns):
+                value = (value * value) % modulus
+            row_bases.append(value)
+
+        # table[mask] = 所有 mask 中为 1 的行的底数之积
+        table = [1] * (1 << teeth)
+        for mask in range(1, 1 << teeth):
+            row = mask.bit_length() - 1
+            table[mask] = (table[mask ^ (1 << row)] * row_bases[row]) % modulus
+        self.table = table
+
+    def table_bytes(self):
+        """预计算表中所有整数的总字节数 (不含 Python 对象本身的开销)。"""
+        return sum((value.bit_length() + 7) // 8 for value in self.table)
+
+    def power(self, exp):
+        """
+        计算 (base^exp) % modulus。
+        exp 超过建表时的 exp_bits 位时退回普通的 power()。
+        """
+        if exp < 0:
+            raise ValueError("Negative exponent is not allowed")
+        if exp.bit_length() > self.exp_bits:
+            return power(self.base, exp, self.modulus)
+
+        modulus = self.modulus
+        table = self.table
+        columns = self.columns
+        # 指数的二进制串按行切开，第 j 行 (从最高行开始) 对应比特 [j*columns, (j+1)*columns)；
+        # zip 后每一列从高到低给出各行在该列的比特，拼起来正好是查表下标
+        exp_bin = format(exp, f'0{columns * self.teeth}b')
+        rows = [exp_bin[i:i + columns] for i in range(0, len(exp_bin), columns)]
+
+        res = None
+        for column in zip(*rows):
+            if res is not None:
+                res = (res * res) % modulus
+            index = int(''.join(column), 2)
+            if index:
+                res = table[index] if res is None else (res * table[index]) % modulus
+
+        return 1 if res is None else res
+
+@lru_cache(maxsize=FIXED_BASE_TABLE_CACHE_SIZE)
+def get_fixed_base_table(base, modulus):
+    """
+    获取 (或创建并缓存) 底数 base、模数 modulus 的 FixedBaseTable。
+    表在第一次使用时才建立，超过 FIXED_BASE_TABLE_CACHE_SIZE 个后按 LRU 淘汰。
+    """
+    return FixedBaseTable(base, modulus)
+
 def is_prime_miller_rabin(n, k=10): # k是测试轮数，对于实际应用可能需要更高
     """
     使用米勒-拉宾概率性算法检测 n 是否为素数。
@@ -119,7 +603,7 @@ def is_prime_miller_rabin(n, k=10): # k是测试轮数，对于实际应用可
         if x == 1 or x == n - 1:
             continue
         for _ in range(s - 1):
-            x = power(x, 2, n)
+            x = (x * x) % n
             if x == n - 1:
                 break
             if x == 1:
@@ -128,6 +612,278 @@ def is_prime_miller_rabin(n, k=10): # k是测试轮数，对于实际应用可
             return False
     return True
 
+# 对 n < 2^64，以前 12 个素数为底的强伪素数测试是确定性的 (没有合数能全部通过)
+_DETERMINISTIC_MR_BASES_64 = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+# 试除用的小素数表能单独证明素性的上界: 小于 17863^2 且没有更小因子的数一定是素数
+_TRIAL_DIVISION_LIMIT = SMALL_PRIMES[-1] * SMALL_PRIMES[-1]
+
+def _mr_rounds_for_bits(bits):
+    """
+    按候选数的比特长度给出米勒-拉宾测试的轮数 (含以 2 为底的那一轮)。
+    分段阈值照搬 OpenSSL 1.1.1 的 BN_prime_checks_for_size (include/openssl/bn.h)，
+    该表按 FIPS 186-4 附录 F.1 (Damgård-Landrock-Pomerance 平均情形估计) 生成，
+    只对随机选取的奇数候选成立: >= 3747 位约 2^-192，>= 1345 位约 2^-128，
+    308..1344 位约 2^-80。低于 308 位统一用 27 轮，平均情形下约 105 位以上
+    才能达到 2^-80。对刻意构造的输入只有最坏情形界 4^-t (3 轮仅为 2^-6)，
+    因此这里的轮数不适合检验不可信来源的数。
+    """
+    if bits >= 3747:
+        return 3
+    if bits >= 1345:
+        return 4
+    if bits >= 476:
+        return 5
+    if bits >= 400:
+        return 6
+    if bits >= 347:
+        return 7
+    if bits >= 308:
+        return 8
+    return 27
+
+def _is_strong_probable_prime(n, a, d, s):
+    """以 a 为底的单轮强伪素数测试，其中 n - 1 = d * 2^s 且 d 为奇数。"""
+    x = power(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = (x * x) % n
+        if x == n - 1:
+            return True
+        if x == 1:
+            return False
+    return False
+
+def jacobi_symbol(a, n):
+    """
+    计算雅可比符号 (a/n)，n 为正奇数。
+
+    返回:
+        int: -1, 0 或 1。
+    """
+    if n <= 0 or n % 2 == 0:
+        raise ValueError("Jacobi symbol requires a positive odd modulus")
+
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def _is_strong_lucas_probable_prime(n):
+    """
+    强卢卡斯伪素数测试 (Selfridge 方法 A 选取参数)，n 为大于 2 的奇数。
+
+    在 5, -7, 9, -11, ... 中找到第一个满足 (D/n) = -1 的 D，取 P = 1, Q = (1 - D) / 4。
+    令 n + 1 = d * 2^s，若 U_d ≡ 0 或存在 0 <= r < s 使 V_(d*2^r) ≡ 0 (mod n)，
+    则 n 是强卢卡斯伪素数。
+    """
+    root = isqrt(n)
+    if root * root == n:
+        # 完全平方数找不到 (D/n) = -1 的 D
+        return False
+
+    D = 5
+    while True:
+        j = jacobi_symbol(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    Q = (1 - D) // 4
+
+    d = n + 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    # 从 U_1 = 1, V_1 = P = 1 出发，按 d 的二进制位做倍指标/加一
+    U, V, Qk = 1, 1, Q % n
+    for bit in bin(d)[3:]:
+        U = (U * V) % n
+        V = (V * V - 2 * Qk) % n
+        Qk = (Qk * Qk) % n
+        if bit == '1':
+            # U_(k+1) = (U_k + V_k) / 2, V_(k+1) = (D*U_k + V_k) / 2 (P = 1)
+            U, V = U + V, D * U + V
+            if U % 2:
+                U += n
+            U = (U // 2) % n
+            V %= n
+            if V % 2:
+                V += n
+            V = (V // 2) % n
+            Qk = (Qk * Q) % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = (Qk * Qk) % n
+        if V == 0:
+            return True
+    return False
+
+def is_probable_prime(n, method="bpsw", trial_division=True):
+    """
+    分层的素性检测流水线。
+
+    1. 用前 2048 个素数试除 (小于 17863^2 的数在这一步就能得到确定结论)；
+    2. 以 2 为底的强伪素数测试，绝大多数合数在这一次模幂中就被排除；
+    3. n < 2^64 时，使用确定性的底数集合完成判定；
+       否则按 method 选择:
+         "bpsw" —— 强卢卡斯测试，与第 2 步合起来即 Baillie-PSW 测试 (默认，
+                   目前没有已知的反例，代价约为 3 次模幂)；
+         "mr"   —— 按比特长度查表得到的米勒-拉宾轮数 (随机底数)。
+
+    参数:
+        n (int): 待检测的整数。
+        method (str): n >= 2^64 时使用的测试方法，"bpsw" 或 "mr"。
+        trial_division (bool): 是否执行第 1 步。调用方已经用同一张素数表
+                               筛过候选数时 (如 generate_large_prime) 可以跳过。
+
+    返回:
+        bool: 如果 n 很可能是素数则为 True，否则为 False。
+    """
+    if method not in ("mr", "bpsw"):
+        raise ValueError(f"Unknown primality test method: {method}")
+    if n < 2:
+        return False
+    if n < 4:
+        return True
+    if n % 2 == 0:
+        return False
+
+    if trial_division:
+        for p in SMALL_PRIMES:
+            if p * p > n:
+                return True
+            if n % p == 0:
+                return n == p
+        if n < _TRIAL_DIVISION_LIMIT:
+            return True
+
+    s = 0
+    d = n - 1
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    if not _is_strong_probable_prime(n, 2, d, s):
+        return False
+
+    if n < (1 << 64):
+        for a in _DETERMINISTIC_MR_BASES_64[1:]:
+            if a % n == 0:
+                continue
+            if not _is_strong_probable_prime(n, a, d, s):
+                return False
+        return True
+
+    if method == "bpsw":
+        return _is_strong_lucas_probable_prime(n)
+
+    for _ in range(_mr_rounds_for_bits(n.bit_length()) - 1):
+        a = random.randint(3, n - 2)
+        if not _is_strong_probable_prime(n, a, d, s):
+            return False
+    return True
+
+# 批量试除的默认上界: 与 is_probable_prime 的试除使用同一张素数表
+DEFAULT_TRIAL_DIVISION_BOUND = SMALL_PRIMES[-1] + 1
+
+@lru_cache(maxsize=8)
+def _primorial(bound):
+    """所有小于 bound 的素数之积。"""
+    primes = SMALL_PRIMES if bound <= DEFAULT_TRIAL_DIVISION_BOUND else _primes_below(bound)
+    product = 1
+    for p in primes[:bisect_left(primes, bound)]:
+        product *= p
+    return product
+
+def _product_tree(values):
+    """
+    自底向上建立乘积树。
+
+    返回:
+        list: levels[0] 为 values 本身，levels[i+1] 的每一项是 levels[i] 中相邻两项之积，
+              最后一层只有一个结点 (所有值的乘积)。
+    """
+    levels = [list(values)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                       for i in range(0, len(level), 2)])
+    return levels
+
+def _remainder_tree(value, levels):
+    """
+    自顶向下的余数树: 先对根结点取一次模，再逐层用父结点的余数对子结点取模。
+    因为子结点整除父结点，(value mod 父结点) mod 子结点 = value mod 子结点，
+    而每一步处理的都是较小的数。
+
+    返回:
+        list: value 对 levels[0] 中每一项取模的结果。
+    """
+    remainders = [value % levels[-1][0]]
+    for level in reversed(levels[:-1]):
+        remainders = [remainders[i // 2] % node for i, node in enumerate(level)]
+    return remainders
+
+def batch_trial_division(candidates, bound=DEFAULT_TRIAL_DIVISION_BOUND):
+    """
+    用乘积树/余数树一次性筛选一批候选数，返回没有小于 bound 的素因子的那些。
+
+    设 P 为所有小于 bound 的素数之积。对候选数分组建立乘积树，
+    用余数树求出 P mod c_i，再由 gcd(P mod c_i, c_i) == 1 判断 c_i 是否有小素因子。
+    与逐个候选数对每个小素数取模相比，每个候选数只剩一次 C 实现的 gcd，
+    大整数取模都集中在树上完成。
+
+    注意: 小于 bound 的素数本身也会被筛掉 (它的素因子就是它自己)。
+
+    参数:
+        candidates (iterable of int): 待筛选的正整数。
+        bound (int): 试除的素数上界 (不含)。
+
+    返回:
+        list: 通过筛选的候选数，保持原来的顺序。
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    if any(c < 1 for c in candidates):
+        raise ValueError("Candidates must be positive integers")
+
+    primorial = _primorial(bound)
+    group_bits = max(1, int(primorial.bit_length() * BATCH_TRIAL_DIVISION_GROUP_FRACTION))
+
+    survivors = []
+    start = 0
+    while start < len(candidates):
+        # 按比特长度切出一组，使组内乘积不超过 group_bits 位 (至少包含一个候选数)
+        end = start + 1
+        total_bits = candidates[start].bit_length()
+        while end < len(candidates) and total_bits + candidates[end].bit_length() <= group_bits:
+            total_bits += candidates[end].bit_length()
+            end += 1
+
+        group = candidates[start:end]
+        remainders = _remainder_tree(primorial, _product_tree(group))
+        survivors.extend(c for c, r in zip(group, remainders) if gcd(r, c) == 1)
+        start = end
+
+    return survivors
+
 def generate_random_n_bit_odd_number(bits):
     """
     生成一个指定比特长度的随机奇数。
@@ -155,34 +911,321 @@ def generate_random_n_bit_odd_number(bits):
 
     return num
 
-def generate_large_prime(bits, k_miller_rabin=20):
+def _sieve_window(start, residues, count, primes, half_inverses, safe=False):
     """
-    生成一个指定比特长度的大素数 (高概率)。
+    对奇数序列 start, start+2, ..., start+2(count-1) 做筛选。
 
-    参数:
-        bits (int): 素数的期望比特长度 (例如 512, 1024)。
-        k_miller_rabin (int): 米勒-拉宾测试的轮数。
+    residues[j] 是 start 模 primes[j] 的余数。若 start + 2i ≡ 0 (mod p)，
+    则 i ≡ -start * 2^-1 (mod p)，从该位置起每隔 p 个候选都能被 p 整除。
+    safe 为 True 时候选数 q 还要求 2q+1 没有小因子: 2q+1 ≡ 0 (mod p) 等价于
+    q ≡ (p-1)/2 (mod p)，同样是每隔 p 个候选出现一次，一并筛掉。
 
     返回:
-        int: 一个很可能是素数的大整数。
+        bytearray: sieve[i] == 1 表示 start + 2i (以及 safe 时的 2(start + 2i) + 1)
+                   没有被表中任何素数整除。
     """
-    if bits < 2:
-        raise ValueError("Number of bits must be at least 2")
-    
-    candidate_count = 0
+    sieve = bytearray([1]) * count
+    for p, r, half in zip(primes, residues, half_inverses):
+        first = ((p - r) * half) % p
+        if first < count:
+            sieve[first::p] = bytes(len(range(first, count, p)))
+        if safe:
+            first = (((p - 1) // 2 - r) * half) % p
+            if first < count:
+                sieve[first::p] = bytes(len(range(first, count, p)))
+    return sieve
+
+def _passes_primality_test(candidate, method, k_miller_rabin, trial_division):
+    """按 generate_large_prime 的 method 参数对候选数运行素性测试。"""
+    if method == "legacy":
+        return is_prime_miller_rabin(candidate, k_miller_rabin)
+    return is_probable_prime(candidate, method, trial_division=trial_division)
+
+def _generate_large_prime_random(bits, k_miller_rabin, method, counters, cancel_event=None):
+    """每次尝试都重新抽取随机奇数的素数搜索 (sieve_size=0 时使用)。"""
     while True:
-        candidate_count += 1
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        counters["candidates"] += 1
         candidate = generate_random_n_bit_odd_number(bits)
 
         if candidate % 3 == 0 and candidate > 3: continue
         if candidate % 5 == 0 and candidate > 5: continue
         if candidate % 7 == 0 and candidate > 7: continue
-        # if candidate % 11 == 0 and candidate > 11: continue
-        # ...
 
-        if is_prime_miller_rabin(candidate, k_miller_rabin):
+        counters["mr_calls"] += 1
+        if _passes_primality_test(candidate, method, k_miller_rabin, trial_division=True):
             return candidate
 
+@lru_cache(maxsize=1)
+def _safe_prime_sieve_tables():
+    """安全素数搜索使用的奇素数表 (小于 SAFE_PRIME_SIEVE_BOUND) 及每个素数下 2 的逆元，首次使用时建立。"""
+    primes = _primes_below(SAFE_PRIME_SIEVE_BOUND)[1:]
+    return primes, [(p + 1) // 2 for p in primes]
+
+def _is_safe_prime_pair(q, method, k_miller_rabin):
+    """
+    判断 q 和 p = 2q+1 是否都是素数。先对 q 运行完整的素性测试，通过后再检查 p:
+    由 Pocklington 判定法，q 为素数且 q > sqrt(p) 时，只要 2^(p-1) ≡ 1 (mod p)
+    (且 gcd(2^2 - 1, p) = 1，对 p > 3 总成立) 即可证明 p 是素数，只需一次模幂。
+    """
+    if not _passes_primality_test(q, method, k_miller_rabin, trial_division=False):
+        return False
+    p = 2 * q + 1
+    return power(2, p - 1, p) == 1
+
+def _generate_large_prime_sieved(bits, k_miller_rabin, method, sieve_size, counters, cancel_event=None,
+                                 safe=False):
+    """
+    从一个随机起点开始按窗口递增搜索，只对筛选后的幸存者做米勒-拉宾测试。
+    如果提供了 cancel_event，每个窗口开始前检查一次，被置位时返回 None。
+
+    safe 为 True 时搜索 bits 位的安全素数 p = 2q+1: 窗口开在 bits-1 位的 q 上，
+    q 或 2q+1 有小因子的候选一并筛掉，幸存者用 _is_safe_prime_pair 检查，返回 p。
+    """
+    # 窗口中的候选数 (safe 时为 q) 的比特长度
+    candidate_bits = bits - 1 if safe else bits
+    upper = 1 << candidate_bits
+    sieve_primes, sieve_half_inverses = _safe_prime_sieve_tables() if safe else (_SIEVE_PRIMES, _SIEVE_HALF_INVERSES)
+    # 只用小于最小候选数 2^(candidate_bits-1) 的素数筛选，避免把素数本身筛掉
+    prime_count = bisect_left(sieve_primes, 1 << (candidate_bits - 1))
+    primes = sieve_primes[:prime_count]
+    half_inverses = sieve_half_inverses[:prime_count]
+
+    while True:
+        start = generate_random_n_bit_odd_number(candidate_bits)
+        residues = [start % p for p in primes]
+
+        while start < upper:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            count = min(sieve_size, (upper - start + 1) // 2)
+            sieve = _sieve_window(start, residues, count, primes, half_inverses, safe)
+
+            i = sieve.find(1)
+            while i != -1:
+                counters["mr_calls"] += 1
+                candidate = start + 2 * i
+                if safe:
+                    if _is_safe_prime_pair(candidate, method, k_miller_rabin):
+                        counters["candidates"] += i + 1
+                        return 2 * candidate + 1
+                elif _passes_primality_test(candidate, method, k_miller_rabin, trial_division=False):
+                    counters["candidates"] += i + 1
+                    return candidate
+                i = sieve.find(1, i + 1)
+
+            # 窗口内没有素数：平移到下一个窗口，余数表增量更新而不必重新计算大数取模
+            counters["candidates"] += count
+            start += 2 * count
+            residues = [(r + 2 * count) % p for r, p in zip(residues, primes)]
+
+        # 超出了 bits 位的范围，换一个随机起点重新开始
+
+def _generate_large_prime_batched(bits, k_miller_rabin, method, batch_size, counters, cancel_event=None):
+    """
+    每次随机抽取 batch_size 个奇数候选，用 batch_trial_division 一次性筛掉有小因子的，
+    再依次对幸存者做素性测试。适合候选数彼此独立 (不在同一窗口内) 的场景。
+    """
+    # 与窗口筛选一样，只用小于最小候选数 2^(bits-1) 的素数，避免把素数本身筛掉
+    bound = min(DEFAULT_TRIAL_DIVISION_BOUND, 1 << (bits - 1))
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        batch = [generate_random_n_bit_odd_number(bits) for _ in range(batch_size)]
+        survivors = batch_trial_division(batch, bound) if bound > 2 else batch
+
+        for candidate in survivors:
+            counters["mr_calls"] += 1
+            if _passes_primality_test(candidate, method, k_miller_rabin, trial_division=False):
+                counters["candidates"] += batch.index(candidate) + 1
+                return candidate
+        counters["candidates"] += batch_size
+
+# 并行素数搜索时，工作进程内共享的取消标志 (由进程池的 initializer 设置)
+_prime_search_cancel_event = None
+
+def _init_prime_search_worker(cancel_event):
+    """进程池工作进程的初始化函数：记录取消标志，并重新播种随机数。"""
+    global _prime_search_cancel_event
+    _prime_search_cancel_event = cancel_event
+    # CPython 3.7+ 在 os.fork() 后已自动为子进程重新播种 random；
+    # 这里只是防御性地再播种一次，以防其他解释器或启动方式沿用了相同的状态
+    random.seed()
+
+def _search_prime(bits, k_miller_rabin, sieve_size, method, batch_size, counters, cancel_event=None,
+                  safe=False):
+    """按 batch_size / sieve_size 选择候选数的产生方式并搜索一个素数 (safe 时为安全素数)。"""
+    if safe:
+        return _generate_large_prime_sieved(bits, k_miller_rabin, method, sieve_size, counters, cancel_event,
+                                            safe=True)
+    if batch_size > 0:
+        return _generate_large_prime_batched(bits, k_miller_rabin, method, batch_size, counters, cancel_event)
+    if sieve_size == 0:
+        return _generate_large_prime_random(bits, k_miller_rabin, method, counters, cancel_event)
+    return _generate_large_prime_sieved(bits, k_miller_rabin, method, sieve_size, counters, cancel_event)
+
+def _prime_search_worker(bits, k_miller_rabin, sieve_size, method, batch_size=0, safe=False):
+    """
+    在工作进程中搜索一个素数。
+
+    返回:
+        tuple: (prime, counters)。其他进程先找到结果而被取消时 prime 为 None。
+    """
+    counters = {"candidates": 0, "mr_calls": 0}
+    prime = _search_prime(bits, k_miller_rabin, sieve_size, method, batch_size, counters,
+                          _prime_search_cancel_event, safe)
+    return prime, counters
+
+def _write_prime_search_stats(stats, counters):
+    if stats is not None:
+        stats["candidates"] = counters["candidates"]
+        stats["sieved_out"] = counters["candidates"] - counters["mr_calls"]
+        stats["mr_calls"] = counters["mr_calls"]
+
+def _check_prime_search_args(bits, sieve_size, method, batch_size=0, safe=False):
+    if bits < 2:
+        raise ValueError("Number of bits must be at least 2")
+    if safe and bits < 3:
+        raise ValueError("Number of bits must be at least 3 for a safe prime")
+    if safe and (sieve_size == 0 or batch_size > 0):
+        raise ValueError("Safe prime search requires the window sieve (sieve_size > 0, batch_size = 0)")
+    if sieve_size < 0:
+        raise ValueError("Sieve size must be non-negative")
+    if batch_size < 0:
+        raise ValueError("Batch size must be non-negative")
+    if method not in ("mr", "bpsw", "legacy"):
+        raise ValueError(f"Unknown primality test method: {method}")
+
+def generate_large_primes(bits, count, k_miller_rabin=20, sieve_size=DEFAULT_SIEVE_SIZE, stats=None,
+                          method="bpsw", workers=None, batch_size=0, safe=False):
+    """
+    同时生成 count 个互不相同的指定比特长度的大素数 (例如RSA的 p 和 q)。
+
+    workers > 1 时使用进程池：每个工作进程从各自的随机起点搜索，
+    每找到一个素数就补派一个新任务，凑齐 count 个素数后置位共享的取消标志，
+    其余仍在搜索的进程在下一个筛选窗口开始前退出。
+
+    参数:
+        bits (int): 每个素数的比特长度。
+        count (int): 需要的素数个数。
+        k_miller_rabin, sieve_size, method, batch_size: 同 generate_large_prime。
+        stats (dict, optional): 汇总所有已完成搜索任务的统计信息 (同 generate_large_prime)。
+        workers (int, optional): 工作进程数。None 或 1 表示在当前进程中依次搜索。
+        safe (bool): 为 True 时搜索安全素数，见 generate_safe_prime。
+
+    返回:
+        list: count 个互不相同的素数。
+    """
+    _check_prime_search_args(bits, sieve_size, method, batch_size, safe)
+    if count < 1:
+        raise ValueError("Prime count must be at least 1")
+
+    totals = {"candidates": 0, "mr_calls": 0}
+    primes = []
+
+    if workers is None or workers <= 1:
+        while len(primes) < count:
+            counters = {"candidates": 0, "mr_calls": 0}
+            prime = _search_prime(bits, k_miller_rabin, sieve_size, method, batch_size, counters, safe=safe)
+            totals["candidates"] += counters["candidates"]
+            totals["mr_calls"] += counters["mr_calls"]
+            if prime not in primes:
+                primes.append(prime)
+        _write_prime_search_stats(stats, totals)
+        return primes
+
+    mp_context = multiprocessing.get_context()
+    cancel_event = mp_context.Event()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                             initializer=_init_prime_search_worker,
+                             initargs=(cancel_event,)) as executor:
+        pending = {
+            executor.submit(_prime_search_worker, bits, k_miller_rabin, sieve_size, method, batch_size, safe)
+            for _ in range(workers)
+        }
+        try:
+            while len(primes) < count:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    prime, counters = future.result()
+                    totals["candidates"] += counters["candidates"]
+                    totals["mr_calls"] += counters["mr_calls"]
+                    if prime is not None and prime not in primes and len(primes) < count:
+                        primes.append(prime)
+                # 还没凑齐时，给空闲下来的进程补派新的搜索任务
+                while len(primes) < count and len(pending) < workers:
+                    pending.add(executor.submit(_prime_search_worker, bits, k_miller_rabin,
+                                                sieve_size, method, batch_size, safe))
+        finally:
+            # 第一个 (或第 count 个) 结果出现后通知其余进程停止
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+
+    _write_prime_search_stats(stats, totals)
+    return primes
+
+def generate_large_prime(bits, k_miller_rabin=20, sieve_size=DEFAULT_SIEVE_SIZE, stats=None,
+                         method="bpsw", workers=None, batch_size=0):
+    """
+    生成一个指定比特长度的大素数 (高概率)。
+
+    先随机选取一个起点，然后把其后 sieve_size 个奇数作为一个窗口，
+    用前 2048 个素数一次性筛掉含有小因子的候选，只对幸存者运行
+    素性测试；窗口内没有素数时继续筛选下一个窗口。
+
+    参数:
+        bits (int): 素数的期望比特长度 (例如 512, 1024)。
+        k_miller_rabin (int): 米勒-拉宾测试的轮数，仅在 method="legacy" 时使用。
+        sieve_size (int): 每个筛选窗口包含的奇数候选个数。
+                          为 0 时退回到每次随机抽取并只试除 3, 5, 7 的旧方法。
+        stats (dict, optional): 如果提供，会写入本次搜索的统计信息:
+                                candidates (检查过的候选数)、sieved_out (被筛掉/试除掉的候选数)、
+                                mr_calls (实际运行素性测试的次数)。
+        method (str): 幸存候选数的素性测试方法。"bpsw" 和 "mr" 使用 is_probable_prime
+                      的分层流水线 (轮数随比特长度自动确定)；
+                      "legacy" 使用固定 k_miller_rabin 轮随机底数的 is_prime_miller_rabin。
+        workers (int, optional): 大于 1 时用该数量的进程并行搜索，最先找到的结果胜出，
+                                 见 generate_large_primes。
+        batch_size (int): 大于 0 时使用批量模式: 每次随机抽取 batch_size 个互相独立的奇数候选，
+                          用 batch_trial_division 的余数树一次性试除 (此时忽略 sieve_size)。
+
+    返回:
+        int: 一个很可能是素数的大整数。
+    """
+    _check_prime_search_args(bits, sieve_size, method, batch_size)
+    if workers is not None and workers > 1:
+        return generate_large_primes(bits, 1, k_miller_rabin, sieve_size, stats, method, workers,
+                                     batch_size)[0]
+
+    counters = {"candidates": 0, "mr_calls": 0}
+    try:
+        return _search_prime(bits, k_miller_rabin, sieve_size, method, batch_size, counters)
+    finally:
+        _write_prime_search_stats(stats, counters)
+
+def generate_safe_prime(bits, k_miller_rabin=20, sieve_size=SAFE_PRIME_SIEVE_SIZE, stats=None,
+                        method="bpsw", workers=None):
+    """
+    生成一个指定比特长度的安全素数 p = 2q+1 (q 也是素数)。
+
+    在 bits-1 位的 q 上按窗口筛选 (素数表上界为 SAFE_PRIME_SIEVE_BOUND)，
+    同一个窗口中同时筛掉 q 有小因子和 2q+1 有小因子的候选；幸存者先对 q 做完整的素性测试，
+    q 通过后再用一次以 2 为底的模幂 (Pocklington 判定) 证明 p 是素数。
+
+    参数:
+        bits (int): p 的比特长度，至少为 3。
+        k_miller_rabin, sieve_size, method, workers: 同 generate_large_prime
+                                                    (sieve_size 必须大于 0)。
+        stats (dict, optional): 同 generate_large_prime，统计的是 q 的候选数。
+
+    返回:
+        int: 安全素数 p，(p - 1) // 2 也是素数。
+    """
+    _check_prime_search_args(bits, sieve_size, method, safe=True)
+    return generate_large_primes(bits, 1, k_miller_rabin, sieve_size, stats, method, workers, safe=True)[0]
+
 if __name__ == "__main__":
     print(f"1234567^891011 % 101 = {power(1234567, 891011, 101)}") # 大数测试
 
@@ -0,0 +1,264 @@
+# app/utils/prime_pool.py
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+from app.utils.math_utils import generate_large_prime, is_probable_prime
+
+# 默认预备的素数比特长度:
+# 256/512/1024 对应 RSA-512/1024/2048 的 p 和 q，512/1024/2048 对应 ElGamal 的 p
+DEFAULT_POOL_BIT_SIZES = [256, 512, 1024, 2048]
+# 每种比特长度希望保有的素数个数
+DEFAULT_TARGET_DEPTH = 4
+# 生产者没有需要补充的比特长度时，两次检查之间的最长等待时间 (秒)
+PRODUCER_IDLE_WAIT_SECONDS = 5.0
+# 生产者子进程降低的调度优先级 (nice 值增量)，让素数搜索让出 CPU 给处理请求的进程
+PRODUCER_NICE_INCREMENT = 10
+# 池文件的权限: 池中是尚未使用的密钥素数，只允许所有者读写
+POOL_FILE_MODE = 0o600
+
+POOL_FILE_VERSION = 1
+
+def _lower_producer_priority():
+    """生产者子进程的初始化函数: 降低调度优先级 (不支持 os.nice 的平台上什么也不做)。"""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(PRODUCER_NICE_INCREMENT)
+        except OSError:
+            pass
+
+class PrimePool:
+    """
+    预先生成的素数池。
+
+    后台生产者线程为每种比特长度维持 target_depth 个已验证的素数，
+    密钥生成时通过 take(bits) 以 O(1) 的代价取出一个素数；
+    池为空时退回到实时搜索。实际的素数搜索在一个降低了优先级的子进程中进行
+    (use_process=False 时在生产者线程中进行)，生产者线程只负责调度，不会长时间占用 GIL。
+    子进程以 spawn 方式启动: 池通常在已经有多个线程的 Flask 进程中启动，在那里 fork 不安全。
+
+    持久化是可选的: 只有提供 path 时池的内容才会保存到本地文件，重启后从文件恢复
+    (加载时会重新做素性检测)。注意文件中的素数就是之后RSA/ElGamal私钥的素因子，
+    以明文形式保存 (文件权限为 0600)，只应在文件所在的磁盘受信任时启用。
+
+    注意: 每个素数只能被取出一次。取出后会立即把新的池内容写回文件，
+    以免重启后重复使用同一个素数。同一个池文件不能被多个进程同时使用。
+    """
+
+    def __init__(self, bit_sizes=DEFAULT_POOL_BIT_SIZES, target_depth=DEFAULT_TARGET_DEPTH,
+                 path=None, k_miller_rabin=20, use_process=True):
+        if target_depth < 1:
+            raise ValueError("Target depth must be at least 1")
+
+        self.bit_sizes = sorted(set(bit_sizes))
+        self.target_depth = target_depth
+        self.path = path
+        self.k_miller_rabin = k_miller_rabin
+        self.use_process = use_process
+
+        self._pools = {bits: deque() for bits in self.bit_sizes}
+        self._hits = {bits: 0 for bits in self.bit_sizes}
+        self._misses = {bits: 0 for bits in self.bit_sizes}
+        self._produced = {bits: 0 for bits in self.bit_sizes}
+        self._production_seconds = {bits: 0.0 for bits in self.bit_sizes}
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._search_pool = None
+
+        if self.path is not None:
+            self.load()
+
+    # --- 生产者线程 ---
+
+    def start(self):
+        """启动后台生产者线程 (重复调用无副作用)。"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if self.use_process and self._search_pool is None:
+            self._search_pool = multiprocessing.get_context("spawn").Pool(1, initializer=_lower_producer_priority)
+        self._thread = threading.Thread(target=self._produce_loop, name="prime-pool-producer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        通知生产者线程停止并等待其退出。
+        先终止子进程 (连同其中正在进行的搜索)，因此不需要等一次搜索结束；
+        use_process=False 时正在进行的搜索会先完成。
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._search_pool is not None:
+            self._search_pool.terminate()
+            self._search_pool = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _most_needed_bits(self):
+        """返回缺口最大的比特长度 (同样缺口时优先小素数)，都已满时返回 None。"""
+        with self._lock:
+            shortfalls = [(self.target_depth - len(self._pools[bits]), bits) for bits in self.bit_sizes]
+        shortfall, bits = max(shortfalls, key=lambda item: (item[0], -item[1]))
+        return bits if shortfall > 0 else None
+
+    def _produce_loop(self):
+        while not self._stop.is_set():
+            bits = self._most_needed_bits()
+            if bits is None:
+                self._wakeup.wait(PRODUCER_IDLE_WAIT_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            start_time = time.perf_counter()
+            search_pool = self._search_pool
+            if search_pool is not None:
+                try:
+                    result = search_pool.apply_async(generate_large_prime, (bits, self.k_miller_rabin),
+                                                     callback=lambda _: self._wakeup.set(),
+                                                     error_callback=lambda _: self._wakeup.set())
+                except ValueError:
+                    # stop() 已经终止了进程池
+                    break
+                # 等待子进程的结果时不持有 GIL；搜索完成或 stop() 都会唤醒生产者线程
+                while not result.ready() and not self._stop.is_set():
+                    self._wakeup.wait()
+                    self._wakeup.clear()
+                if self._stop.is_set():
+                    break
+                prime = result.get()
+            else:
+                prime = generate_large_prime(bits, self.k_miller_rabin)
+            elapsed = time.perf_counter() - start_time
+
+            with self._lock:
+                self._pools[bits].append(prime)
+                self._produced[bits] += 1
+                self._production_seconds[bits] += elapsed
+            self.save()
+
+    # --- 消费者接口 ---
+
+    def take(self, bits):
+        """
+        取出一个 bits 位的素数。池中有现成的素数时直接返回 (命中)，
+        否则在当前线程中实时搜索一个 (未命中)。
+
+        参数:
+            bits (int): 素数的比特长度。
+
+        返回:
+            int: 一个 bits 位的素数。
+        """
+        prime = None
+        with self._lock:
+            pool = self._pools.get(bits)
+            if pool:
+                prime = pool.popleft()
+                self._hits[bits] += 1
+            else:
+                self._misses[bits] = self._misses.get(bits, 0) + 1
+
+        # 无论命中与否都唤醒生产者，尽快补充该比特长度
+        self._wakeup.set()
+        if prime is None:
+            return generate_large_prime(bits, self.k_miller_rabin)
+
+        # 先把取走后的池写回磁盘，再把素数交给调用方
+        self.save()
+        return prime
+
+    def stats(self):
+        """
+        返回池的可观测指标。
+
+        返回:
+            dict: running (生产者是否在运行) 以及按比特长度统计的
+                  depth (当前素数个数)、target_depth、hits、misses、
+                  produced (后台生产的素数个数) 和 refill_rate_per_sec (后台平均每秒生产的素数个数)。
+        """
+        with self._lock:
+            sizes = {}
+            for bits in sorted(set(self.bit_sizes) | set(self._misses)):
+                produced = self._produced.get(bits, 0)
+                seconds = self._production_seconds.get(bits, 0.0)
+                sizes[str(bits)] = {
+                    "depth": len(self._pools.get(bits, ())),
+                    "target_depth": self.target_depth if bits in self._pools else 0,
+                    "hits": self._hits.get(bits, 0),
+                    "misses": self._misses.get(bits, 0),
+                    "produced": produced,
+                    "refill_rate_per_sec": produced / seconds if seconds > 0 else 0.0
+                }
+        return {"running": self.is_running(), "bit_sizes": sizes}
+
+    # --- 持久化 ---
+
+    def save(self):
+        """
+        把当前池内容原子地写入 path (先写权限为 0600 的临时文件再替换)。未设置 path 时什么也不做。
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "version": POOL_FILE_VERSION,
+                "primes": {str(bits): [format(p, 'x') for p in pool] for bits, pool in self._pools.items()}
+            }
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, POOL_FILE_MODE)
+            # 临时文件可能是以前用更宽的权限创建的，O_CREAT 的权限只对新文件生效
+            os.chmod(tmp_path, POOL_FILE_MODE)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def load(self):
+        """
+        从 path 恢复池内容。文件不存在或格式不对时保持空池；
+        每个素数都会重新检查比特长度和素性，未通过的直接丢弃。
+
+        返回:
+            int: 成功恢复的素数个数。
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get("version") != POOL_FILE_VERSION:
+            return 0
+
+        loaded = 0
+        with self._lock:
+            for bits_str, hex_primes in data.get("primes", {}).items():
+                try:
+                    bits = int(bits_str)
+                except ValueError:
+                    continue
+                if bits not in self._pools:
+                    continue
+                pool = self._pools[bits]
+                for hex_prime in hex_primes:
+                    try:
+                        prime = int(hex_prime, 16)
+                    except (TypeError, ValueError):
+                        continue
+                    if prime.bit_length() != bits or prime in pool or not is_probable_prime(prime):
+                        continue
+                    if len(pool) < self.target_depth:
+                        pool.append(prime)
+                        loaded += 1
+        return loaded
@@ -0,0 +1,73 @@
+# tests/test_arithmetic_backend.py
+
+import random
+import unittest
+
+from app.utils import arithmetic_backend
+from app.utils.arithmetic_backend import available_backends, get_backend, set_backend, use_backend
+from app.utils.math_utils import is_prime_miller_rabin
+from app.core_algorithms.rsa_manual.rsa_core import generate_keys, encrypt_with_padding, decrypt_with_padding
+
+class TestArithmeticBackend(unittest.TestCase):
+
+    def test_available_backends(self):
+        backends = available_backends()
+        self.assertIn("educational", backends)
+        self.assertIn("builtin", backends)
+        with self.assertRaises(ValueError):
+            get_backend("no-such-backend")
+
+    def test_backend_operations(self):
+        for name in available_backends():
+            backend = get_backend(name)
+            with self.subTest(backend=name):
+                mod = random.getrandbits(256) | 1
+                base, exp = random.getrandbits(300), random.getrandbits(256)
+                self.assertEqual(backend.power(base, exp, mod), pow(base, exp, mod))
+                self.assertEqual(backend.fixed_base_power(3, exp, mod), pow(3, exp, mod))
+                self.assertIs(type(backend.power(base, exp, mod)), int)
+
+                self.assertEqual(backend.mod_inverse(3, 11), 4)
+                with self.assertRaises(ValueError):
+                    backend.mod_inverse(4, 10)
+                with self.assertRaises(ValueError):
+                    backend.mod_inverse(5, 1)
+                with self.assertRaises(ValueError):
+                    backend.power(2, 3, 0)
+
+                for a, b in [(48, 18), (0, 28), (28, 0), (65537, 10200), (-35, 15), (7, -1),
+                             (random.getrandbits(512), random.getrandbits(500))]:
+                    g, x, y = backend.extended_gcd(a, b)
+                    self.assertEqual(a * x + b * y, g)
+
+                self.assertTrue(backend.is_prime(65537))
+                self.assertFalse(backend.is_prime(65537 * 257))
+                for bits in [2, 3, 16, 128]:
+                    prime = backend.generate_prime(bits)
+                    self.assertEqual(prime.bit_length(), bits)
+                    self.assertTrue(is_prime_miller_rabin(prime, k=40))
+
+    def test_switch_backend(self):
+        original = get_backend()
+        with use_backend("builtin") as backend:
+            self.assertEqual(backend.name, "builtin")
+            self.assertIs(get_backend(), backend)
+            self.assertEqual(arithmetic_backend.power(2, 10, 1000), 24)
+        self.assertIs(get_backend(), original)
+
+        previous = set_backend("builtin")
+        try:
+            self.assertIs(previous, original)
+        finally:
+            set_backend(previous.name)
+
+    def test_rsa_roundtrip_on_each_backend(self):
+        message = b"backend round trip"
+        for name in available_backends():
+            with self.subTest(backend=name), use_backend(name):
+                public_key, private_key = generate_keys(bits=512)
+                ciphertext = encrypt_with_padding(public_key, message)
+                self.assertEqual(decrypt_with_padding(private_key, ciphertext), message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/test_ecc_core.py
+
+import random
+import unittest
+
+from app.core_algorithms.ecc_manual.ecc_core import (
+    CURVE_PARAMETERS,
+    CurvePoint,
+    get_curve_by_name,
+    generate_ecc_keys,
+    encrypt_message_ecc,
+    decrypt_message_ecc
+)
+
+class TestECCCore(unittest.TestCase):
+
+    def test_known_multiple(self):
+        # secp256k1 上的 2G
+        G = get_curve_by_name("secp256k1").G
+        self.assertEqual((2 * G).x, 0xC6047F9441ED7D6D3045406E95C07CD85C778E4B8CEF3CA7ABAC09B95C709EE5)
+        self.assertEqual((2 * G).y, 0x1AE168FEA63DC339A3C58419466CEAEEF7F632653266D0E1236431A950CFE52A)
+
+    def test_jacobian_matches_affine(self):
+        for curve_name in CURVE_PARAMETERS:
+            curve = get_curve_by_name(curve_name)
+            G = curve.G
+            P = 12345 * G
+            scalars = [1, 2, 3, curve.n - 1, curve.n + 1, -7] + [random.randrange(1, curve.n) for _ in range(3)]
+            for k in scalars:
+                with self.subTest(curve=curve_name, k=k):
+                    result = k * P
+                    self.assertEqual(result, P._scalar_multiply_affine(k))
+                    self.assertTrue(curve.is_on_curve(result))
+            # nG = O，(n-1)G = -G
+            self.assertTrue((curve.n * G).is_infinity())
+            self.assertEqual((curve.n - 1) * G, CurvePoint(curve, G.x, (-G.y) % curve.p))
+            self.assertTrue((0 * G).is_infinity())
+
+    def test_encrypt_decrypt(self):
+        for curve_name in CURVE_PARAMETERS:
+            private_key, public_key = generate_ecc_keys(curve_name)
+            message = b"ECIES message"
+            ephemeral_R, ciphertext = encrypt_message_ecc(public_key, message)
+            self.assertEqual(decrypt_message_ecc(private_key, ephemeral_R, ciphertext), message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+# tests/test_elgamal_core.py
+
+import os
+import random
+import time
+import unittest
+
+from app.core_algorithms.elgamal_manual.elgamal_core import (
+    generate_keys,
+    encrypt,
+    decrypt,
+    decrypt_many,
+    get_group_by_name,
+    ElGamalEncryptor,
+    ElGamalPrivateKey,
+    encrypt_bytes,
+    decrypt_bytes,
+    iter_decrypt_bytes,
+    message_block_size,
+    ELGAMAL_GROUPS,
+    ElGamalKeyGenerationError,
+    ElGamalEncryptionError,
+    ElGamalDecryptionError
+)
+from app.utils.math_utils import get_fixed_base_table, is_prime_miller_rabin
+
+class TestElGamalCore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.public_key, cls.private_key_x = generate_keys(bits=128, safe_prime=True)
+
+    def test_encrypt_decrypt_roundtrip(self):
+        p, g, _ = self.public_key
+        for _ in range(5):
+            message = random.randrange(0, p)
+            ciphertext = encrypt(self.public_key, message)
+            self.assertEqual(decrypt(self.private_key_x, p, g, ciphertext), message)
+
+    def test_decrypt_many(self):
+        p, g, _ = self.public_key
+        messages = [random.randrange(0, p) for _ in range(20)]
+        ciphertexts = [encrypt(self.public_key, m) for m in messages]
+        self.assertEqual(decrypt_many(self.private_key_x, p, g, ciphertexts), messages)
+        self.assertEqual(decrypt_many(self.private_key_x, p, g, []), [])
+
+        # 无效密文应报告其下标
+        bad_ciphertexts = ciphertexts[:3] + [(0, 1)]
+        with self.assertRaisesRegex(ElGamalDecryptionError, "ciphertext 3"):
+            decrypt_many(self.private_key_x, p, g, bad_ciphertexts)
+        with self.assertRaisesRegex(ElGamalDecryptionError, "ciphertext 1"):
+            decrypt_many(self.private_key_x, p, g, [ciphertexts[0], (p, 1)])
+
+    def test_generate_keys_safe_prime_group(self):
+        p, g, y = self.public_key
+        q = (p - 1) // 2
+        self.assertTrue(is_prime_miller_rabin(q, k=40), "p 应为安全素数")
+        self.assertEqual(pow(g, q, p), 1, "g 应生成 q 阶子群")
+        self.assertNotEqual(g % p, 1)
+        self.assertEqual(pow(y, q, p), 1)
+        self.assertTrue(1 <= self.private_key_x < q)
+
+    def test_generate_keys_plain_prime(self):
+        get_fixed_base_table.cache_clear()
+        public_key, private_key_x = generate_keys(bits=64, safe_prime=False)
+        p, g, _ = public_key
+        message = random.randrange(0, p)
+        self.assertEqual(decrypt(private_key_x, p, g, encrypt(public_key, message)), message)
+        # 新生成的 p 不建立固定底数预计算表，只有预定义群才会
+        self.assertEqual(get_fixed_base_table.cache_info().currsize, 0)
+        generate_keys(group="modp1024")
+        self.assertEqual(get_fixed_base_table.cache_info().currsize, 1)
+
+    def test_predefined_groups(self):
+        for name in ELGAMAL_GROUPS:
+            p, g = get_group_by_name(name)
+            self.assertEqual(p.bit_length(), int(name.lstrip("modpfhe")))
+            self.assertEqual(pow(g, (p - 1) // 2, p), 1, f"{name}: g 应生成 q 阶子群")
+        with self.assertRaises(ValueError):
+            get_group_by_name("modp123")
+
+    def test_generate_keys_with_group(self):
+        public_key, private_key_x = generate_keys(group="modp1024")
+        p, g, y = public_key
+        self.assertEqual((p, g), get_group_by_name("modp1024"))
+        self.assertEqual(pow(g, private_key_x, p), y)
+        message = random.randrange(0, p)
+        self.assertEqual(decrypt(private_key_x, p, g, encrypt(public_key, message)), message)
+        with self.assertRaises(ElGamalKeyGenerationError):
+            generate_keys(group="unknown")
+
+    def test_encryptor_pool(self):
+        p, g, _ = self.public_key
+        encryptor = ElGamalEncryptor(self.public_key, pool_size=4)
+        self.assertEqual(encryptor.fill(), 4)
+        ciphertexts = [encryptor.encrypt(m) for m in range(6)]
+        self.assertEqual(decrypt_many(self.private_key_x, p, g, ciphertexts), list(range(6)))
+        self.assertEqual(len({c1 for c1, _ in ciphertexts}), 6, "每个预计算对只能使用一次")
+
+        stats = encryptor.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["depth"]), (4, 2, 0))
+        with self.assertRaises(ElGamalEncryptionError):
+            encryptor.encrypt(p)
+
+    def test_encryptor_background_producer(self):
+        encryptor = ElGamalEncryptor(self.public_key, pool_size=3)
+        encryptor.start()
+        try:
+            deadline = time.time() + 10
+            while encryptor.stats()["depth"] < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(encryptor.is_running())
+            self.assertEqual(encryptor.stats()["depth"], 3)
+        finally:
+            encryptor.stop()
+        self.assertFalse(encryptor.is_running())
+
+    def test_private_key_context(self):
+        p, g, y = self.public_key
+        private_key = ElGamalPrivateKey(p, g, self.private_key_x)
+        # 与 p 同长度的私钥不走批量求逆路径 (随机的 x 有约 1/16 的概率短 4 位以上，因此固定 x)
+        self.assertFalse(ElGamalPrivateKey(p, g, p // 2)._prefers_batch_inverse(1000))
+        messages = [random.randrange(0, p) for _ in range(10)]
+        ciphertexts = [encrypt(self.public_key, m) for m in messages]
+        self.assertEqual([private_key.decrypt(c) for c in ciphertexts], messages)
+        self.assertEqual(private_key.decrypt_many(ciphertexts), messages)
+        with self.assertRaisesRegex(ElGamalDecryptionError, "ciphertext 2"):
+            private_key.decrypt_many(ciphertexts[:2] + [(0, 5)])
+        with self.assertRaises(ElGamalDecryptionError):
+            ElGamalPrivateKey(p, g, p - 1)
+
+        # 短指数私钥: x 远短于 p-1-x 时走批量求逆路径
+        short_x = random.getrandbits(32) | 1
+        short_public_key = (p, g, pow(g, short_x, p))
+        short_private_key = ElGamalPrivateKey(p, g, short_x)
+        self.assertTrue(short_private_key._prefers_batch_inverse(len(messages)))
+        short_ciphertexts = [encrypt(short_public_key, m) for m in messages]
+        self.assertEqual(short_private_key.decrypt_many(short_ciphertexts), messages)
+        with self.assertRaisesRegex(ElGamalDecryptionError, "ciphertext 1"):
+            short_private_key.decrypt_many([short_ciphertexts[0], (0, 5)])
+
+    def test_block_mode_roundtrip(self):
+        p, g, _ = self.public_key
+        private_key = ElGamalPrivateKey(p, g, self.private_key_x)
+        for size in [0, 1, 15, 16, 17, 300]:
+            message = os.urandom(size)
+            ciphertexts = encrypt_bytes(self.public_key, message, workers=1)
+            self.assertEqual(decrypt_bytes(private_key, ciphertexts), message)
+            self.assertEqual(b"".join(iter_decrypt_bytes(private_key, iter(ciphertexts))), message)
+
+        # 进程池路径与顺序路径得到同样的明文
+        message = os.urandom(200)
+        ciphertexts = encrypt_bytes(self.public_key, message, workers=2)
+        self.assertEqual(decrypt_bytes(private_key, ciphertexts, workers=2), message)
+
+        # 长度头小于块大小的小模数: 长度头跨越多个块
+        small_public_key, small_x = generate_keys(bits=16, safe_prime=False)
+        small_private_key = ElGamalPrivateKey(small_public_key[0], small_public_key[1], small_x)
+        self.assertEqual(decrypt_bytes(small_private_key, encrypt_bytes(small_public_key, b"hello")), b"hello")
+
+    def test_block_mode_errors(self):
+        p, g, _ = self.public_key
+        private_key = ElGamalPrivateKey(p, g, self.private_key_x)
+        ciphertexts = encrypt_bytes(self.public_key, os.urandom(100))
+        with self.assertRaisesRegex(ElGamalDecryptionError, "length header"):
+            decrypt_bytes(private_key, ciphertexts[:-1])
+        with self.assertRaisesRegex(ElGamalDecryptionError, "ciphertext 1"):
+            decrypt_bytes(private_key, [ciphertexts[0], (0, 1)])
+
+        # 消息结束后多出一个密文块
+        with self.assertRaisesRegex(ElGamalDecryptionError, "length header"):
+            decrypt_bytes(private_key, ciphertexts + [encrypt(self.public_key, 0)])
+        with self.assertRaisesRegex(ElGamalDecryptionError, "length header"):
+            b"".join(iter_decrypt_bytes(private_key, ciphertexts + [encrypt(self.public_key, 0)]))
+
+        # 篡改最后一块的补零字节 (消息长度为块大小时最后一块含有补零)
+        ciphertexts = encrypt_bytes(self.public_key, os.urandom(message_block_size(p)))
+        last_block = private_key.decrypt(ciphertexts[-1])
+        tampered = ciphertexts[:-1] + [encrypt(self.public_key, last_block | 1)]
+        with self.assertRaisesRegex(ElGamalDecryptionError, "length header"):
+            decrypt_bytes(private_key, tampered)
+        with self.assertRaises(ElGamalEncryptionError):
+            encrypt_bytes(self.public_key, "not bytes")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_prime_pool.py
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from app.utils.math_utils import is_prime_miller_rabin, generate_large_prime
+from app.utils.prime_pool import PrimePool
+
+class TestPrimePool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool_path = os.path.join(self.tmp_dir.name, "prime_pool.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _wait_until_full(self, pool, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(s["depth"] >= s["target_depth"] for s in pool.stats()["bit_sizes"].values()):
+                return
+            time.sleep(0.01)
+        self.fail("素数池没有在限定时间内补满")
+
+    def test_take_hit_and_miss(self):
+        pool = PrimePool(bit_sizes=[32], target_depth=2)
+        # 池为空: 未命中，退回实时搜索
+        prime = pool.take(32)
+        self.assertEqual(prime.bit_length(), 32)
+        self.assertTrue(is_prime_miller_rabin(prime, k=40))
+
+        pool.start()
+        try:
+            self._wait_until_full(pool)
+            prime = pool.take(32)
+            self.assertEqual(prime.bit_length(), 32)
+            self.assertTrue(is_prime_miller_rabin(prime, k=40))
+        finally:
+            pool.stop()
+
+        stats = pool.stats()["bit_sizes"]["32"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertGreaterEqual(stats["produced"], 2)
+        self.assertGreater(stats["refill_rate_per_sec"], 0)
+
+        # 未配置的比特长度也会记录为未命中
+        self.assertEqual(pool.take(40).bit_length(), 40)
+        self.assertEqual(pool.stats()["bit_sizes"]["40"]["misses"], 1)
+
+    def test_stop_does_not_wait_for_search(self):
+        # 3072 位的搜索要好几秒，stop() 应该在搜索进行中立即返回
+        pool = PrimePool(bit_sizes=[3072], target_depth=1)
+        pool.start()
+        time.sleep(0.5)
+        start_time = time.perf_counter()
+        pool.stop()
+        self.assertLess(time.perf_counter() - start_time, 1.0)
+        self.assertFalse(pool.is_running())
+
+    def test_persistence_round_trip(self):
+        pool = PrimePool(bit_sizes=[32, 48], target_depth=3, path=self.pool_path)
+        pool.start()
+        try:
+            self._wait_until_full(pool)
+        finally:
+            pool.stop()
+
+        taken = pool.take(48)
+        restored = PrimePool(bit_sizes=[32, 48], target_depth=3, path=self.pool_path)
+        stats = restored.stats()["bit_sizes"]
+        self.assertEqual(stats["32"]["depth"], 3)
+        self.assertEqual(stats["48"]["depth"], 2, "取出的素数不应在重启后再次出现")
+
+        remaining = [restored.take(48) for _ in range(2)]
+        self.assertNotIn(taken, remaining)
+
+    @unittest.skipUnless(os.name == "posix", "文件权限只在 POSIX 系统上检查")
+    def test_pool_file_permissions(self):
+        # 已存在的宽权限文件被替换后也应为 0600
+        with open(self.pool_path, "w") as f:
+            f.write("{}")
+        os.chmod(self.pool_path, 0o644)
+        pool = PrimePool(bit_sizes=[32], target_depth=1, path=self.pool_path, use_process=False)
+        pool.save()
+        self.assertEqual(os.stat(self.pool_path).st_mode & 0o777, 0o600)
+
+    def test_load_rejects_bad_entries(self):
+        prime = generate_large_prime(32)
+        with open(self.pool_path, "w") as f:
+            json.dump({"version": 1, "primes": {"32": [format(prime, 'x'), format(prime * 3, 'x'),
+                                                       format(2**32 + 15, 'x'), "not-hex"]}}, f)
+        pool = PrimePool(bit_sizes=[32], target_depth=4, path=self.pool_path)
+        self.assertEqual(pool.stats()["bit_sizes"]["32"]["depth"], 1)
+        self.assertEqual(pool.take(32), prime)
+
+        with open(self.pool_path, "w") as f:
+            f.write("{ broken json")
+        pool = PrimePool(bit_sizes=[32], target_depth=4, path=self.pool_path)
+        self.assertEqual(pool.stats()["bit_sizes"]["32"]["depth"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,283 @@
+# tests/test_rsa_core.py
+
+import io
+import os
+import tempfile
+import unittest
+
+from app.core_algorithms.rsa_manual.rsa_core import (
+    generate_keys,
+    encrypt_with_padding,
+    decrypt_with_padding,
+    RSAPrivateKey,
+    CRTKeyCache,
+    recover_prime_factors,
+    RSAKeyGenerationError,
+    RSADecryptionError,
+    RSAEncryptionError,
+    encrypt_many,
+    decrypt_many,
+    RSABatchKey,
+    generate_batch_keys,
+    batch_decrypt,
+    hybrid_encrypt,
+    hybrid_decrypt,
+    hybrid_encrypt_stream,
+    hybrid_decrypt_stream,
+    hybrid_encrypt_file,
+    hybrid_decrypt_file,
+    sign,
+    verify,
+    verify_many,
+    RSASignatureError
+)
+
+class TestRSACore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.public_key, cls.private_key = generate_keys(bits=512)
+
+    def test_private_key_crt_parameters(self):
+        key = self.private_key
+        self.assertTrue(key.has_crt)
+        self.assertEqual(key.p * key.q, key.n)
+        self.assertEqual(key.dp, key.d % (key.p - 1))
+        self.assertEqual(key.dq, key.d % (key.q - 1))
+        self.assertEqual((key.qinv * key.q) % key.p, 1)
+
+        # 与旧的 (n, d) 元组兼容
+        n, d = key
+        self.assertEqual((n, d), (key.n, key.d))
+        self.assertEqual(key[1], key.d)
+        self.assertEqual(tuple(key), (key.n, key.d))
+
+    def test_crt_and_plain_decryption_agree(self):
+        for _ in range(5):
+            message = os.urandom(20)
+            ciphertext = encrypt_with_padding(self.public_key, message)
+            self.assertEqual(decrypt_with_padding(self.private_key, ciphertext), message)
+            self.assertEqual(decrypt_with_padding(tuple(self.private_key), ciphertext), message)
+
+        n = self.private_key.n
+        for c in [0, 1, 2, n - 1, self.private_key.p, self.private_key.q]:
+            self.assertEqual(self.private_key.private_power(c), pow(c, self.private_key.d, n))
+
+    def test_private_key_validation(self):
+        key = self.private_key
+        with self.assertRaises(ValueError):
+            RSAPrivateKey(key.n, key.d, key.p)
+        with self.assertRaises(ValueError):
+            RSAPrivateKey(key.n + 2, key.d, key.p, key.q)
+        self.assertFalse(RSAPrivateKey(key.n, key.d).has_crt)
+
+    def test_recover_prime_factors(self):
+        n, e = self.public_key
+        p, q = recover_prime_factors(n, e, self.private_key.d)
+        self.assertEqual({p, q}, {self.private_key.p, self.private_key.q})
+        with self.assertRaises(ValueError):
+            recover_prime_factors(n, e + 2, self.private_key.d)
+
+    def test_crt_key_cache(self):
+        n, e = self.public_key
+        d = self.private_key.d
+        cache = CRTKeyCache(max_size=2)
+        key = cache.get_private_key(n, e, d)
+        self.assertTrue(key.has_crt)
+        self.assertIs(cache.get_private_key(n, e, d), key)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+        # e 不匹配时返回不带 CRT 参数的密钥，解密仍然正确，但失败结果不写入缓存
+        other_public_key, other_private_key = generate_keys(bits=256)
+        fallback_key = cache.get_private_key(other_private_key.n, 3, other_private_key.d)
+        self.assertFalse(fallback_key.has_crt)
+        ciphertext = encrypt_with_padding(other_public_key, b"fallback")
+        self.assertEqual(decrypt_with_padding(fallback_key, ciphertext), b"fallback")
+        self.assertEqual((cache.stats()["failures"], cache.stats()["size"]), (1, 1))
+
+        # 之后带正确 e 的请求仍能恢复出 CRT 参数
+        self.assertTrue(cache.get_private_key(other_private_key.n, other_public_key[1], other_private_key.d).has_crt)
+        self.assertEqual(cache.stats()["size"], 2)
+
+        # 超过 max_size 时淘汰最久未使用的密钥
+        _, third_private_key = generate_keys(bits=256)
+        cache.get_private_key(third_private_key.n, 65537, third_private_key.d)
+        self.assertEqual(cache.stats()["size"], 2)
+        cache.get_private_key(n, e, d)
+        self.assertEqual(cache.stats()["misses"], 5)
+
+    def test_multi_prime_keys(self):
+        for bits, num_primes in [(384, 3), (512, 4), (301, 3)]:
+            public_key, private_key = generate_keys(bits=bits, num_primes=num_primes)
+            n, e = public_key
+            primes = private_key.primes
+            self.assertEqual(len(primes), num_primes)
+            self.assertEqual(len(set(primes)), num_primes)
+            product = 1
+            for prime in primes:
+                product *= prime
+            self.assertEqual(product, n)
+
+            # RFC 8017 的 (r_i, d_i, t_i)
+            r_product = private_key.p * private_key.q
+            for r, d_i, t_i in private_key.other_prime_infos:
+                self.assertEqual(d_i, private_key.d % (r - 1))
+                self.assertEqual((t_i * r_product) % r, 1)
+                r_product *= r
+
+            for c in [0, 1, 2, n - 1, primes[-1]]:
+                self.assertEqual(private_key.private_power(c), pow(c, private_key.d, n))
+            message = os.urandom(10)
+            ciphertext = encrypt_with_padding(public_key, message)
+            self.assertEqual(decrypt_with_padding(private_key, ciphertext), message)
+
+            # 由 (n, e, d) 恢复全部素因子
+            self.assertEqual(recover_prime_factors(n, e, private_key.d), sorted(primes, reverse=True))
+            recovered_key = CRTKeyCache().get_private_key(n, e, private_key.d)
+            self.assertEqual(decrypt_with_padding(recovered_key, ciphertext), message)
+
+        with self.assertRaises(RSAKeyGenerationError):
+            generate_keys(bits=512, num_primes=1)
+        with self.assertRaises(ValueError):
+            RSAPrivateKey(self.private_key.n, self.private_key.d, self.private_key.p, self.private_key.q, [7])
+
+    def test_encrypt_decrypt_many(self):
+        messages = [os.urandom(size) for size in [0, 1, 20, 53]]
+        ciphertexts = encrypt_many(self.public_key, messages)
+        self.assertEqual(len(ciphertexts), len(messages))
+        self.assertEqual(decrypt_many(self.private_key, ciphertexts), messages)
+        self.assertEqual(decrypt_many(tuple(self.private_key), ciphertexts), messages)
+        self.assertEqual([decrypt_with_padding(self.private_key, c) for c in ciphertexts], messages)
+        self.assertEqual(encrypt_many(self.public_key, []), [])
+
+        # 进程池路径
+        ciphertexts = encrypt_many(self.public_key, messages, workers=2)
+        self.assertEqual(decrypt_many(self.private_key, ciphertexts, workers=2), messages)
+
+        with self.assertRaisesRegex(RSAEncryptionError, "message 1"):
+            encrypt_many(self.public_key, [b"ok", os.urandom(60)])
+        with self.assertRaisesRegex(RSADecryptionError, "ciphertext 1"):
+            decrypt_many(self.private_key, [ciphertexts[0], bytes(len(ciphertexts[0]))])
+
+    def test_sign_verify(self):
+        message = b"signed message"
+        # SHA-512 的编码消息需要至少 94 字节，因此这里使用 1024 位的密钥
+        public_key, private_key = generate_keys(bits=1024)
+        for hash_name in ["sha256", "sha384", "sha512"]:
+            signature = sign(private_key, message, hash_name)
+            self.assertEqual(len(signature), 128)
+            # CRT 签名与直接计算 m^d mod n 的结果一致 (PKCS#1 v1.5 签名是确定性的)
+            self.assertEqual(signature, sign(tuple(private_key), message, hash_name))
+            self.assertTrue(verify(public_key, message, signature, hash_name))
+
+        signature = sign(private_key, message)
+        self.assertFalse(verify(public_key, b"other message", signature))
+        self.assertFalse(verify(public_key, message, signature, "sha512"))
+        self.assertFalse(verify(public_key, message, signature[:-1]))
+        tampered = bytes([signature[0] ^ 1]) + signature[1:]
+        self.assertFalse(verify(public_key, message, tampered))
+
+        with self.assertRaises(ValueError):
+            sign(private_key, message, "md5")
+        with self.assertRaises(TypeError):
+            sign(private_key, "text")
+        with self.assertRaises(RSASignatureError):
+            sign(self.private_key, message, "sha512")
+        self.assertFalse(verify(self.public_key, message, signature, "sha512"))
+
+    def test_crt_signature_fault_check(self):
+        n, e = self.public_key
+        key = self.private_key
+        self.assertEqual(key.public_exponent, e)
+        # 没有提供 e 时由 d 和素因子算出
+        self.assertEqual(RSAPrivateKey(n, key.d, key.p, key.q).public_exponent, e)
+
+        # 模拟一半模幂出错: 错误的 dp 得到的签名不能被返回
+        faulty_key = RSAPrivateKey(n, key.d, key.p, key.q, e=e)
+        faulty_key.dp = (faulty_key.dp + 1) % (key.p - 1)
+        with self.assertRaises(RSASignatureError):
+            sign(faulty_key, b"message")
+        self.assertTrue(verify(self.public_key, b"message", sign(key, b"message")))
+
+    def test_verify_many(self):
+        messages = [os.urandom(size) for size in [0, 1, 100]]
+        pairs = [(message, sign(self.private_key, message)) for message in messages]
+        self.assertEqual(verify_many(self.public_key, pairs), [True, True, True])
+        self.assertEqual(verify_many(self.public_key, []), [])
+
+        bad_pairs = pairs + [(b"forged", pairs[0][1]), (b"short", b"\x01"),
+                             (b"too large", self.public_key[0].to_bytes(len(pairs[0][1]), 'big'))]
+        self.assertEqual(verify_many(self.public_key, bad_pairs), [True, True, True, False, False, False])
+        # 进程池路径
+        self.assertEqual(verify_many(self.public_key, bad_pairs, workers=2), [True, True, True, False, False, False])
+
+        with self.assertRaisesRegex(TypeError, "pair 1"):
+            verify_many(self.public_key, [pairs[0], ("text", pairs[0][1])])
+
+    def test_fiat_batch_decryption(self):
+        batch_key = generate_batch_keys(bits=512, batch_size=5)
+        self.assertEqual(len(batch_key.exponents), 5)
+        self.assertEqual(batch_key.exponents, sorted(batch_key.exponents))
+        self.assertTrue(all(batch_key.phi_n % e for e in batch_key.exponents))
+        for batch_size in [1, 2, 3, 5]:
+            messages = [os.urandom(20) for _ in range(batch_size)]
+            ciphertexts = [encrypt_with_padding(public_key, message)
+                           for public_key, message in zip(batch_key.public_keys, messages)]
+            self.assertEqual(batch_decrypt(batch_key, ciphertexts), messages)
+            # 与逐条解密的结果一致
+            self.assertEqual(decrypt_with_padding(batch_key.private_key_for(batch_size - 1), ciphertexts[-1]),
+                             messages[-1])
+        self.assertEqual(batch_decrypt(batch_key, []), [])
+
+        with self.assertRaises(RSADecryptionError):
+            batch_decrypt(batch_key, ciphertexts * 2)
+        with self.assertRaisesRegex(RSADecryptionError, "ciphertext 1"):
+            batch_decrypt(batch_key, [ciphertexts[0], b"\x00"])
+        with self.assertRaises(ValueError):
+            RSABatchKey(batch_key.private_key, [3, 9])
+        with self.assertRaises(ValueError):
+            RSABatchKey(tuple(batch_key.private_key), batch_key.exponents)
+
+    def test_hybrid_encryption(self):
+        k = (self.public_key[0].bit_length() + 7) // 8
+        for size in [0, 1, 31, 32, 33, 5000]:
+            message = os.urandom(size)
+            ciphertext = hybrid_encrypt(self.public_key, message)
+            self.assertEqual(len(ciphertext), k + size)
+            self.assertEqual(hybrid_decrypt(self.private_key, ciphertext), message)
+            # 块大小不是 32 的倍数时密钥流也要正确衔接
+            chunks = hybrid_decrypt_stream(self.private_key, io.BytesIO(ciphertext), chunk_size=7)
+            self.assertEqual(b"".join(chunks), message)
+
+        message = os.urandom(3000)
+        ciphertext = b"".join(hybrid_encrypt_stream(self.public_key, io.BytesIO(message), chunk_size=1000))
+        self.assertEqual(hybrid_decrypt(tuple(self.private_key), ciphertext), message)
+        # 每次使用新的会话密钥
+        self.assertNotEqual(hybrid_encrypt(self.public_key, message)[k:], ciphertext[k:])
+
+        with self.assertRaises(RSADecryptionError):
+            hybrid_decrypt(self.private_key, ciphertext[:k - 1])
+        with self.assertRaises(TypeError):
+            hybrid_encrypt(self.public_key, "text")
+
+    def test_hybrid_file_encryption(self):
+        message = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plain_path = os.path.join(temp_dir, "plain.bin")
+            cipher_path = os.path.join(temp_dir, "cipher.bin")
+            with open(plain_path, "wb") as f:
+                f.write(message)
+            with open(cipher_path, "wb") as f:
+                for chunk in hybrid_encrypt_file(self.public_key, plain_path, chunk_size=4096):
+                    f.write(chunk)
+            self.assertEqual(b"".join(hybrid_decrypt_file(self.private_key, cipher_path)), message)
+
+            # 空文件不能映射到内存，直接读取
+            with open(plain_path, "wb"):
+                pass
+            ciphertext = b"".join(hybrid_encrypt_file(self.public_key, plain_path))
+            self.assertEqual(hybrid_decrypt(self.private_key, ciphertext), b"")
+
+if __name__ == '__main__':
+    unittest.main()
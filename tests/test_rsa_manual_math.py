@@ -5,12 +5,27 @@ import random
 
 from app.utils.math_utils import (
     power,
+    multi_power,
     extended_gcd, 
     mod_inverse,
+    batch_mod_inverse,
+    BatchInverseError,
     is_prime_miller_rabin,
     generate_random_n_bit_odd_number,
-    generate_large_prime
+    generate_large_prime,
+    generate_large_primes,
+    generate_safe_prime,
+    batch_trial_division,
+    SMALL_PRIMES,
+    MontgomeryContext,
+    FixedBaseTable,
+    get_fixed_base_table,
+    is_probable_prime,
+    jacobi_symbol,
+    _is_strong_lucas_probable_prime,
+    _extended_gcd_euclid
 )
+import app.utils.math_utils as math_utils
 
 class TestMathUtils(unittest.TestCase):
 
@@ -26,6 +41,74 @@ class TestMathUtils(unittest.TestCase):
         with self.assertRaises(ValueError, msg="负指数应抛出ValueError"):
             power(5, -2, 10)
 
+    def test_power_sliding_window_matches_builtin(self):
+        # 覆盖所有窗口宽度 (指数从几比特到 4096 比特)
+        for exp_bits in [1, 8, 24, 80, 240, 672, 1792, 4096]:
+            mod = generate_random_n_bit_odd_number(512)
+            base = random.getrandbits(600)
+            exp = random.getrandbits(exp_bits) | (1 << (exp_bits - 1))
+            self.assertEqual(power(base, exp, mod), pow(base, exp, mod),
+                             f"{exp_bits}-bit 指数的滑动窗口结果与内置 pow 不一致")
+        self.assertEqual(power(12345, 0, 1), 1)
+        self.assertEqual(power(12345, 3, 1), 0)
+
+    def test_fixed_base_table(self):
+        mod = generate_large_prime(128)
+        for teeth in [1, 3, 8]:
+            table = FixedBaseTable(5, mod, teeth=teeth)
+            self.assertEqual(len(table.table), 1 << teeth)
+            for exp in [0, 1, 2, mod - 2, random.getrandbits(128), random.getrandbits(40)]:
+                self.assertEqual(table.power(exp), pow(5, exp, mod))
+
+        # 超出建表比特长度的指数退回普通模幂
+        table = FixedBaseTable(3, mod, exp_bits=64)
+        exp = random.getrandbits(200)
+        self.assertEqual(table.power(exp), pow(3, exp, mod))
+
+        self.assertIs(get_fixed_base_table(2, mod), get_fixed_base_table(2, mod))
+        with self.assertRaises(ValueError):
+            table.power(-1)
+        with self.assertRaises(ValueError):
+            FixedBaseTable(2, 1)
+
+    def test_multi_power(self):
+        mod = generate_random_n_bit_odd_number(256)
+        for num_terms in [1, 2, 4, 16]:
+            pairs = [(random.getrandbits(256), random.getrandbits(random.choice([8, 160, 256])))
+                     for _ in range(num_terms)]
+            expected = 1
+            for base, exp in pairs:
+                expected = (expected * pow(base, exp, mod)) % mod
+            self.assertEqual(multi_power(pairs, mod), expected)
+
+        self.assertEqual(multi_power([(3, 0), (5, 0)], 7), 1)
+        self.assertEqual(multi_power([], 7), 1)
+        self.assertEqual(multi_power([(2, 10), (3, 1)], 1000), (1024 * 3) % 1000)
+        with self.assertRaises(ValueError):
+            multi_power([(2, -1)], 7)
+        with self.assertRaises(ValueError):
+            multi_power([(2, 1)], 0)
+
+    def test_montgomery_context(self):
+        with self.assertRaises(ValueError, msg="偶数模数应抛出ValueError"):
+            MontgomeryContext(100)
+        with self.assertRaises(ValueError, msg="模数 <= 1 应抛出ValueError"):
+            MontgomeryContext(1)
+
+        for bits in [8, 64, 521, 1024]:
+            mod = generate_random_n_bit_odd_number(bits)
+            ctx = MontgomeryContext(mod)
+            a = random.getrandbits(bits + 10)
+            b = random.getrandbits(bits)
+            a_m, b_m = ctx.to_montgomery(a), ctx.to_montgomery(b)
+            self.assertEqual(ctx.from_montgomery(a_m), a % mod)
+            self.assertEqual(ctx.from_montgomery(ctx.mul(a_m, b_m)), (a * b) % mod)
+            self.assertEqual(ctx.from_montgomery(ctx.square(a_m)), (a * a) % mod)
+
+            exp = random.getrandbits(bits)
+            self.assertEqual(ctx.power(a, exp), pow(a, exp, mod))
+            self.assertEqual(ctx.power(a, 0), 1)
+
     def test_extended_gcd(self):
         # ax + by = gcd(a,b)
         # 注意：x 和 y 的具体值可能因算法实现细节而异，但 ax + by = gcd 必须成立
@@ -71,6 +154,31 @@ class TestMathUtils(unittest.TestCase):
                          f"{e_rsa_good}*({x_good}) + {phi_n_rsa_good}*({y_good}) 不等于 {gcd_good}")
 
 
+    def test_extended_gcd_lehmer(self):
+        # 超过阈值的大整数走 Lehmer 分支，结果必须与逐步欧几里得算法一致
+        for bits in [512, 4500, 9000]:
+            for _ in range(20):
+                common = random.getrandbits(64) | 1
+                a = random.getrandbits(bits) * common
+                b = random.getrandbits(bits - 100) * common * random.choice([1, -1])
+                g, x, y = extended_gcd(a, b)
+                self.assertEqual(g, _extended_gcd_euclid(a, b)[0])
+                self.assertEqual(a * x + b * y, g)
+
+        # 调低阈值，让 Lehmer 分支在小整数上也得到覆盖
+        original_threshold = math_utils.LEHMER_THRESHOLD_BITS
+        math_utils.LEHMER_THRESHOLD_BITS = 32
+        try:
+            for _ in range(200):
+                m = random.getrandbits(256) | 1
+                a = random.getrandbits(256)
+                g, x, y = extended_gcd(a, m)
+                self.assertEqual(a * x + m * y, g)
+                if g == 1:
+                    self.assertEqual(mod_inverse(a, m), pow(a, -1, m))
+        finally:
+            math_utils.LEHMER_THRESHOLD_BITS = original_threshold
+
     def test_mod_inverse(self):
         self.assertEqual(mod_inverse(3, 11), 4) # (3*4) % 11 = 1
         self.assertEqual(mod_inverse(10, 17), 12) # (10*12) % 17 = 1
@@ -89,6 +197,22 @@ class TestMathUtils(unittest.TestCase):
         with self.assertRaises(ValueError, msg="模数 m <= 1 应抛出ValueError"):
             mod_inverse(5, 1)
 
+    def test_batch_mod_inverse(self):
+        p = generate_large_prime(128)
+        values = [random.randrange(1, p) for _ in range(50)] + [p + 3, -7]
+        self.assertEqual(batch_mod_inverse(values, p), [mod_inverse(v, p) for v in values])
+        self.assertEqual(batch_mod_inverse([5], 11), [9])
+        self.assertEqual(batch_mod_inverse([], 11), [])
+
+        # 合数模数下，第一个与模数不互素的元素的下标应被报告
+        with self.assertRaises(BatchInverseError) as cm:
+            batch_mod_inverse([3, 7, 4, 9, 6], 10)
+        self.assertEqual(cm.exception.index, 2)
+        with self.assertRaises(ValueError, msg="元素为 0 时逆元不存在"):
+            batch_mod_inverse([1, 0], 11)
+        with self.assertRaises(ValueError, msg="模数 m <= 1 应抛出ValueError"):
+            batch_mod_inverse([1], 1)
+
     def test_is_prime_miller_rabin(self):
         small_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31]
         small_composites = [4, 6, 8, 9, 10, 12, 14, 15, 100, 561] # 561 is a Carmichael number
@@ -101,6 +225,56 @@ class TestMathUtils(unittest.TestCase):
         self.assertFalse(is_prime_miller_rabin(1, k=5))
         # is_prime_miller_rabin(-7, k=5) 应该返回 False (因为 n<2)
 
+    def test_is_probable_prime_matches_miller_rabin(self):
+        # 小范围内逐个与原有的米勒-拉宾实现对比 (覆盖试除、确定性底数两个分支)
+        for n in range(-5, 20000):
+            expected = is_prime_miller_rabin(n, k=20)
+            self.assertEqual(is_probable_prime(n), expected, f"{n} 的 mr 流水线结果不一致")
+            self.assertEqual(is_probable_prime(n, method="bpsw"), expected, f"{n} 的 bpsw 流水线结果不一致")
+            if n > 2 and n % 2 == 1:
+                self.assertEqual(is_probable_prime(n, trial_division=False), expected,
+                                 f"{n} 跳过试除后结果不一致")
+
+        # 以 2 为底的强伪素数与 Carmichael 数
+        for c in [2047, 3277, 4033, 4681, 8321, 561, 1105, 1729, 3215031751, 3825123056546413051]:
+            self.assertFalse(is_probable_prime(c, trial_division=False), f"{c} 应该被判断为合数")
+
+        # 大于 2^64 的素数与合数，走 mr 查表轮数和 Baillie-PSW 两条分支
+        large_primes = [2**64 + 13, 2**89 - 1, 2**127 - 1, 2**521 - 1, 2**607 - 1]
+        for p in large_primes:
+            for method in ["mr", "bpsw"]:
+                self.assertTrue(is_probable_prime(p, method=method), f"{p} 应该被判断为素数 ({method})")
+            self.assertTrue(is_prime_miller_rabin(p, k=20))
+        for i in range(len(large_primes) - 1):
+            composite = large_primes[i] * large_primes[i + 1]
+            for method in ["mr", "bpsw"]:
+                self.assertFalse(is_probable_prime(composite, method=method))
+            self.assertFalse(is_prime_miller_rabin(composite, k=20))
+
+        for bits_val in [80, 256, 512]:
+            p = generate_large_prime(bits_val, method="legacy")
+            self.assertTrue(is_probable_prime(p))
+            self.assertTrue(is_probable_prime(p, method="bpsw"))
+
+        with self.assertRaises(ValueError, msg="未知的测试方法应抛出ValueError"):
+            is_probable_prime(101, method="unknown")
+
+    def test_strong_lucas_probable_prime(self):
+        self.assertEqual(jacobi_symbol(5, 21), 1)
+        self.assertEqual(jacobi_symbol(-7, 11), 1)
+        self.assertEqual(jacobi_symbol(2, 11), -1)
+        self.assertEqual(jacobi_symbol(6, 9), 0)
+
+        # OEIS A217255: 小于 10^5 的强卢卡斯伪素数，它们会被以 2 为底的强测试排除
+        strong_lucas_pseudoprimes = [5459, 5777, 10877, 16109, 18971, 22499, 24569,
+                                     25199, 40309, 58519, 75077, 97439]
+        for n in strong_lucas_pseudoprimes:
+            self.assertTrue(_is_strong_lucas_probable_prime(n))
+            self.assertFalse(is_probable_prime(n, method="bpsw", trial_division=False))
+        for p in [3, 5, 7, 101, 7919, 2**61 - 1]:
+            self.assertTrue(_is_strong_lucas_probable_prime(p))
+        self.assertFalse(_is_strong_lucas_probable_prime(49))
+
     def test_generate_random_n_bit_odd_number(self):
         for bits_val in [1, 2, 3, 8, 16]: # 加入 bits=1 的测试
             num = generate_random_n_bit_odd_number(bits_val)
@@ -118,5 +292,75 @@ class TestMathUtils(unittest.TestCase):
             self.assertTrue(is_prime_miller_rabin(prime_candidate, k=40), 
                             f"{prime_candidate} (生成为{bits_val}-bit素数) 未通过更严格的素性测试")
 
+    def test_generate_large_prime_sieve(self):
+        # 小比特长度下筛选不能把素数本身筛掉，也不能越过 bits 位的上界
+        for bits_val in [2, 3, 4, 5, 8, 16, 128]:
+            for sieve_size, method in [(0, "legacy"), (0, "mr"), (1, "bpsw"), (7, "mr"), (2048, "legacy")]:
+                stats = {}
+                prime_candidate = generate_large_prime(bits_val, k_miller_rabin=10, sieve_size=sieve_size,
+                                                       stats=stats, method=method)
+                self.assertEqual(prime_candidate.bit_length(), bits_val)
+                self.assertTrue(is_prime_miller_rabin(prime_candidate, k=40))
+                self.assertGreaterEqual(stats["mr_calls"], 1)
+                self.assertEqual(stats["candidates"], stats["sieved_out"] + stats["mr_calls"])
+
+        with self.assertRaises(ValueError, msg="负的筛选窗口应抛出ValueError"):
+            generate_large_prime(64, sieve_size=-1)
+
+    def test_batch_trial_division(self):
+        candidates = [random.getrandbits(random.choice([16, 64, 512])) + 1 for _ in range(500)]
+        expected = [c for c in candidates if all(c % p for p in SMALL_PRIMES)]
+        self.assertEqual(batch_trial_division(candidates), expected)
+
+        expected = [c for c in candidates if all(c % p for p in [2, 3, 5, 7])]
+        self.assertEqual(batch_trial_division(candidates, bound=10), expected)
+        self.assertEqual(batch_trial_division([]), [])
+        # 小于上界的素数本身也会被筛掉
+        self.assertEqual(batch_trial_division([7, 11, 13 * 17, 19 * 23], bound=12), [13 * 17, 19 * 23])
+        with self.assertRaises(ValueError):
+            batch_trial_division([0, 5])
+
+    def test_generate_large_prime_batched(self):
+        for bits_val in [2, 3, 8, 16, 128]:
+            stats = {}
+            prime_candidate = generate_large_prime(bits_val, batch_size=16, stats=stats)
+            self.assertEqual(prime_candidate.bit_length(), bits_val)
+            self.assertTrue(is_prime_miller_rabin(prime_candidate, k=40))
+            self.assertGreaterEqual(stats["candidates"], stats["mr_calls"])
+
+        primes = generate_large_primes(64, 2, batch_size=32, workers=2)
+        self.assertEqual(len(set(primes)), 2)
+        with self.assertRaises(ValueError, msg="负的批大小应抛出ValueError"):
+            generate_large_prime(64, batch_size=-1)
+
+    def test_generate_large_primes_parallel(self):
+        for workers in [None, 2]:
+            stats = {}
+            primes = generate_large_primes(64, 3, workers=workers, stats=stats)
+            self.assertEqual(len(primes), 3)
+            self.assertEqual(len(set(primes)), 3, "并行搜索返回的素数应互不相同")
+            for p in primes:
+                self.assertEqual(p.bit_length(), 64)
+                self.assertTrue(is_prime_miller_rabin(p, k=40))
+            self.assertGreaterEqual(stats["mr_calls"], 3)
+
+        prime = generate_large_prime(128, workers=2)
+        self.assertEqual(prime.bit_length(), 128)
+        self.assertTrue(is_prime_miller_rabin(prime, k=40))
+
+    def test_generate_safe_prime(self):
+        for bits_val in [3, 4, 5, 8, 16, 64, 256]:
+            stats = {}
+            p = generate_safe_prime(bits_val, stats=stats)
+            self.assertEqual(p.bit_length(), bits_val)
+            self.assertTrue(is_prime_miller_rabin(p, k=40))
+            self.assertTrue(is_prime_miller_rabin((p - 1) // 2, k=40), "(p-1)/2 也应为素数")
+            self.assertGreaterEqual(stats["candidates"], stats["mr_calls"])
+
+        p = generate_safe_prime(64, workers=2)
+        self.assertTrue(is_prime_miller_rabin((p - 1) // 2, k=40))
+        with self.assertRaises(ValueError, msg="安全素数至少需要 3 位"):
+            generate_safe_prime(2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
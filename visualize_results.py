@@ -6,6 +6,8 @@ import numpy as np
 import sys # 用于在文件未找到时退出脚本
 
 STANDARD_SHORT_BLOCK_SIZE_BYTES = 32
+# 只对比三种算法的基础测试；结果文件中的其他部分 (多素数、批量、后端对比等) 字段不同，不参与这些图表
+CORE_ALGORITHMS = ["RSA", "ElGamal", "ECC"]
 
 # --- 1. 从 performance_results.json 文件加载实验结果数据 ---
 RESULTS_FILENAME = "performance_results.json"
@@ -53,8 +55,8 @@ def plot_key_generation_time(data):
     colors = []
 
     # 提取数据
-    for algo, configs in data.items():
-        for config_name, values in configs.items():
+    for algo in CORE_ALGORITHMS:
+        for config_name, values in data[algo].items():
             labels.append(config_name.replace("ECC-secp", "ECC-p")) # 简化ECC标签
             times.append(values["key_gen_ms"])
             if algo == "RSA": colors.append('skyblue')
@@ -84,8 +86,8 @@ def plot_core_operations_time(data):
     dec_times = []
     
     # 提取数据
-    for algo, configs in data.items():
-        for config_name, values in configs.items():
+    for algo in CORE_ALGORITHMS:
+        for config_name, values in data[algo].items():
             labels.append(config_name.replace("ECC-secp", "ECC-p"))
             enc_times.append(values["core_encryption_ms"])
             dec_times.append(values.get("core_decryption_ms", 0)) # ElGamal-2048可能没有这个键